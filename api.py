@@ -1,68 +1,213 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
+import functools
 import subprocess
 import os
-import tempfile
-import shutil
 import re
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+
+from src.core.build_profiles import BuildOptionsError, BuildSettings, build_settings, get_profile, parse_compiler_options
+from src.core.compile_cache import compile_cache
+from src.core.config import config
+from src.core.health_prober import HealthProber
+from src.core.metrics import in_flight, language_label, metrics_payload, observe_result, timed_phase
+from src.core.output_capture import resource_fields, run_bounded_async
+from src.core.precompiled_headers import precompiled_headers
+from src.core.result_cache import result_cache
+from src.core.toolchains import toolchains
+from src.core.workspace import workspaces
+from src.languages.go import build_go
+from src.languages.java import compile_java, get_java_pool, run_java
+from src.languages.python import python_pool, run_python_pooled
+from src.languages.rust import build_rust, rust_crates
 
 app = FastAPI(title="Multi-Language Compiler API")
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
 
+@app.on_event("startup")
+async def warm_pools():
+    # Resolve compilers once; requests and health checks read the registry
+    await asyncio.to_thread(toolchains.discover)
+    await asyncio.to_thread(workspaces.start)
+    # Each of these can probe versions, spawn processes or (Java) compile the pool runner
+    await asyncio.to_thread(precompiled_headers.warm, toolchains.path("g++"),
+                            build_settings("cpp", toolchains.path("g++"), config.INTERACTIVE_BUILD_PROFILE).flags)
+    await asyncio.to_thread(python_pool.start)
+    await asyncio.to_thread(get_java_pool)
+    await asyncio.to_thread(rust_crates.start)
+    health_prober.start()
+
+@app.on_event("shutdown")
+async def stop_prober():
+    await health_prober.stop()
+
 @app.get("/")
 async def root():
     return {"message": "Compiler API is running!", "status": "active"}
 
 @app.post("/api/compile")
 async def compile_code(request: Dict[Any, Any]):
+    build_profile = request.get("build_profile")
+    compiler_options = request.get("compiler_options")
+    try:
+        get_profile(build_profile or config.INTERACTIVE_BUILD_PROFILE)
+        parse_compiler_options(compiler_options)
+    except BuildOptionsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     try:
         language = request.get("language")
         code = request.get("code")
         stdin = request.get("stdin", "")
         if not language or not code:
             raise HTTPException(status_code=400, detail="Language and code required")
-        result = await execute_code(language, code, stdin)
+        result = await execute_code(language, code, stdin, use_cache=request.get("use_cache"),
+                                    build_profile=build_profile, compiler_options=compiler_options)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-async def execute_code(language: str, code: str, stdin: str = ""):
-    # Create a temporary directory for all files (better isolation)
-    temp_dir = tempfile.mkdtemp()
+async def execute_code(language: str, code: str, stdin: str = "", use_cache: bool = None,
+                       build_profile: str = None, compiler_options: str = None):
+    """Run code, answering identical runs from the result cache when enabled
+
+    Native builds default to the fast INTERACTIVE_BUILD_PROFILE: this API serves "Run" clicks.
+    """
+    build_profile = build_profile or config.INTERACTIVE_BUILD_PROFILE
+    if use_cache is None:
+        use_cache = config.RESULT_CACHE_ENABLED
+    if not use_cache:
+        result = await _execute_uncached(language, code, stdin, build_profile, compiler_options)
+        observe_result(language_label(language), result)
+        return result
+    
+    # api.py runs with fixed limits (5s run timeout, no memory limit)
+    variant = ":".join(part for part in (language, build_profile, compiler_options) if part)
+    cache_key = result_cache.make_key(variant, code, stdin, 5, 0)
+    # The Redis tier is a blocking client, keep it off the event loop
+    if result_cache.use_redis:
+        cached = await asyncio.to_thread(result_cache.get, cache_key)
+    else:
+        cached = result_cache.get(cache_key)
+    if cached is not None:
+        cached["cached"] = True
+        observe_result(language_label(language), cached)
+        return cached
     
+    result = await _execute_uncached(language, code, stdin, build_profile, compiler_options)
+    observe_result(language_label(language), result)
+    if result_cache.use_redis:
+        await asyncio.to_thread(result_cache.set, cache_key, result)
+    else:
+        result_cache.set(cache_key, result)
+    return result
+
+# Per-language concurrency caps so one slow toolchain can't take every slot.
+# Compiles and runs block a thread for their whole duration, so each language
+# also gets its own threads, one per slot: they never queue, and long runs
+# can't starve other languages or the default executor (file I/O, cleanup).
+_language_slots: Dict[str, asyncio.Semaphore] = {}
+_language_threads: Dict[str, ThreadPoolExecutor] = {}
+
+def _slots_for(language: str) -> asyncio.Semaphore:
+    if language not in _language_slots:
+        _language_slots[language] = asyncio.Semaphore(config.API_LANGUAGE_CONCURRENCY)
+    return _language_slots[language]
+
+def _threads_for(language: str) -> ThreadPoolExecutor:
+    if language not in _language_threads:
+        _language_threads[language] = ThreadPoolExecutor(max_workers=config.API_LANGUAGE_CONCURRENCY,
+                                                         thread_name_prefix=f"run-{language}")
+    return _language_threads[language]
+
+async def _blocking(language: str, fn, *args):
+    """Run a blocking compile/run step on the language's own threads"""
+    return await asyncio.get_running_loop().run_in_executor(_threads_for(language), functools.partial(fn, *args))
+
+async def _run(language: str, argv: List[str], stdin: str = "", timeout: float = 5, cwd: str = None,
+               env: Dict[str, str] = None) -> subprocess.CompletedProcess:
+    """Non-blocking counterpart of subprocess.run(capture_output=True, text=True), with an output cap"""
+    return await run_bounded_async(argv, stdin, timeout=timeout, cwd=cwd, env=env, executor=_threads_for(language))
+
+def _write_source(path: str, code: str) -> None:
+    with open(path, "w") as f:
+        f.write(code)
+
+def _fetch_cached_build(language: str, build: BuildSettings, code: str, exec_file: str):
+    """Blocking half of a cached compile: (cache_key, hit) -- run via asyncio.to_thread"""
+    cache_key = compile_cache.make_key(language, build.compiler, build.flags, code)
+    return cache_key, compile_cache.fetch_file(cache_key, "main", exec_file)
+
+async def _compile_native(language: str, compiler: str, code: str, source: str, exec_file: str,
+                          timeout: float, build_profile: str = None, compiler_options: str = None):
+    """Compile source to exec_file unless an identical build is cached; returns the compile or None on a hit"""
+    is_cpp = language in ("cpp", "c++")
+    build = build_settings("cpp" if is_cpp else language, compiler, build_profile, compiler_options)
+    cache_key, hit = await asyncio.to_thread(_fetch_cached_build, language, build, code, exec_file)
+    if hit:
+        return None
+    pch_args = precompiled_headers.include_args(build.compiler, build.flags, code) if is_cpp and not build.custom else []
+    compile_result = await _run(language, [build.compiler, *pch_args, source, "-o", exec_file, *build.flags], timeout=timeout)
+    if compile_result.returncode != 0 and pch_args:
+        # Rule the PCH out and report the diagnostics of a plain compile
+        compile_result = await _run(language, [build.compiler, source, "-o", exec_file, *build.flags], timeout=timeout)
+    if compile_result.returncode == 0:
+        await asyncio.to_thread(compile_cache.store, cache_key, {"main": exec_file})
+    return compile_result
+
+def _compilation_error(compile_result: subprocess.CompletedProcess) -> Dict[str, Any]:
+    return {"stdout": "", "stderr": compile_result.stderr, "exit_code": compile_result.returncode, "status": "compilation_error",
+            "compilation_error": True, **resource_fields(None, compile_result)}
+
+def _cleanup(language: str, temp_dir: str) -> None:
+    with timed_phase(language_label(language), "cleanup"):
+        workspaces.recycle(temp_dir)
+
+async def _execute_uncached(language: str, code: str, stdin: str = "", build_profile: str = None,
+                            compiler_options: str = None):
+    async with _slots_for(language):
+        # Per-run directory from the pre-created workspace pool (better isolation)
+        temp_dir = await asyncio.to_thread(workspaces.acquire)
+        try:
+            with in_flight(language_label(language)):
+                return await _execute_in(temp_dir, language, code, stdin, build_profile, compiler_options)
+        finally:
+            # Clean up temp directory without holding up the response
+            asyncio.get_running_loop().run_in_executor(None, _cleanup, language, temp_dir)
+
+def _failed(compile_result) -> bool:
+    return compile_result is not None and compile_result.returncode != 0
+
+async def _execute_in(temp_dir: str, language: str, code: str, stdin: str, build_profile: str = None,
+                      compiler_options: str = None):
+    compile_result = None
     try:
         if language == "python":
-            temp_file = os.path.join(temp_dir, "main.py")
-            with open(temp_file, "w") as f:
-                f.write(code)
-            result = subprocess.run(["python3", temp_file], input=stdin, capture_output=True, text=True, timeout=5)
+            if python_pool.enabled:
+                # Warm interpreter: skips ~20-40 ms of python3 startup per run
+                result = await _blocking(language, run_python_pooled, code, stdin, 5)
+            else:
+                temp_file = os.path.join(temp_dir, "main.py")
+                await asyncio.to_thread(_write_source, temp_file, code)
+                result = await _run(language, [toolchains.command("python"), temp_file], stdin, timeout=5)
             
         elif language == "javascript":
             temp_file = os.path.join(temp_dir, "main.js")
-            with open(temp_file, "w") as f:
-                f.write(code)
-            result = subprocess.run(["node", temp_file], input=stdin, capture_output=True, text=True, timeout=5)
+            await asyncio.to_thread(_write_source, temp_file, code)
+            result = await _run(language, [toolchains.command("node"), temp_file], stdin, timeout=5)
             
-        elif language == "c":
-            temp_file = os.path.join(temp_dir, "main.c")
-            with open(temp_file, "w") as f:
-                f.write(code)
+        elif language in ("c", "cpp", "c++"):
+            compiler, extension = ("gcc", "c") if language == "c" else ("g++", "cpp")
+            compiler = toolchains.command(compiler)
+            temp_file = os.path.join(temp_dir, f"main.{extension}")
+            await asyncio.to_thread(_write_source, temp_file, code)
             exec_file = os.path.join(temp_dir, "main.out")
-            compile_result = subprocess.run(["gcc", temp_file, "-o", exec_file], capture_output=True, text=True, timeout=10)
-            if compile_result.returncode != 0:
-                return {"stdout": "", "stderr": compile_result.stderr, "exit_code": compile_result.returncode, "status": "compilation_error"}
-            result = subprocess.run([exec_file], input=stdin, capture_output=True, text=True, timeout=5)
-            
-        elif language == "cpp":
-            temp_file = os.path.join(temp_dir, "main.cpp")
-            with open(temp_file, "w") as f:
-                f.write(code)
-            exec_file = os.path.join(temp_dir, "main.out")
-            compile_result = subprocess.run(["g++", temp_file, "-o", exec_file], capture_output=True, text=True, timeout=10)
-            if compile_result.returncode != 0:
-                return {"stdout": "", "stderr": compile_result.stderr, "exit_code": compile_result.returncode, "status": "compilation_error"}
-            result = subprocess.run([exec_file], input=stdin, capture_output=True, text=True, timeout=5)
+            compile_result = await _compile_native(language, compiler, code, temp_file, exec_file, timeout=10,
+                                                   build_profile=build_profile, compiler_options=compiler_options)
+            if _failed(compile_result):
+                return _compilation_error(compile_result)
+            result = await _run(language, [exec_file], stdin, timeout=5)
             
         elif language == "java":
             # Extract class name from Java code
@@ -77,80 +222,102 @@ async def execute_code(language: str, code: str, stdin: str = ""):
             
             # Write Java file with correct name
             java_file = os.path.join(temp_dir, f"{class_name}.java")
-            with open(java_file, "w") as f:
-                f.write(code)
-            
-            # Compile
-            compile_result = subprocess.run(
-                ["javac", java_file],
-                capture_output=True,
-                text=True,
-                timeout=10,
-                cwd=temp_dir
-            )
+            await asyncio.to_thread(_write_source, java_file, code)
             
-            if compile_result.returncode != 0:
-                return {
-                    "stdout": "", 
-                    "stderr": compile_result.stderr, 
-                    "exit_code": compile_result.returncode, 
-                    "status": "compilation_error"
-                }
-            
-            # Execute
-            result = subprocess.run(
-                ["java", "-cp", temp_dir, class_name],
-                input=stdin,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            # Compile (or reuse class files from an identical earlier submission)
+            compile_result, result = await _blocking(language, _compile_and_run_java, temp_dir, java_file, class_name, code, stdin)
+            if _failed(compile_result):
+                return _compilation_error(compile_result)
             
         elif language == "go":
             temp_file = os.path.join(temp_dir, "main.go")
-            with open(temp_file, "w") as f:
-                f.write(code)
-            result = subprocess.run(["go", "run", temp_file], input=stdin, capture_output=True, text=True, timeout=10)
+            await asyncio.to_thread(_write_source, temp_file, code)
+            exec_file = os.path.join(temp_dir, "main")
+            compile_result = await _blocking(language, build_go, code, temp_file, exec_file, 10)
+            if _failed(compile_result):
+                return _compilation_error(compile_result)
+            result = await _run(language, [exec_file], stdin, timeout=5)
             
         elif language == "rust":
             temp_file = os.path.join(temp_dir, "main.rs")
-            with open(temp_file, "w") as f:
-                f.write(code)
+            await asyncio.to_thread(_write_source, temp_file, code)
             exec_file = os.path.join(temp_dir, "main")
-            compile_result = subprocess.run(["rustc", temp_file, "-o", exec_file], capture_output=True, text=True, timeout=15)
-            if compile_result.returncode != 0:
-                return {"stdout": "", "stderr": compile_result.stderr, "exit_code": compile_result.returncode, "status": "compilation_error"}
-            result = subprocess.run([exec_file], input=stdin, capture_output=True, text=True, timeout=5)
+            compile_result = await _blocking(language, build_rust, code, temp_file, exec_file, 15,
+                                                 build_profile, compiler_options)
+            if _failed(compile_result):
+                return _compilation_error(compile_result)
+            result = await _run(language, [exec_file], stdin, timeout=5)
             
         elif language == "sql":
             temp_file = os.path.join(temp_dir, "query.sql")
-            with open(temp_file, "w") as f:
-                f.write(code)
-            result = subprocess.run(["sqlite3", ":memory:", ".read " + temp_file], input=stdin, capture_output=True, text=True, timeout=5)
+            await asyncio.to_thread(_write_source, temp_file, code)
+            result = await _run(language, [toolchains.command("sqlite3"), ":memory:", ".read " + temp_file], stdin, timeout=5)
             
         else:
             return {"stdout": "", "stderr": f"Language {language} not supported", "exit_code": -1, "status": "language_not_supported"}
 
+        if getattr(result, "output_limit_exceeded", False):
+            # Killed as soon as a stream passed the cap; keep the truncated head/tail
+            return {"stdout": result.stdout, "stderr": result.stderr, "exit_code": -1, "status": "output_limit_exceeded",
+                    **resource_fields(result, compile_result)}
+        if getattr(result, "memory_limit_exceeded", False):
+            # OOM-killed at the cgroup slot's memory.max
+            return {"stdout": result.stdout, "stderr": result.stderr, "exit_code": -1, "status": "memory_limit_exceeded",
+                    **resource_fields(result, compile_result)}
+        
         return {
             "stdout": result.stdout,
             "stderr": result.stderr,
             "exit_code": result.returncode,
-            "status": "success" if result.returncode == 0 else "error"
+            "status": "success" if result.returncode == 0 else "error",
+            **resource_fields(result, compile_result)
         }
         
     except subprocess.TimeoutExpired:
         return {"stdout": "", "stderr": "Execution timeout", "exit_code": -1, "status": "timeout"}
     except Exception as e:
         return {"stdout": "", "stderr": str(e), "exit_code": -1, "status": "error"}
-    finally:
-        # Clean up temp directory
-        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def _compile_and_run_java(temp_dir: str, java_file: str, class_name: str, code: str, stdin: str):
+    """Blocking Java path (warm JVM pool is thread-based); returns (compile_result or None, run_result)"""
+    cache_key = compile_cache.make_key("java", "javac", [], code)
+    compile_result = None
+    if not compile_cache.fetch(cache_key, temp_dir):
+        compile_result = compile_java(temp_dir, java_file, timeout=10)
+        if compile_result.returncode != 0:
+            return compile_result, None
+        
+        compile_cache.store(cache_key, {
+            name: os.path.join(temp_dir, name)
+            for name in os.listdir(temp_dir) if name.endswith(".class")
+        })
+    
+    # Execute on a warm JVM when the pool is available
+    return compile_result, run_java(temp_dir, class_name, stdin, timeout=5)
+
+TEST_CODES = {
+    "python": "print('Python: OK')",
+    "javascript": "console.log('JavaScript: OK')",
+    "c": "#include <stdio.h>\nint main() { printf(\"C: OK\\n\"); return 0; }",
+    "c++": "#include <iostream>\nusing namespace std;\nint main() { cout << \"C++: OK\" << endl; return 0; }",
+    "java": "public class Test { public static void main(String[] args) { System.out.println(\"Java: OK\"); } }",
+    "go": "package main\nimport \"fmt\"\nfunc main() { fmt.Println(\"Go: OK\") }",
+    "rust": "fn main() { println!(\"Rust: OK\"); }",
+    "sql": "SELECT 'SQL: OK';"
+}
+
+async def _run_self_test(language: str, code: str) -> Dict[str, Any]:
+    # Bypass the result cache: a memoized OK would not exercise the compiler
+    return await execute_code(language, code, use_cache=False)
+
+health_prober = HealthProber(TEST_CODES, _run_self_test, interval=config.HEALTH_PROBE_INTERVAL,
+                             history=config.HEALTH_PROBE_HISTORY)
 
 @app.get("/api/health")
-async def health_check():
-    """Check compiler availability and API health"""
+async def health_check(refresh: bool = False):
+    """Check compiler availability and API health (?refresh=true re-probes everything now)"""
     compilers = {
-        "python": "python3",
+        "python": "python",
         "javascript": "node",
         "c": "gcc",
         "c++": "g++",
@@ -160,44 +327,47 @@ async def health_check():
         "sql": "sqlite3"
     }
     
+    if refresh:
+        await asyncio.to_thread(toolchains.discover)
+        await health_prober.probe_all()
+    
+    # Served from the startup registry: no PATH lookups per probe
+    snapshot = await asyncio.to_thread(toolchains.snapshot)
     compilers_available = {}
-    for lang, cmd in compilers.items():
-        compilers_available[lang] = shutil.which(cmd) is not None
+    for lang, tool in compilers.items():
+        compilers_available[lang] = snapshot[tool]["available"]
     
     available_count = sum(compilers_available.values())
+    self_tests = health_prober.summary()
+    failing = [lang for lang, test in self_tests.items()
+               if compilers_available.get(lang) and test["passed"] is False]
     
     return {
-        "status": "healthy",
+        "status": "degraded" if failing else "healthy",
         "api": True,
         "compilers_available": compilers_available,
+        "self_tests": self_tests,
+        "toolchains": snapshot,
         "total_languages": len(compilers),
         "available_languages": available_count
     }
 
 @app.get("/api/test-compiler/{language}")
-async def test_compiler(language: str):
-    """Test if a specific compiler works"""
-    test_codes = {
-        "python": "print('Python: OK')",
-        "javascript": "console.log('JavaScript: OK')",
-        "c": "#include <stdio.h>\nint main() { printf(\"C: OK\\n\"); return 0; }",
-        "c++": "#include <iostream>\nusing namespace std;\nint main() { cout << \"C++: OK\" << endl; return 0; }",
-        "java": "public class Test { public static void main(String[] args) { System.out.println(\"Java: OK\"); } }",
-        "go": "package main\nimport \"fmt\"\nfunc main() { fmt.Println(\"Go: OK\") }",
-        "rust": "fn main() { println!(\"Rust: OK\"); }",
-        "sql": "SELECT 'SQL: OK';"
-    }
-    
-    if language not in test_codes:
+async def test_compiler(language: str, refresh: bool = False):
+    """Last background self-test of a compiler (?refresh=true runs it now)"""
+    if language not in TEST_CODES:
         raise HTTPException(status_code=400, detail="Language not supported")
     
-    # Use the existing compile endpoint logic
-    result = await execute_code(language, test_codes[language])
+    probe = await (health_prober.probe(language) if refresh else health_prober.latest(language))
     
     return {
         "language": language,
-        "test_code": test_codes[language],
-        "result": result
+        "test_code": TEST_CODES[language],
+        "result": probe["result"],
+        "passed": probe["passed"],
+        "latency": probe["latency"],
+        "checked_at": probe["checked_at"],
+        "trend": health_prober.records[language].to_dict()["trend"]
     }
 
 @app.get("/api/languages")
@@ -215,6 +385,12 @@ async def get_supported_languages():
         ]
     }
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: per-language phase latencies, outcomes, caches and pools"""
+    body, content_type = metrics_payload()
+    return Response(content=body, headers={"Content-Type": content_type})
+
 @app.get("/api/stats")
 async def get_stats():
     """Get API statistics and system info"""
@@ -232,7 +408,7 @@ async def get_stats():
         "processor": platform.processor()
     }
     
-    # Get compiler availability
+    # Get compiler availability (cached registry and self-tests, never a fresh probe)
     health = await health_check()
     
     return {
@@ -241,7 +417,10 @@ async def get_stats():
         "python_version": python_version,
         "system_info": system_info,
         "compilers": health["compilers_available"],
+        "self_tests": health["self_tests"],
         "available_languages": health["available_languages"],
         "total_languages": health["total_languages"],
+        "compile_cache": compile_cache.stats(),
+        "result_cache": result_cache.stats(),
         "timestamp": __import__("datetime").datetime.now().isoformat()
     }
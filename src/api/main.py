@@ -1,4 +1,4 @@
-from fastapi import FastAPI, BackgroundTasks, HTTPException
+from fastapi import FastAPI, BackgroundTasks, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Dict, Optional, List
@@ -7,8 +7,10 @@ import json
 from datetime import datetime
 
 from src.core.compiler import CompilerManager
+from src.core.metrics import QUEUE_DEPTH, metrics_payload
 from src.database.redis_client import redis_client
-from src.api.routes import submissions, languages
+from src.api.routes import build_profiles, datasets, submissions, languages
+from src.workers.queue_manager import submission_queue
 
 app = FastAPI(
     title="Multi-Language Compiler API",
@@ -27,6 +29,8 @@ app.add_middleware(
 # Include routers
 app.include_router(submissions.router, prefix="/api/v1")
 app.include_router(languages.router, prefix="/api/v1")
+app.include_router(datasets.router, prefix="/api/v1")
+app.include_router(build_profiles.router, prefix="/api/v1")
 
 # Global compiler manager
 compiler_manager = CompilerManager()
@@ -35,6 +39,18 @@ compiler_manager = CompilerManager()
 async def root():
     return {"message": "Multi-Language Compiler API", "status": "active"}
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics; queue depth is read from Redis at scrape time"""
+    try:
+        stats = await submission_queue.stats()
+        QUEUE_DEPTH.labels("pending").set(stats["pending"])
+        QUEUE_DEPTH.labels("processing").set(stats["processing"])
+    except Exception:
+        pass  # still export the in-process metrics when Redis is down
+    body, content_type = metrics_payload()
+    return Response(content=body, headers={"Content-Type": content_type})
+
 @app.get("/health")
 async def health_check():
     return {
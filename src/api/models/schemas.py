@@ -9,7 +9,8 @@ class SubmissionBase(BaseModel):
     expected_output: Optional[str] = None
     cpu_time_limit: Optional[float] = 5.0
     memory_limit: Optional[int] = 256000
-    compiler_options: Optional[str] = None
+    compiler_options: Optional[str] = None  # allow-listed C/C++ flags, e.g. "-std=c++17 -Wall"
+    build_profile: Optional[str] = None  # quick, judge or debug (default BUILD_PROFILE_DEFAULT)
 
 class SubmissionCreate(SubmissionBase):
     pass
@@ -21,6 +22,8 @@ class SubmissionResponse(SubmissionBase):
     stderr: Optional[str] = ""
     exit_code: Optional[int] = 0
     execution_time: Optional[float] = 0.0
+    cpu_time: Optional[float] = None
+    memory: Optional[int] = None  # peak RSS in KB
     created_at: datetime
     completed_at: Optional[datetime] = None
 
@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from src.core.build_profiles import PROFILES
+from src.core.config import config
+
+router = APIRouter(prefix="/build-profiles", tags=["build-profiles"])
+
+@router.get("")
+async def get_build_profiles():
+    """Named C, C++ and Rust build profiles (pass the name as `build_profile`)"""
+    return {
+        "default": config.BUILD_PROFILE_DEFAULT,
+        "profiles": [profile.to_dict() for profile in PROFILES.values()]
+    }
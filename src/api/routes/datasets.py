@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from src.core.datasets import datasets
+
+router = APIRouter(prefix="/datasets", tags=["datasets"])
+
+@router.get("")
+async def get_datasets():
+    """Read-only datasets SQL submissions can run against (pass the name as `dataset`)"""
+    return await run_in_threadpool(datasets.describe)
\ No newline at end of file
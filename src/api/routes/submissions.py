@@ -1,17 +1,20 @@
-from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
-import uuid
+from typing import List, Optional
 import json
+import uuid
 from datetime import datetime
 
-from src.database.redis_client import redis_client
-from src.core.compiler import compiler_manager
-from typing import Dict, Any
-import asyncio
+from src.core.build_profiles import BuildOptionsError, get_profile, parse_compiler_options
+from src.core.config import config
+from src.core.execution_pool import QueueFullError
+from src.workers.queue_manager import submission_queue
 
 router = APIRouter(prefix="/submissions", tags=["submissions"])
 
+FINAL_STATUSES = ("Completed", "Error")
+
 class SubmissionRequest(BaseModel):
     source_code: str
     language_id: int
@@ -19,20 +22,64 @@ class SubmissionRequest(BaseModel):
     expected_output: Optional[str] = None
     cpu_time_limit: Optional[float] = 5.0
     memory_limit: Optional[int] = 256000
+    use_cache: Optional[bool] = None
+    dataset: Optional[str] = None  # SQL only: read-only dataset to attach
+    build_profile: Optional[str] = None  # quick, judge or debug (default BUILD_PROFILE_DEFAULT)
+    compiler_options: Optional[str] = None  # C/C++ only: allow-listed flags, e.g. "-std=c++17 -Wall"
+
+class TestCase(BaseModel):
+    stdin: Optional[str] = ""
+    expected_output: Optional[str] = None
+
+class BatchSubmissionRequest(BaseModel):
+    """Either one program with test_cases, or independent submissions"""
+    source_code: Optional[str] = None
+    language_id: Optional[int] = None
+    test_cases: List[TestCase] = []
+    submissions: List[SubmissionRequest] = []
+    cpu_time_limit: Optional[float] = 5.0
+    memory_limit: Optional[int] = 256000
+    use_cache: Optional[bool] = None
+    dataset: Optional[str] = None
+    build_profile: Optional[str] = None
+    compiler_options: Optional[str] = None
 
 class SubmissionResponse(BaseModel):
     submission_id: str
     status: str
     message: Optional[str] = None
 
-# Simple in-memory storage for submissions
-submissions_db = {}
+async def _check_capacity():
+    # Shed load instead of letting the backlog grow without bound
+    try:
+        await submission_queue.check_capacity()
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=429,
+            detail={
+                "message": "Execution queue is full, retry later",
+                "queue_depth": e.queue_depth,
+                "capacity": e.capacity,
+                "retry_after": e.retry_after
+            },
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+def _check_build_options(build_profile: Optional[str], compiler_options: Optional[str]):
+    # Reject before queueing rather than failing on a worker
+    try:
+        get_profile(build_profile)
+        parse_compiler_options(compiler_options)
+    except BuildOptionsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("", response_model=SubmissionResponse)
-async def create_submission(request: SubmissionRequest, background_tasks: BackgroundTasks):
+async def create_submission(request: SubmissionRequest):
+    _check_build_options(request.build_profile, request.compiler_options)
+    await _check_capacity()
+    
     submission_id = str(uuid.uuid4())
     
-    # Store submission in memory
     submission_data = {
         **request.dict(),
         "submission_id": submission_id,
@@ -40,10 +87,8 @@ async def create_submission(request: SubmissionRequest, background_tasks: Backgr
         "created_at": datetime.utcnow().isoformat()
     }
     
-    submissions_db[submission_id] = submission_data
-    
-    # Process immediately
-    background_tasks.add_task(process_submission, submission_id)
+    # Hand the job to the worker fleet (src/workers/queue_manager.py)
+    await submission_queue.enqueue(submission_data)
     
     return SubmissionResponse(
         submission_id=submission_id,
@@ -51,44 +96,108 @@ async def create_submission(request: SubmissionRequest, background_tasks: Backgr
         message="Submission queued for execution"
     )
 
+@router.post("/batch", response_model=SubmissionResponse)
+async def create_batch_submission(request: BatchSubmissionRequest):
+    """Queue many runs as one job; the worker compiles once and fans the cases out"""
+    if request.test_cases and request.submissions:
+        raise HTTPException(status_code=400, detail="Send either test_cases or submissions, not both")
+    
+    if request.test_cases:
+        if request.source_code is None or request.language_id is None:
+            raise HTTPException(status_code=400, detail="test_cases require source_code and language_id")
+        cases = [
+            {
+                "source_code": request.source_code,
+                "language_id": request.language_id,
+                "stdin": case.stdin,
+                "expected_output": case.expected_output,
+                "cpu_time_limit": request.cpu_time_limit,
+                "memory_limit": request.memory_limit,
+                "use_cache": request.use_cache,
+                "dataset": request.dataset,
+                "build_profile": request.build_profile,
+                "compiler_options": request.compiler_options
+            }
+            for case in request.test_cases
+        ]
+    else:
+        cases = [submission.dict() for submission in request.submissions]
+    
+    if not cases:
+        raise HTTPException(status_code=400, detail="Batch has no test cases")
+    for case in cases:
+        _check_build_options(case.get("build_profile"), case.get("compiler_options"))
+    if len(cases) > config.BATCH_MAX_CASES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch has {len(cases)} cases, the limit is {config.BATCH_MAX_CASES}"
+        )
+    
+    await _check_capacity()
+    
+    submission_id = str(uuid.uuid4())
+    await submission_queue.enqueue({
+        "submission_id": submission_id,
+        "batch": True,
+        "cases": cases,
+        "status": "In Queue",
+        "created_at": datetime.utcnow().isoformat()
+    })
+    
+    return SubmissionResponse(
+        submission_id=submission_id,
+        status="In Queue",
+        message=f"Batch of {len(cases)} cases queued for execution"
+    )
+
+@router.get("/queue")
+async def get_queue_stats():
+    """Current backlog of the shared submission queue"""
+    return await submission_queue.stats()
+
 @router.get("/{submission_id}")
 async def get_submission(submission_id: str):
-    if submission_id not in submissions_db:
+    submission = await submission_queue.load(submission_id)
+    if submission is None:
         raise HTTPException(status_code=404, detail="Submission not found")
     
-    return submissions_db[submission_id]
+    return submission
 
-async def process_submission(submission_id: str):
-    """Process submission immediately"""
-    if submission_id not in submissions_db:
-        return
-    
-    submission = submissions_db[submission_id]
-    
-    try:
-        # Update status
-        submission["status"] = "Processing"
-        
-        # Execute code directly - FIXED: Added missing closing parenthesis
-        result = await asyncio.to_thread(
-            compiler_manager.execute_code,
-            source_code=submission["source_code"],
-            language_id=submission["language_id"],
-            stdin=submission["stdin"],
-            cpu_time_limit=submission["cpu_time_limit"],
-            memory_limit=submission["memory_limit"]
-        )
-        
-        # Update with result
-        submission.update(result)
-        submission["status"] = "Completed"
-        submission["completed_at"] = datetime.utcnow().isoformat()
+def _sse(event: str, data: dict, event_id: Optional[str] = None) -> str:
+    lines = [f"id: {event_id}"] if event_id else []
+    lines += [f"event: {event}", f"data: {json.dumps(data)}"]
+    return "\n".join(lines) + "\n\n"
+
+async def _event_stream(submission_id: str, last_id: str, request: Request):
+    while not await request.is_disconnected():
+        events = await submission_queue.read_events(submission_id, last_id)
+        if not events:
+            # Events expire with the record; a finished submission still gets a final frame
+            submission = await submission_queue.load(submission_id)
+            if submission is None or submission.get("status") in FINAL_STATUSES:
+                if submission is not None:
+                    submission.pop("source_code", None)
+                    submission.pop("stdin", None)
+                    yield _sse("done", submission)
+                return
+            yield ": keep-alive\n\n"
+            continue
         
-    except Exception as e:
-        # Update with error
-        submission.update({
-            "status": "Error",
-            "stderr": f"Execution failed: {str(e)}",
-            "exit_code": 1,
-            "execution_time": 0.0
-        })
\ No newline at end of file
+        for event_id, event, data in events:
+            last_id = event_id
+            yield _sse(event, data, event_id)
+            if event == "done":
+                return
+
+@router.get("/{submission_id}/events")
+async def stream_submission_events(submission_id: str, request: Request,
+                                   last_event_id: Optional[str] = Header(None)):
+    """Server-sent events: status transitions, phase timings and output chunks"""
+    if await submission_queue.load(submission_id) is None:
+        raise HTTPException(status_code=404, detail="Submission not found")
+    
+    return StreamingResponse(
+        _event_stream(submission_id, last_event_id or "0", request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
\ No newline at end of file
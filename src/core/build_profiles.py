@@ -0,0 +1,118 @@
+# src/core/build_profiles.py
+import re
+import shlex
+from typing import Dict, List, Optional, Tuple
+
+from src.core.config import config
+from src.core.toolchains import toolchains
+
+# Flags a submission may add through compiler_options: optimisation, warnings,
+# language standard and macros. Anything that names files, plugins or the
+# linker is rejected.
+_ALLOWED_FLAG = re.compile(
+    r'^(-O[0-3sg]?|-g|-w|-Wall|-Wextra|-Wpedantic|-pedantic|-Werror|-Wshadow|-Wconversion|-pthread|-lm'
+    r'|-std=(c|gnu)(89|90|99|11|17|18|2x|23)'
+    r'|-std=(c|gnu)\+\+(98|03|11|14|17|20|2a|23|2b)'
+    r'|-[DU][A-Za-z_]\w*(=[\w.+-]*)?)$'
+)
+_MAX_OPTIONS = 32
+
+# Languages whose compilers understand the allow-listed (GCC-style) flags
+OPTION_LANGUAGES = ('c', 'cpp')
+
+
+class BuildOptionsError(ValueError):
+    """Unknown build profile or a compiler option outside the allow-list"""
+
+
+class BuildProfile:
+    """Named compiler flags per language, with an optional faster compiler (used when installed)"""
+
+    def __init__(self, name: str, description: str, flags: Dict[str, List[str]],
+                 fast_compilers: Optional[Dict[str, Tuple[str, List[str]]]] = None):
+        self.name = name
+        self.description = description
+        self.flags = flags
+        self.fast_compilers = fast_compilers or {}
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            'name': self.name,
+            'description': self.description,
+            'flags': self.flags,
+            'fast_compilers': {language: tool for language, (tool, _) in self.fast_compilers.items()}
+        }
+
+
+PROFILES: Dict[str, BuildProfile] = {profile.name: profile for profile in [
+    BuildProfile(
+        'quick',
+        "Fastest compile for interactive runs: no optimisation, tcc for C when installed",
+        {'c': ['-O0', '-pipe', '-lm'], 'cpp': ['-O0', '-pipe'], 'rust': ['-C', 'opt-level=0']},
+        fast_compilers={'c': ('tcc', ['-lm'])}
+    ),
+    BuildProfile(
+        'judge',
+        "Optimised build for graded runs (statically linked C/C++)",
+        {'c': ['-O2', '-static', '-lm'], 'cpp': ['-O2', '-static'],
+         'rust': ['-C', f'opt-level={config.RUST_OPT_LEVEL}']}
+    ),
+    BuildProfile(
+        'debug',
+        "Debug info, warnings and undefined-behaviour checks",
+        {'c': ['-O0', '-g', '-Wall', '-Wextra', '-fsanitize=undefined', '-lm'],
+         'cpp': ['-O0', '-g', '-Wall', '-Wextra', '-fsanitize=undefined', '-D_GLIBCXX_ASSERTIONS'],
+         'rust': ['-C', 'opt-level=0', '-g', '-C', 'debug-assertions=on']}
+    ),
+]}
+
+
+def get_profile(name: Optional[str]) -> BuildProfile:
+    profile = PROFILES.get(name or config.BUILD_PROFILE_DEFAULT)
+    if profile is None:
+        raise BuildOptionsError(f"Unknown build profile '{name}'. Available: {', '.join(PROFILES)}")
+    return profile
+
+
+def parse_compiler_options(options: Optional[str]) -> List[str]:
+    """Split compiler_options and check every flag against the allow-list"""
+    try:
+        flags = shlex.split(options or '')
+    except ValueError as e:
+        raise BuildOptionsError(f"Invalid compiler options: {e}")
+    if len(flags) > _MAX_OPTIONS:
+        raise BuildOptionsError(f"At most {_MAX_OPTIONS} compiler options are allowed")
+    rejected = [flag for flag in flags if not _ALLOWED_FLAG.match(flag)]
+    if rejected:
+        raise BuildOptionsError(f"Compiler option not allowed: {' '.join(rejected)}")
+    return flags
+
+
+class BuildSettings:
+    """Compiler and flags for one compile; flags go after the source so -l options link"""
+
+    def __init__(self, profile: str, compiler: str, flags: List[str], custom: bool):
+        self.profile = profile
+        self.compiler = compiler
+        self.flags = flags
+        self.custom = custom  # user flags present: no shared artifacts such as PCHs
+
+
+def build_settings(language: str, compiler: str, profile: Optional[str] = None,
+                   compiler_options: Optional[str] = None) -> BuildSettings:
+    """Resolve profile + compiler_options for `language`, compiling with `compiler` by default.
+
+    Raises BuildOptionsError for an unknown profile or a disallowed option.
+    """
+    build_profile = get_profile(profile)
+    user_flags = parse_compiler_options(compiler_options)
+    if user_flags and language not in OPTION_LANGUAGES:
+        raise BuildOptionsError(f"compiler_options are not supported for {language}")
+    fast = build_profile.fast_compilers.get(language)
+    if fast is not None and not user_flags:
+        fast_path = toolchains.path(fast[0])
+        if fast_path:
+            return BuildSettings(build_profile.name, fast_path, list(fast[1]), custom=False)
+    flags = [*build_profile.flags.get(language, []), *user_flags]
+    return BuildSettings(build_profile.name, compiler, flags, custom=bool(user_flags))
+
@@ -0,0 +1,259 @@
+# src/core/cgroups.py
+import atexit
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from src.core.config import config
+
+logger = logging.getLogger(__name__)
+
+CONTROLLERS = ('memory', 'pids', 'cpu')
+_CPU_PERIOD = 100000  # microseconds
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _write(path: str, value: str) -> bool:
+    try:
+        with open(path, 'w') as f:
+            f.write(value)
+        return True
+    except OSError:
+        return False
+
+
+def _keyed(text: Optional[str], key: str) -> int:
+    """Value of `key` in a flat-keyed file such as cpu.stat or memory.events"""
+    for line in (text or '').splitlines():
+        name, _, value = line.partition(' ')
+        if name == key:
+            return int(value)
+    return 0
+
+
+def detect_root() -> Optional[str]:
+    """The cgroup v2 directory slots are created under: CGROUP_ROOT, else our own cgroup"""
+    if config.CGROUP_ROOT:
+        return config.CGROUP_ROOT
+    mount = None
+    for line in (_read('/proc/mounts') or '').splitlines():
+        fields = line.split()
+        if len(fields) >= 3 and fields[2] == 'cgroup2':
+            mount = fields[1]
+            break
+    own = next((line[3:] for line in (_read('/proc/self/cgroup') or '').splitlines()
+                if line.startswith('0::')), None)
+    if mount is None or own is None:
+        return None
+    return os.path.normpath(os.path.join(mount, own.strip().lstrip('/')))
+
+
+class SlotUsage:
+    """What one run used according to its cgroup (None where the kernel can't tell)"""
+
+    def __init__(self, cpu_time: Optional[float], peak_kb: Optional[int], oom_killed: bool):
+        self.cpu_time = cpu_time
+        self.peak_kb = peak_kb
+        self.oom_killed = oom_killed
+
+
+class CgroupSlot:
+    """A reusable leaf cgroup that one execution at a time runs in"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._peak_fd: Optional[int] = None
+        self._start: Tuple[int, int] = (0, 0)
+        self.running = False  # between begin() and end()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def configure(self, memory_kb: int, pids: int, cpu_cores: float) -> None:
+        _write(self._file('memory.max'), str(memory_kb * 1024) if memory_kb > 0 else 'max')
+        # Keep hogs out of swap: over memory.max they are OOM-killed instead
+        _write(self._file('memory.swap.max'), '0')
+        _write(self._file('pids.max'), str(pids) if pids > 0 else 'max')
+        quota = f'{int(cpu_cores * _CPU_PERIOD)} {_CPU_PERIOD}' if cpu_cores > 0 else f'max {_CPU_PERIOD}'
+        _write(self._file('cpu.max'), quota)
+
+    def attach(self, pid: int) -> bool:
+        """Move an already running (idle, pre-started) process into the slot"""
+        return _write(self._file('cgroup.procs'), str(pid))
+
+    def begin(self) -> None:
+        """Snapshot counters before a run; memory.peak is reset per file descriptor (Linux 6.12+)"""
+        self.running = True
+        self._start = (
+            _keyed(_read(self._file('cpu.stat')), 'usage_usec'),
+            _keyed(_read(self._file('memory.events')), 'oom_kill')
+        )
+        self._peak_fd = None
+        try:
+            fd = os.open(self._file('memory.peak'), os.O_RDWR)
+        except OSError:
+            return
+        try:
+            os.write(fd, b'reset\n')
+            self._peak_fd = fd
+        except OSError:
+            os.close(fd)  # older kernel: lifetime peak only, useless for a reused slot
+
+    def end(self) -> SlotUsage:
+        """Read what the run used and kill anything it left running in the slot"""
+        self.running = False
+        _write(self._file('cgroup.kill'), '1')
+        cpu_usec = _keyed(_read(self._file('cpu.stat')), 'usage_usec')
+        oom_kills = _keyed(_read(self._file('memory.events')), 'oom_kill')
+        peak_kb = None
+        if self._peak_fd is not None:
+            try:
+                peak_kb = int(os.pread(self._peak_fd, 64, 0)) // 1024
+            except (OSError, ValueError):
+                pass
+            finally:
+                os.close(self._peak_fd)
+                self._peak_fd = None
+        cpu_time = (cpu_usec - self._start[0]) / 1e6 if cpu_usec else None
+        return SlotUsage(cpu_time, peak_kb, oom_kills > self._start[1])
+
+
+class CgroupSlots:
+    """Pre-created cgroup v2 leaves, one per concurrent execution.
+
+    Layout under root (our own cgroup unless CGROUP_ROOT is set):
+    supervisor/ holds the server processes (cgroup v2 forbids processes in
+    a cgroup that delegates controllers), p<pid>/slot-N are this process's
+    slots. Each run takes a free slot, gets memory.max/pids.max/cpu.max set
+    from its limits and returns it afterwards; slots are created up front
+    and grown on demand. If cgroup v2 or the memory, pids and cpu
+    controllers are not available the slots are disabled and runs fall
+    back to plain processes.
+    """
+
+    def __init__(self, root: Optional[str], count: int, enabled: bool = True):
+        self.root = root
+        self.count = count
+        self.enabled = enabled and root is not None
+        self._free: List[CgroupSlot] = []
+        self._created = 0
+        self._ready = False
+        self._lock = threading.Lock()
+
+    @property
+    def base(self) -> str:
+        return os.path.join(self.root, f'p{os.getpid()}')
+
+    def setup(self) -> bool:
+        with self._lock:
+            if self._ready or not self.enabled:
+                return self.enabled
+            try:
+                self._prepare()
+            except OSError as e:
+                logger.warning(f"cgroup v2 slots disabled ({self.root}): {e}")
+                self.enabled = False
+                return False
+            self._ready = True
+            atexit.register(self.teardown)
+            return True
+
+    def acquire(self, memory_kb: Optional[int] = None) -> Optional[CgroupSlot]:
+        if not self.setup():
+            return None
+        with self._lock:
+            slot = self._free.pop() if self._free else None
+        if slot is None:
+            slot = self._create()
+        slot.configure(memory_kb or config.MAX_MEMORY, config.MAX_PROCESSES, config.CGROUP_CPU_CORES)
+        return slot
+
+    def release(self, slot: Optional[CgroupSlot]) -> None:
+        if slot is not None:
+            with self._lock:
+                self._free.append(slot)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {'enabled': self.enabled, 'root': self.root, 'slots': self._created, 'free': len(self._free)}
+
+    def teardown(self) -> None:
+        with self._lock:
+            slots, self._free = self._free, []
+        for slot in slots:
+            _write(os.path.join(slot.path, 'cgroup.kill'), '1')
+            try:
+                os.rmdir(slot.path)
+            except OSError:
+                pass
+        try:
+            os.rmdir(self.base)
+        except OSError:
+            pass
+
+    def _prepare(self) -> None:
+        available = (_read(os.path.join(self.root, 'cgroup.controllers')) or '').split()
+        missing = [name for name in CONTROLLERS if name not in available]
+        if missing:
+            raise OSError(f"controllers not delegated: {', '.join(missing)}")
+        enable = ' '.join(f'+{name}' for name in CONTROLLERS)
+
+        # No internal processes: park the server processes in a leaf first
+        supervisor = os.path.join(self.root, 'supervisor')
+        os.makedirs(supervisor, exist_ok=True)
+        for pid in (_read(os.path.join(self.root, 'cgroup.procs')) or '').split():
+            _write(os.path.join(supervisor, 'cgroup.procs'), pid)
+        if not _write(os.path.join(self.root, 'cgroup.subtree_control'), enable):
+            raise OSError(f"cannot enable controllers in {self.root}")
+
+        self._remove_dead()
+        os.makedirs(self.base, exist_ok=True)
+        if not _write(os.path.join(self.base, 'cgroup.subtree_control'), enable):
+            raise OSError(f"cannot enable controllers in {self.base}")
+        for _ in range(self.count):
+            self._free.append(self._create_locked())
+
+    def _remove_dead(self) -> None:
+        """Slots of worker processes that exited without tearing down"""
+        for owner in os.listdir(self.root):
+            if not (owner.startswith('p') and owner[1:].isdigit()) or os.path.exists(f'/proc/{owner[1:]}'):
+                continue
+            owner_path = os.path.join(self.root, owner)
+            for slot in os.listdir(owner_path):
+                slot_path = os.path.join(owner_path, slot)
+                if os.path.isdir(slot_path):
+                    _write(os.path.join(slot_path, 'cgroup.kill'), '1')
+                    try:
+                        os.rmdir(slot_path)
+                    except OSError:
+                        pass
+            try:
+                os.rmdir(owner_path)
+            except OSError:
+                pass
+
+    def _create(self) -> CgroupSlot:
+        with self._lock:
+            return self._create_locked()
+
+    def _create_locked(self) -> CgroupSlot:
+        path = os.path.join(self.base, f'slot-{self._created}')
+        self._created += 1
+        os.makedirs(path, exist_ok=True)
+        return CgroupSlot(path)
+
+
+# Global slot set used by run_bounded and the warm pools
+cgroup_slots = CgroupSlots(
+    detect_root() if config.CGROUPS_ENABLED else None,
+    count=config.CGROUP_SLOTS or (os.cpu_count() or 1),
+    enabled=config.CGROUPS_ENABLED
+)
@@ -0,0 +1,251 @@
+# src/core/compile_cache.py
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from src.core.config import config
+from src.core.toolchains import toolchains
+
+logger = logging.getLogger(__name__)
+
+
+def compiler_version(compiler: str) -> str:
+    """First line of a compiler's version banner, from the toolchain registry"""
+    return toolchains.version(compiler)
+
+
+class CompileCache:
+    """Content-addressed store of compiled artifacts with LRU eviction.
+
+    Each entry is a directory named after the cache key holding the artifacts
+    of one successful compile. Entries are copied out on a hit so a running
+    submission can never modify the cached copy.
+    """
+
+    def __init__(self, root: str, max_bytes: int, max_entries: int, enabled: bool = True):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def make_key(self, language: str, compiler: str, flags: List[str], source: str) -> str:
+        """Hash everything that can change the produced artifact"""
+        digest = hashlib.sha256()
+        for part in [language, compiler, compiler_version(compiler), *flags]:
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        digest.update(source.encode('utf-8'))
+        return digest.hexdigest()
+
+    def fetch(self, key: str, dest_dir: str) -> bool:
+        """Copy every artifact of an entry into dest_dir; returns False on a miss"""
+        entry_dir = self._lookup(key)
+        if entry_dir is None:
+            return False
+        try:
+            for name in os.listdir(entry_dir):
+                shutil.copy2(os.path.join(entry_dir, name), os.path.join(dest_dir, name))
+        except OSError:
+            # Evicted by another process between lookup and copy
+            self._forget(key)
+            return False
+        return True
+
+    def fetch_file(self, key: str, name: str, dest_path: str) -> bool:
+        """Copy a single named artifact to dest_path; returns False on a miss"""
+        entry_dir = self._lookup(key)
+        if entry_dir is None:
+            return False
+        try:
+            shutil.copy2(os.path.join(entry_dir, name), dest_path)
+        except OSError:
+            self._forget(key)
+            return False
+        return True
+
+    def store(self, key: str, artifacts: Dict[str, str]) -> None:
+        """Store artifacts (name -> path) produced by a successful compile"""
+        if not self.enabled:
+            return
+        self._ensure_loaded()
+        staging_dir = os.path.join(self.root, f".tmp-{uuid.uuid4().hex}")
+        try:
+            os.makedirs(staging_dir)
+            size = 0
+            for name, path in artifacts.items():
+                target = os.path.join(staging_dir, name)
+                shutil.copy2(path, target)
+                size += os.path.getsize(target)
+            os.rename(staging_dir, os.path.join(self.root, key))
+        except OSError:
+            # Another process stored the same key first, or the disk is unusable
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            return
+
+        with self._lock:
+            self._entries[key] = size
+            self._total_bytes += size
+            self.stores += 1
+            self._evict_locked()
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current disk usage"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stores': self.stores,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes
+            }
+
+    def _lookup(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        self._ensure_loaded()
+        entry_dir = os.path.join(self.root, key)
+
+        with self._lock:
+            if key not in self._entries and os.path.isdir(entry_dir):
+                # Stored by another worker process sharing the cache directory
+                size = self._dir_size(entry_dir)
+                self._entries[key] = size
+                self._total_bytes += size
+
+            if key not in self._entries:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        try:
+            os.utime(entry_dir)  # keeps LRU order across restarts
+        except OSError:
+            pass
+        return entry_dir
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            size = self._entries.pop(key, None)
+            if size is not None:
+                self._total_bytes -= size
+                self.hits -= 1
+                self.misses += 1
+
+    def _evict_locked(self) -> None:
+        while self._entries and (self._total_bytes > self.max_bytes or
+                                 len(self._entries) > self.max_entries):
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+            shutil.rmtree(os.path.join(self.root, key), ignore_errors=True)
+
+    def _ensure_loaded(self) -> None:
+        """Index entries left on disk by earlier runs, oldest first"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            os.makedirs(self.root, exist_ok=True)
+            found = []
+            for name in os.listdir(self.root):
+                path = os.path.join(self.root, name)
+                if name.startswith('.tmp-'):
+                    shutil.rmtree(path, ignore_errors=True)
+                elif os.path.isdir(path):
+                    found.append((os.path.getmtime(path), name, self._dir_size(path)))
+            for _, name, size in sorted(found):
+                self._entries[name] = size
+                self._total_bytes += size
+            self._evict_locked()
+            self._loaded = True
+            logger.info(f"Compile cache loaded {len(self._entries)} entries from {self.root}")
+
+    @staticmethod
+    def _dir_size(path: str) -> int:
+        total = 0
+        for name in os.listdir(path):
+            try:
+                total += os.path.getsize(os.path.join(path, name))
+            except OSError:
+                pass
+        return total
+
+
+class BuildCacheDir:
+    """A toolchain-managed cache directory (e.g. GOCACHE) kept under a size budget.
+
+    The toolchain owns the contents; we only delete the least recently
+    modified files when the directory outgrows max_bytes. Trimming runs at
+    most once per trim_interval seconds on a background thread.
+    """
+
+    def __init__(self, path: str, max_bytes: int, trim_interval: float = 60.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.trim_interval = trim_interval
+        self._last_trim = 0.0
+        self._lock = threading.Lock()
+
+    def maybe_trim(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_trim < self.trim_interval:
+                return
+            self._last_trim = now
+        threading.Thread(target=self.trim, name="build-cache-trim", daemon=True).start()
+
+    def trim(self) -> int:
+        """Delete oldest files until under budget; returns bytes freed"""
+        files = []
+        total = 0
+        for dirpath, _, filenames in os.walk(self.path):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        freed = 0
+        for _, size, path in sorted(files):
+            if total - freed <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+                freed += size
+            except OSError:
+                pass
+        if freed:
+            logger.info(f"Trimmed {freed} bytes from build cache {self.path}")
+        return freed
+
+
+# Global compile cache shared by CompilerManager backends and api.py
+compile_cache = CompileCache(
+    root=config.COMPILE_CACHE_DIR,
+    max_bytes=config.COMPILE_CACHE_MAX_BYTES,
+    max_entries=config.COMPILE_CACHE_MAX_ENTRIES,
+    enabled=config.COMPILE_CACHE_ENABLED
+)
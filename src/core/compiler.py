@@ -1,6 +1,10 @@
 # src/core/compiler.py (Fixed execute_code method)
 import logging
 from typing import Dict, Optional, List
+from src.core.build_profiles import BuildOptionsError, get_profile, parse_compiler_options
+from src.core.config import config
+from src.core.metrics import in_flight, language_label, observe_result
+from src.core.result_cache import result_cache
 from src.languages.c_cpp import CppLanguage, CLanguage
 from src.languages.python import PythonLanguage
 from src.languages.java import JavaLanguage
@@ -39,8 +43,17 @@ class CompilerManager:
 
     def execute_code(self, language_id: int, source_code: str = None, code: str = None, 
                     input_data: str = "", stdin: str = "", timeout: int = 30, 
-                    memory_limit: int = 256000, **kwargs) -> Dict:
-        """Execute code in the specified language - handles both 'code' and 'source_code' parameters"""
+                    memory_limit: int = 256000, use_cache: Optional[bool] = None,
+                    dataset: Optional[str] = None, build_profile: Optional[str] = None,
+                    compiler_options: Optional[str] = None, **kwargs) -> Dict:
+        """Execute code in the specified language - handles both 'code' and 'source_code' parameters
+
+        use_cache opts into result memoization (defaults to RESULT_CACHE_ENABLED).
+        dataset names a read-only SQL dataset to run against (SQL only).
+        build_profile (quick/judge/debug, default BUILD_PROFILE_DEFAULT) and the
+        allow-listed compiler_options apply to C and C++ (the profile also to Rust);
+        other languages ignore the profile.
+        """
         language = self.get_language(language_id)
         
         if not language:
@@ -65,13 +78,65 @@ class CompilerManager:
             # Handle both input parameter names
             actual_input = input_data if input_data else stdin
             
+            options = {}
+            if dataset:
+                if not isinstance(language, SQLLanguage):
+                    return {
+                        'success': False,
+                        'output': '',
+                        'error': 'Datasets are only available for SQL submissions',
+                        'exit_code': -1
+                    }
+                options['dataset'] = dataset
+            
+            try:
+                get_profile(build_profile)
+                user_flags = parse_compiler_options(compiler_options)
+            except BuildOptionsError as e:
+                return {
+                    'success': False,
+                    'output': '',
+                    'error': str(e),
+                    'exit_code': -1
+                }
+            if isinstance(language, (CLanguage, CppLanguage, RustLanguage)):
+                options['build_profile'] = build_profile
+            if isinstance(language, (CLanguage, CppLanguage)):
+                options['compiler_options'] = compiler_options
+            elif user_flags:
+                return {
+                    'success': False,
+                    'output': '',
+                    'error': 'Compiler options are only supported for C and C++ submissions',
+                    'exit_code': -1
+                }
+            
+            if use_cache is None:
+                use_cache = config.RESULT_CACHE_ENABLED
+            
+            if use_cache:
+                variant = ":".join(str(part) for part in (language_id, dataset, options.get('build_profile'),
+                                                          options.get('compiler_options')) if part)
+                cache_key = result_cache.make_key(variant, actual_code, actual_input, timeout, memory_limit)
+                cached = result_cache.get(cache_key)
+                if cached is not None:
+                    cached['cached'] = True
+                    observe_result(language_label(language_id), cached)
+                    return cached
+            
             # Execute the code using the language's execute method
-            result = language.execute(
-                code=actual_code,
-                input_data=actual_input,
-                timeout=timeout,
-                memory_limit=memory_limit
-            )
+            with in_flight(language_label(language_id)):
+                result = language.execute(
+                    code=actual_code,
+                    input_data=actual_input,
+                    timeout=timeout,
+                    memory_limit=memory_limit,
+                    **options
+                )
+            observe_result(language_label(language_id), result)
+            
+            if use_cache:
+                result_cache.set(cache_key, result)
             return result
             
         except Exception as e:
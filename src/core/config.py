@@ -15,20 +15,94 @@ class Config:
     MAX_CPU_TIME = float(os.getenv("MAX_CPU_TIME", "30.0"))
     MAX_MEMORY = int(os.getenv("MAX_MEMORY", "512000"))  # KB
     MAX_PROCESSES = int(os.getenv("MAX_PROCESSES", "50"))
+    CGROUPS_ENABLED = os.getenv("CGROUPS_ENABLED", "true").lower() == "true"  # used when cgroup v2 is delegated
+    CGROUP_ROOT = os.getenv("CGROUP_ROOT", "")  # default: the server's own cgroup
+    CGROUP_SLOTS = int(os.getenv("CGROUP_SLOTS", "0"))  # 0 = one per CPU, grown on demand
+    CGROUP_CPU_CORES = float(os.getenv("CGROUP_CPU_CORES", "1.0"))  # cpu.max per run
     
     # Execution Settings
     DEFAULT_TIMEOUT = float(os.getenv("DEFAULT_TIMEOUT", "5.0"))
     TEMP_DIR = os.getenv("TEMP_DIR", "/tmp/compiler")
+    WORKSPACE_DIR = os.getenv("WORKSPACE_DIR", os.path.join(TEMP_DIR, "workspaces"))  # mount a tmpfs here
+    WORKSPACE_POOL_SIZE = int(os.getenv("WORKSPACE_POOL_SIZE", "16"))
+    WORKSPACE_SWEEP_INTERVAL = float(os.getenv("WORKSPACE_SWEEP_INTERVAL", "300"))
+    WORKSPACE_MAX_AGE = float(os.getenv("WORKSPACE_MAX_AGE", "3600"))  # untracked leftovers older than this are removed
+    TOOLCHAIN_RETRY_INTERVAL = float(os.getenv("TOOLCHAIN_RETRY_INTERVAL", "60"))  # re-probe missing tools
+    HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", "60"))  # 0 disables background self-tests
+    HEALTH_PROBE_HISTORY = int(os.getenv("HEALTH_PROBE_HISTORY", "20"))
+    API_LANGUAGE_CONCURRENCY = int(os.getenv("API_LANGUAGE_CONCURRENCY", str(os.cpu_count() or 2)))
+    OUTPUT_LIMIT_BYTES = int(os.getenv("OUTPUT_LIMIT_BYTES", str(1024 * 1024)))  # per stream
+    OUTPUT_TAIL_BYTES = int(os.getenv("OUTPUT_TAIL_BYTES", "4096"))
+    
+    # Execution Pool Settings (0 = size from CPU count and memory budget)
+    EXECUTION_WORKERS = int(os.getenv("EXECUTION_WORKERS", "0"))
+    EXECUTION_MEMORY_BUDGET_MB = int(os.getenv("EXECUTION_MEMORY_BUDGET_MB", "0"))
+    EXECUTION_MEMORY_PER_JOB_MB = int(os.getenv("EXECUTION_MEMORY_PER_JOB_MB", "256"))
+    EXECUTION_LANGUAGE_LIMIT = int(os.getenv("EXECUTION_LANGUAGE_LIMIT", "0"))  # 0 = only the languages listed below are capped
+    EXECUTION_LANGUAGE_LIMITS = os.getenv("EXECUTION_LANGUAGE_LIMITS", "")  # e.g. "7:1,4:2"
+    
+    # Compile Cache Settings
+    COMPILE_CACHE_ENABLED = os.getenv("COMPILE_CACHE_ENABLED", "true").lower() == "true"
+    COMPILE_CACHE_DIR = os.getenv("COMPILE_CACHE_DIR", os.path.join(TEMP_DIR, "compile-cache"))
+    COMPILE_CACHE_MAX_BYTES = int(os.getenv("COMPILE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+    COMPILE_CACHE_MAX_ENTRIES = int(os.getenv("COMPILE_CACHE_MAX_ENTRIES", "5000"))
+    GO_BUILD_CACHE_DIR = os.getenv("GO_BUILD_CACHE_DIR", os.path.join(TEMP_DIR, "gocache"))
+    GO_BUILD_CACHE_MAX_BYTES = int(os.getenv("GO_BUILD_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+    BUILD_PROFILE_DEFAULT = os.getenv("BUILD_PROFILE_DEFAULT", "judge")  # queued submissions
+    INTERACTIVE_BUILD_PROFILE = os.getenv("INTERACTIVE_BUILD_PROFILE", "quick")  # api.py /api/compile
+    RUST_EDITION = os.getenv("RUST_EDITION", "2021")
+    RUST_OPT_LEVEL = os.getenv("RUST_OPT_LEVEL", "2")  # judge profile; quick and debug use 0
+    RUST_CRATES_ENABLED = os.getenv("RUST_CRATES_ENABLED", "true").lower() == "true"
+    RUST_CRATES = os.getenv("RUST_CRATES", "rand=0.9,itertools=0.14,regex=1")  # prebuilt, linked offline
+    RUST_CRATES_DIR = os.getenv("RUST_CRATES_DIR", os.path.join(TEMP_DIR, "rust-crates"))
+    CPP_PCH_ENABLED = os.getenv("CPP_PCH_ENABLED", "true").lower() == "true"
+    CPP_PCH_DIR = os.getenv("CPP_PCH_DIR", os.path.join(TEMP_DIR, "pch"))  # ~100 MB per header set and flag profile
+    
+    # Result Cache Settings (opt-in: identical runs return the memoized result)
+    RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "false").lower() == "true"
+    RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", "300"))
+    RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "1000"))
+    RESULT_CACHE_REDIS = os.getenv("RESULT_CACHE_REDIS", "false").lower() == "true"
+    
+    # Warm Interpreter Pools (0 disables the pool and falls back to a cold start per run)
+    PYTHON_INTERPRETER = os.getenv("PYTHON_INTERPRETER", "python" if os.name == "nt" else "python3")
+    PYTHON_POOL_SIZE = int(os.getenv("PYTHON_POOL_SIZE", "4"))
+    JAVA_POOL_SIZE = int(os.getenv("JAVA_POOL_SIZE", "2"))
+    JAVA_POOL_WARMUP = os.getenv("JAVA_POOL_WARMUP", "true").lower() == "true"
+    JAVA_POOL_JVM_ARGS = os.getenv("JAVA_POOL_JVM_ARGS", "-XX:+UseSerialGC -Xmx256m").split()
+    JAVA_RUNNER_DIR = os.getenv("JAVA_RUNNER_DIR", os.path.join(TEMP_DIR, "java-runner"))
+    SQL_WORKERS = int(os.getenv("SQL_WORKERS", "4"))  # warm SQL worker processes; 0 runs SQL in-process
+    SQL_POOL_SIZE = int(os.getenv("SQL_POOL_SIZE", "4"))  # pre-cloned sample databases
+    SQL_MAX_ROWS = int(os.getenv("SQL_MAX_ROWS", "1000"))  # rows formatted per result set; the rest are counted
+    SQL_FETCH_SIZE = int(os.getenv("SQL_FETCH_SIZE", "500"))
+    SQL_PROGRESS_STEPS = int(os.getenv("SQL_PROGRESS_STEPS", "10000"))  # VM instructions between deadline checks
+    DATASETS_DIR = os.getenv("DATASETS_DIR", os.path.join(TEMP_DIR, "datasets"))
+    SQL_DATASET_MMAP_SIZE = int(os.getenv("SQL_DATASET_MMAP_SIZE", str(1024 * 1024 * 1024)))
+    SQL_DATASETS_PREPARE = os.getenv("SQL_DATASETS_PREPARE", "true").lower() == "true"  # build missing datasets at worker start
+    
+    # Submission Queue Settings
+    SUBMISSION_TTL = int(os.getenv("SUBMISSION_TTL", "3600"))
+    QUEUE_MAX_DEPTH = int(os.getenv("QUEUE_MAX_DEPTH", "1000"))
+    QUEUE_RETRY_AFTER = int(os.getenv("QUEUE_RETRY_AFTER", "5"))
+    QUEUE_VISIBILITY_TIMEOUT = int(os.getenv("QUEUE_VISIBILITY_TIMEOUT", "60"))
+    QUEUE_MAX_ATTEMPTS = int(os.getenv("QUEUE_MAX_ATTEMPTS", "3"))
+    QUEUE_SWEEP_INTERVAL = float(os.getenv("QUEUE_SWEEP_INTERVAL", "30"))
+    WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", "1"))
+    WORKER_SLOTS = int(os.getenv("WORKER_SLOTS", "0"))  # 0 = node capacity split across WORKER_PROCESSES
+    WORKER_METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", "9100"))  # 0 disables; +1 per extra process
+    BATCH_MAX_CASES = int(os.getenv("BATCH_MAX_CASES", "100"))
+    EVENT_STREAM_MAXLEN = int(os.getenv("EVENT_STREAM_MAXLEN", "1000"))
+    EVENT_OUTPUT_CHUNK = int(os.getenv("EVENT_OUTPUT_CHUNK", "4096"))
     
     # Language Settings
     LANGUAGE_CONFIG: Dict[int, Dict[str, Any]] = {
-        1: {"name": "C", "extension": ".c", "compile_cmd": "gcc {source} -o {executable}"},
-        2: {"name": "C++", "extension": ".cpp", "compile_cmd": "g++ {source} -o {executable}"},
+        1: {"name": "C", "extension": ".c", "compile_cmd": "gcc {source} -o {executable} {flags}"},
+        2: {"name": "C++", "extension": ".cpp", "compile_cmd": "g++ {source} -o {executable} {flags}"},
         3: {"name": "Python", "extension": ".py", "run_cmd": "python {source}"},
         4: {"name": "Java", "extension": ".java", "compile_cmd": "javac {source}", "run_cmd": "java {main_class}"},
         5: {"name": "JavaScript", "extension": ".js", "run_cmd": "node {source}"},
         6: {"name": "Go", "extension": ".go", "compile_cmd": "go build -o {executable} {source}"},
-        7: {"name": "Rust", "extension": ".rs", "compile_cmd": "rustc -o {executable} {source}"},
+        7: {"name": "Rust", "extension": ".rs", "compile_cmd": "rustc --edition 2021 {source} -o {executable} {flags}"},
         8: {"name": "SQL", "extension": ".sql", "run_cmd": "sqlite3"}
     }
 
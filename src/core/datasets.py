@@ -0,0 +1,181 @@
+# src/core/datasets.py
+import logging
+import os
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+from typing import Callable, Dict, List, Optional
+
+from src.core.config import config
+
+logger = logging.getLogger(__name__)
+
+_NAME = re.compile(r'^[A-Za-z0-9_-]+$')
+
+Builder = Callable[[sqlite3.Connection], None]
+
+
+class DatasetNotFound(LookupError):
+    pass
+
+
+def build_shop(connection: sqlite3.Connection, users: int = 100_000, products: int = 10_000,
+               orders: int = 1_000_000) -> None:
+    """users/products/orders at exercise scale, same columns as the sample fixture"""
+    rng = random.Random(42)
+    categories = ['Electronics', 'Education', 'Home', 'Garden', 'Toys', 'Sports', 'Clothing', 'Food']
+    connection.executescript("""
+        CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT NOT NULL, email TEXT, age INTEGER);
+        CREATE TABLE products (id INTEGER PRIMARY KEY, name TEXT NOT NULL, price REAL, category TEXT);
+        CREATE TABLE orders (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER REFERENCES users (id),
+            product_id INTEGER REFERENCES products (id),
+            quantity INTEGER,
+            order_date TEXT
+        );
+    """)
+    connection.executemany(
+        "INSERT INTO users VALUES (?, ?, ?, ?)",
+        ((i, f'User {i}', f'user{i}@email.com', rng.randint(18, 80)) for i in range(1, users + 1))
+    )
+    connection.executemany(
+        "INSERT INTO products VALUES (?, ?, ?, ?)",
+        ((i, f'Product {i}', round(rng.uniform(1, 2000), 2), rng.choice(categories))
+         for i in range(1, products + 1))
+    )
+    connection.executemany(
+        "INSERT INTO orders VALUES (?, ?, ?, ?, ?)",
+        ((i, rng.randint(1, users), rng.randint(1, products), rng.randint(1, 5),
+          f'2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}') for i in range(1, orders + 1))
+    )
+    connection.executescript("""
+        CREATE INDEX orders_user_id ON orders (user_id);
+        CREATE INDEX orders_product_id ON orders (product_id);
+    """)
+
+
+# Datasets prepare() can build; any other <name>.db dropped into DATASETS_DIR is served as-is
+BUILDERS: Dict[str, Builder] = {
+    'shop': build_shop,
+}
+
+
+def _deny_attach(action: int, *_) -> int:
+    if action in (sqlite3.SQLITE_ATTACH, sqlite3.SQLITE_DETACH):
+        return sqlite3.SQLITE_DENY
+    return sqlite3.SQLITE_OK
+
+
+class DatasetRegistry:
+    """Named, read-only SQLite databases that SQL runs ATTACH instead of copying.
+
+    Each dataset is a file in `directory`, built once. Runs open it with
+    mode=ro&immutable=1 and a large mmap_size, so concurrent runs read the
+    same OS page cache and nothing is copied per submission. The run's own
+    main schema is an empty in-memory scratch database: unqualified CREATE
+    TABLE and writes land there, and writes to dataset tables fail.
+    """
+
+    SCHEMA = 'dataset'
+
+    def __init__(self, directory: str, mmap_size: int):
+        self.directory = directory
+        self.mmap_size = mmap_size
+
+    def path(self, name: str) -> str:
+        if not _NAME.match(name or ''):
+            raise DatasetNotFound(f"Invalid dataset name: {name!r}")
+        path = os.path.join(self.directory, f'{name}.db')
+        if not os.path.isfile(path):
+            raise DatasetNotFound(f"Unknown dataset '{name}'. Available: {', '.join(self.names()) or 'none'}")
+        return path
+
+    def names(self) -> List[str]:
+        try:
+            entries = os.listdir(self.directory)
+        except OSError:
+            return []
+        return sorted(entry[:-3] for entry in entries if entry.endswith('.db') and _NAME.match(entry[:-3]))
+
+    def describe(self) -> List[Dict[str, object]]:
+        datasets = []
+        for name in self.names():
+            connection = self.connect(name)
+            try:
+                tables = [row[0] for row in connection.execute(
+                    f"SELECT name FROM {self.SCHEMA}.sqlite_master WHERE type = 'table' ORDER BY name")]
+            finally:
+                connection.close()
+            datasets.append({'name': name, 'tables': tables, 'size': os.path.getsize(self.path(name))})
+        return datasets
+
+    def connect(self, name: str) -> sqlite3.Connection:
+        """Scratch in-memory connection with the dataset attached read-only"""
+        path = self.path(name)
+        connection = sqlite3.connect('file::memory:', uri=True, check_same_thread=False)
+        try:
+            uri = 'file:' + path.replace('?', '%3f').replace('#', '%23') + '?mode=ro&immutable=1'
+            connection.execute(f"ATTACH DATABASE ? AS {self.SCHEMA}", (uri,))
+            connection.execute(f"PRAGMA {self.SCHEMA}.mmap_size = {int(self.mmap_size)}")
+            # Submissions may not ATTACH further files or DETACH the dataset
+            connection.set_authorizer(_deny_attach)
+        except sqlite3.Error:
+            connection.close()
+            raise
+        return connection
+
+    def prepare(self, name: str, builder: Optional[Builder] = None, force: bool = False) -> str:
+        """Build a dataset file once; the atomic rename keeps open readers on the old file"""
+        if not _NAME.match(name or ''):
+            raise DatasetNotFound(f"Invalid dataset name: {name!r}")
+        target = os.path.join(self.directory, f'{name}.db')
+        if os.path.isfile(target) and not force:
+            return target
+        builder = builder or BUILDERS.get(name)
+        if builder is None:
+            raise DatasetNotFound(f"No builder for dataset '{name}'")
+
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=f'.{name}-', suffix='.db', dir=self.directory)
+        os.close(fd)
+        try:
+            connection = sqlite3.connect(tmp_path)
+            try:
+                connection.execute("PRAGMA journal_mode = OFF")
+                connection.execute("PRAGMA synchronous = OFF")
+                builder(connection)
+                connection.commit()
+                connection.execute("VACUUM")
+            finally:
+                connection.close()
+            os.chmod(tmp_path, 0o644)  # mkstemp creates 0600; sandboxed runs must read it
+            os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        logger.info(f"Prepared dataset {name} at {target}")
+        return target
+
+    def prepare_builtin(self) -> None:
+        for name in BUILDERS:
+            try:
+                self.prepare(name)
+            except (OSError, sqlite3.Error) as e:
+                logger.error(f"Could not prepare dataset {name}: {e}")
+
+
+# Global dataset registry
+datasets = DatasetRegistry(config.DATASETS_DIR, mmap_size=config.SQL_DATASET_MMAP_SIZE)
+
+
+if __name__ == "__main__":
+    # python -m src.core.datasets [--force] [name ...]
+    logging.basicConfig(level=logging.INFO)
+    args = sys.argv[1:]
+    force = '--force' in args
+    for dataset_name in [arg for arg in args if arg != '--force'] or list(BUILDERS):
+        print(datasets.prepare(dataset_name, force=force))
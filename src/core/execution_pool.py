@@ -0,0 +1,143 @@
+# src/core/execution_pool.py
+import asyncio
+import functools
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from src.core.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised by ExecutionPool.admit when every worker and queue slot is taken"""
+
+    def __init__(self, queue_depth: int, capacity: int, retry_after: int):
+        super().__init__(f"Execution queue full ({queue_depth}/{capacity})")
+        self.queue_depth = queue_depth
+        self.capacity = capacity
+        self.retry_after = retry_after
+
+
+def default_worker_count() -> int:
+    """Concurrent executions this node can afford: bounded by cores and by memory"""
+    cpus = os.cpu_count() or 1
+    budget_mb = config.EXECUTION_MEMORY_BUDGET_MB
+    if budget_mb <= 0:
+        try:
+            total_mb = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // (1024 * 1024)
+            budget_mb = int(total_mb * 0.75)
+        except (ValueError, OSError, AttributeError):
+            budget_mb = cpus * config.EXECUTION_MEMORY_PER_JOB_MB
+    return max(1, min(cpus, budget_mb // max(1, config.EXECUTION_MEMORY_PER_JOB_MB)))
+
+
+class ExecutionPool:
+    """Runs blocking executions on a bounded thread pool with admission control.
+
+    At most `workers` executions run at once, a language with an entry in
+    `language_limits` is capped at that limit, and at most `queue_size` more
+    may wait. Callers admit() first
+    (which raises QueueFullError instead of over-committing the node) and
+    then await run(), which releases the admission when it finishes.
+    """
+
+    def __init__(self, workers: int, queue_size: int, language_limits: Dict[int, int],
+                 default_language_limit: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.language_limits = language_limits
+        self.default_language_limit = default_language_limit
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="execution")
+        self._language_slots: Dict[int, asyncio.Semaphore] = {}
+        self._pending = 0
+        self._running = 0
+        self._avg_duration = 1.0
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.queue_size
+
+    def admit(self, language_id: int) -> None:
+        """Reserve a slot for one execution or raise QueueFullError"""
+        with self._lock:
+            if self._pending >= self.capacity:
+                self.rejected += 1
+                raise QueueFullError(self._pending, self.capacity, self._retry_after_locked())
+            self._pending += 1
+
+    def release(self) -> None:
+        """Give back an admission that will never reach run()"""
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, language_id: int, fn: Callable[..., Any], /, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) on a worker thread once the language has a free slot"""
+        try:
+            async with self._slots_for(language_id):
+                with self._lock:
+                    self._running += 1
+                started = time.monotonic()
+                try:
+                    loop = asyncio.get_running_loop()
+                    return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+                finally:
+                    elapsed = time.monotonic() - started
+                    with self._lock:
+                        self._running -= 1
+                        self._avg_duration = 0.8 * self._avg_duration + 0.2 * elapsed
+        finally:
+            self.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'running': self._running,
+                'queued': max(0, self._pending - self._running),
+                'queue_size': self.queue_size,
+                'capacity': self.capacity,
+                'rejected': self.rejected,
+                'avg_duration': round(self._avg_duration, 3)
+            }
+
+    def _slots_for(self, language_id: int) -> asyncio.Semaphore:
+        if language_id not in self._language_slots:
+            limit = self.language_limits.get(language_id, self.default_language_limit)
+            self._language_slots[language_id] = asyncio.Semaphore(limit)
+        return self._language_slots[language_id]
+
+    def _retry_after_locked(self) -> int:
+        # Time for the backlog ahead of a new request to drain across all workers
+        backlog = self._pending - self.workers + 1
+        return max(1, math.ceil(self._avg_duration * backlog / self.workers))
+
+
+def _parse_language_limits(spec: str) -> Dict[int, int]:
+    """Parse "7:1,4:2" (language_id:max_concurrent) into a dict"""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        language_id, _, limit = item.partition(':')
+        try:
+            limits[int(language_id)] = max(1, int(limit))
+        except ValueError:
+            logger.warning(f"Ignoring malformed EXECUTION_LANGUAGE_LIMITS entry: {item}")
+    return limits
+
+
+def build_execution_pool(workers: int = 0, queue_size: int = 0) -> ExecutionPool:
+    """Create a pool sized from config; workers=0 means EXECUTION_WORKERS or the node default"""
+    workers = workers or config.EXECUTION_WORKERS or default_worker_count()
+    return ExecutionPool(
+        workers=workers,
+        queue_size=queue_size,
+        language_limits=_parse_language_limits(config.EXECUTION_LANGUAGE_LIMITS),
+        default_language_limit=config.EXECUTION_LANGUAGE_LIMIT or workers
+    )
@@ -0,0 +1,112 @@
+# src/core/health_prober.py
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+RunTest = Callable[[str, str], Awaitable[Dict[str, Any]]]
+
+
+class ProbeRecord:
+    """Latest self-test of one language plus a bounded history for trends"""
+
+    def __init__(self, language: str, history: int):
+        self.language = language
+        self.last: Optional[Dict[str, Any]] = None
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=history)
+
+    def add(self, passed: bool, latency: float, result: Dict[str, Any]) -> None:
+        self.last = {
+            'passed': passed,
+            'latency': round(latency, 4),
+            'checked_at': time.time(),
+            'result': result
+        }
+        self.history.append({k: self.last[k] for k in ('passed', 'latency', 'checked_at')})
+
+    def to_dict(self) -> Dict[str, Any]:
+        latencies = sorted(entry['latency'] for entry in self.history)
+        passes = sum(entry['passed'] for entry in self.history)
+        return {
+            'passed': self.last['passed'] if self.last else None,
+            'latency': self.last['latency'] if self.last else None,
+            'checked_at': self.last['checked_at'] if self.last else None,
+            'trend': {
+                'samples': len(self.history),
+                'pass_rate': round(passes / len(self.history), 3) if self.history else None,
+                'avg_latency': round(sum(latencies) / len(latencies), 4) if latencies else None,
+                'max_latency': latencies[-1] if latencies else None
+            }
+        }
+
+
+class HealthProber:
+    """Runs each language's self-test program in the background.
+
+    Health and self-test endpoints answer from the recorded results, so load
+    balancer probes never pay for a compile. probe(language) and probe_all()
+    force a fresh run; languages are probed one at a time so the prober never
+    competes with itself for execution slots.
+    """
+
+    def __init__(self, test_codes: Dict[str, str], run_test: RunTest, interval: float, history: int):
+        self.test_codes = test_codes
+        self.run_test = run_test
+        self.interval = interval
+        self.records = {language: ProbeRecord(language, history) for language in test_codes}
+        self._task: Optional[asyncio.Task] = None
+        self._locks = {language: asyncio.Lock() for language in test_codes}
+
+    async def probe(self, language: str) -> Dict[str, Any]:
+        """Run the self-test now and record it; concurrent callers share one run"""
+        lock = self._locks[language]
+        if lock.locked():
+            async with lock:
+                return self.records[language].last
+        async with lock:
+            started = time.monotonic()
+            try:
+                result = await self.run_test(language, self.test_codes[language])
+            except Exception as e:
+                logger.error(f"Self-test for {language} raised: {e}")
+                result = {'stdout': '', 'stderr': str(e), 'exit_code': -1, 'status': 'error'}
+            passed = result.get('exit_code') == 0 and 'OK' in (result.get('stdout') or '')
+            self.records[language].add(passed, time.monotonic() - started, result)
+            if not passed:
+                logger.warning(f"Self-test for {language} failed: {result.get('stderr', '')[:200]}")
+            return self.records[language].last
+
+    async def probe_all(self) -> None:
+        for language in self.test_codes:
+            await self.probe(language)
+
+    async def latest(self, language: str) -> Dict[str, Any]:
+        """Cached self-test, running one only if the language was never probed"""
+        return self.records[language].last or await self.probe(language)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        return {language: record.to_dict() for language, record in self.records.items()}
+
+    def start(self) -> None:
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.probe_all()
+            except Exception as e:
+                logger.error(f"Health probe cycle failed: {e}")
+            await asyncio.sleep(self.interval)
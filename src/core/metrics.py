@@ -0,0 +1,137 @@
+# src/core/metrics.py
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from src.core.config import config
+
+logger = logging.getLogger(__name__)
+
+_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+PHASE_SECONDS = Histogram(
+    "compiler_phase_seconds",
+    "Wall time per execution phase (queue_wait, compile, run, cleanup)",
+    ["language", "phase"],
+    buckets=_BUCKETS
+)
+EXECUTIONS = Counter(
+    "compiler_executions_total",
+    "Finished executions by outcome (success, error, compile_error, timeout, output_limit, cached)",
+    ["language", "outcome"]
+)
+IN_FLIGHT = Gauge(
+    "compiler_executions_in_flight",
+    "Executions currently running",
+    ["language"]
+)
+QUEUE_DEPTH = Gauge(
+    "compiler_queue_depth",
+    "Submissions in the Redis queue",
+    ["state"]
+)
+
+
+# api.py accepts both spellings; the worker's language 2 is named "C++"
+_LABEL_ALIASES = {"c++": "cpp"}
+
+
+def language_label(language_id: Any) -> str:
+    """Metric label for a language id (src/ API) or name (api.py), the same for both paths"""
+    if isinstance(language_id, int):
+        language_id = config.LANGUAGE_CONFIG.get(language_id, {}).get("name", language_id)
+    label = str(language_id).lower()
+    return _LABEL_ALIASES.get(label, label)
+
+
+def outcome_of(result: Dict[str, Any]) -> str:
+    if result.get("cached"):
+        return "cached"
+    if result.get("output_limit_exceeded") or result.get("status") == "output_limit_exceeded":
+        return "output_limit"
+    if result.get("memory_limit_exceeded") or result.get("status") == "memory_limit_exceeded":
+        return "memory_limit"
+    message = (result.get("error") or result.get("stderr") or "").lower()
+    if result.get("status") == "timeout" or (result.get("exit_code") == -1 and "timeout" in message):
+        return "timeout"
+    if result.get("compilation_error"):
+        return "compile_error"
+    return "success" if result.get("exit_code") == 0 else "error"
+
+
+def observe_result(language: str, result: Dict[str, Any]) -> None:
+    """Record the outcome and the compile/run timings reported in result['phases']"""
+    EXECUTIONS.labels(language, outcome_of(result)).inc()
+    for phase, usage in (result.get("phases") or {}).items():
+        if usage and usage.get("wall_time") is not None:
+            PHASE_SECONDS.labels(language, phase).observe(usage["wall_time"])
+
+
+@contextmanager
+def in_flight(language: str) -> Iterator[None]:
+    gauge = IN_FLIGHT.labels(language)
+    gauge.inc()
+    try:
+        yield
+    finally:
+        gauge.dec()
+
+
+@contextmanager
+def timed_phase(language: str, phase: str) -> Iterator[None]:
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        PHASE_SECONDS.labels(language, phase).observe(time.monotonic() - started)
+
+
+class _StatsCollector:
+    """Exports the counters the caches and pools already keep, read at scrape time"""
+
+    def collect(self):
+        from src.core.compile_cache import compile_cache
+        from src.core.precompiled_headers import precompiled_headers
+        from src.core.result_cache import result_cache
+
+        lookups = CounterMetricFamily("compiler_cache_lookups", "Cache lookups by result", labels=["cache", "result"])
+        for name, cache in (("compile", compile_cache), ("result", result_cache), ("pch", precompiled_headers)):
+            stats = cache.stats()
+            lookups.add_metric([name, "hit"], stats["hits"])
+            lookups.add_metric([name, "miss"], stats["misses"])
+        yield lookups
+
+        from src.languages.java import _java_pool
+        from src.languages.python import python_pool
+        from src.languages.sql import sample_database, sql_pool
+
+        warm = GaugeMetricFamily("compiler_warm_pool_idle", "Idle pre-started workers", labels=["pool"])
+        starts = CounterMetricFamily("compiler_warm_pool_starts", "Jobs by worker start type", labels=["pool", "start"])
+        for pool in filter(None, (python_pool, _java_pool, sql_pool, sample_database)):
+            stats = pool.stats()
+            warm.add_metric([pool.name], stats["idle"])
+            starts.add_metric([pool.name, "warm"], stats["warm_hits"])
+            starts.add_metric([pool.name, "cold"], stats["cold_starts"])
+        yield warm
+        yield starts
+
+        from src.core.cgroups import cgroup_slots
+
+        slots = cgroup_slots.stats()
+        if slots["enabled"]:
+            gauge = GaugeMetricFamily("compiler_cgroup_slots", "cgroup v2 execution slots by state", labels=["state"])
+            gauge.add_metric(["free"], slots["free"])
+            gauge.add_metric(["busy"], slots["slots"] - slots["free"])
+            yield gauge
+
+
+REGISTRY.register(_StatsCollector())
+
+
+def metrics_payload() -> Tuple[bytes, str]:
+    """Body and content type for a /metrics response"""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,393 @@
+# src/core/output_capture.py
+import asyncio
+import functools
+import os
+import select
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from src.core.cgroups import CgroupSlot, cgroup_slots
+from src.core.config import config
+
+_CHUNK = 64 * 1024
+_RSS_SAMPLE_INTERVAL = 0.01
+
+OutputListener = Callable[[str, bytes], None]
+_output_listener: ContextVar[Optional[OutputListener]] = ContextVar("output_listener", default=None)
+
+
+class BoundedBuffer:
+    """Keeps at most `limit` bytes of a stream: the head plus a rolling tail.
+
+    feed() returns False once the stream has produced more than `limit`
+    bytes, at which point the caller should kill the producer.
+    """
+
+    def __init__(self, limit: int, tail: int):
+        self.limit = limit
+        self.tail_size = min(tail, limit)
+        self.total = 0
+        self._head = bytearray()
+        self._tail: deque = deque()
+        self._tail_len = 0
+
+    @property
+    def exceeded(self) -> bool:
+        return self.total > self.limit
+
+    def feed(self, data: bytes) -> bool:
+        self.total += len(data)
+        room = self.limit - self.tail_size - len(self._head)
+        if room > 0:
+            self._head += data[:room]
+            data = data[room:]
+        if data and self.tail_size:
+            self._tail.append(data)
+            self._tail_len += len(data)
+            while self._tail_len - len(self._tail[0]) >= self.tail_size:
+                self._tail_len -= len(self._tail.popleft())
+        return not self.exceeded
+
+    def getvalue(self) -> bytes:
+        tail = b"".join(self._tail)[-self.tail_size:] if self.tail_size else b""
+        if not self.exceeded:
+            return bytes(self._head) + tail
+        omitted = self.total - len(self._head) - len(tail)
+        return bytes(self._head) + f"\n... [output truncated, {omitted} bytes omitted] ...\n".encode() + tail
+
+
+class BoundedProcess(subprocess.CompletedProcess):
+    """CompletedProcess that also reports the output cap and resource usage.
+
+    wall_time and cpu_time (user+sys) are seconds, max_rss_kb is the peak
+    resident set of the process and the children it waited for. cpu_time and
+    max_rss_kb are None where wait4 is unavailable (Windows). In a cgroup
+    slot both come from the cgroup, and memory_limit_exceeded reports an
+    OOM kill at memory.max.
+    """
+
+    def __init__(self, args, returncode, stdout, stderr, output_limit_exceeded: bool = False,
+                 wall_time: Optional[float] = None, cpu_time: Optional[float] = None,
+                 max_rss_kb: Optional[int] = None, memory_limit_exceeded: bool = False):
+        super().__init__(args, returncode, stdout, stderr)
+        self.output_limit_exceeded = output_limit_exceeded
+        self.memory_limit_exceeded = memory_limit_exceeded
+        self.wall_time = wall_time
+        self.cpu_time = cpu_time
+        self.max_rss_kb = max_rss_kb
+
+
+def _read_peak_rss_kb(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def _tree_peak_rss_kb(pid: int) -> int:
+    """Largest VmHWM among pid and its descendants (e.g. cc1 under gcc)"""
+    peak, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        peak = max(peak, _read_peak_rss_kb(current))
+        try:
+            with open(f"/proc/{current}/task/{current}/children") as f:
+                pending.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError):
+            pass
+    return peak
+
+
+def _watch_peak_rss(pid: int) -> int:
+    """Sample the tree's VmHWM until pid exits; waiting on a pidfd adds no exit latency"""
+    try:
+        pidfd = os.pidfd_open(pid)
+    except (AttributeError, OSError):
+        return 0
+    peak = 0
+    try:
+        while True:
+            peak = max(peak, _tree_peak_rss_kb(pid))
+            if select.select([pidfd], [], [], _RSS_SAMPLE_INTERVAL)[0]:
+                return peak
+    finally:
+        os.close(pidfd)
+
+
+def _reap(process: subprocess.Popen, usage: list) -> None:
+    """Wait for the process with wait4 so its rusage is not lost to waitpid.
+
+    A child's ru_maxrss never drops below the peak RSS of the process that
+    spawned it (Linux carries the old image's high-water mark across exec),
+    so below that floor the sampled VmHWM of the process tree is used instead
+    (None when the process exited before it could be sampled).
+    """
+    if not hasattr(os, "wait4"):
+        process.wait()
+        return
+    import resource  # POSIX only, like wait4
+    inherited = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    sampled = _watch_peak_rss(process.pid)
+    try:
+        _, status, rusage = os.wait4(process.pid, 0)
+    except ChildProcessError:
+        process.wait()
+        return
+    process.returncode = os.waitstatus_to_exitcode(status)
+    max_rss = rusage.ru_maxrss
+    if max_rss <= inherited and sys.platform.startswith("linux"):
+        # 0 means it exited before the first sample: too short to measure
+        max_rss = sampled or None
+    elif sys.platform == "darwin":
+        # ru_maxrss is kilobytes on Linux but bytes on macOS
+        max_rss //= 1024
+    usage.append((rusage.ru_utime + rusage.ru_stime, max_rss))
+
+
+def kill_process_group(process: subprocess.Popen) -> None:
+    """SIGKILL the process and whatever it forked (children start in their own session)"""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (AttributeError, ProcessLookupError, PermissionError):
+        # No group of its own (or Windows): at least the process itself
+        process.kill()
+
+
+def _decode(data: bytes, text: bool):
+    return data.decode('utf-8', errors='replace') if text else data
+
+
+@contextmanager
+def stream_output(listener: Optional[OutputListener]) -> Iterator[None]:
+    """Pass what runs in this context print to listener("stdout"|"stderr", data) as it is read.
+
+    The listener is called on the capture threads and sees at most the output
+    cap of each stream. stream_output(None) turns it off, e.g. for compiles.
+    """
+    token = _output_listener.set(listener)
+    try:
+        yield
+    finally:
+        _output_listener.reset(token)
+
+
+@contextmanager
+def stream_stdout_only() -> Iterator[None]:
+    """Keep streaming stdout but not stderr, for workers that report on stderr"""
+    listener = _output_listener.get()
+
+    def stdout_listener(stream: str, data: bytes) -> None:
+        if stream == "stdout":
+            listener(stream, data)
+
+    with stream_output(stdout_listener if listener is not None else None):
+        yield
+
+
+@contextmanager
+def execution_slot(memory_limit: Optional[int] = None) -> Iterator[Optional[CgroupSlot]]:
+    """A cgroup slot limited to memory_limit KB (MAX_MEMORY if unset), or None without cgroup v2"""
+    slot = cgroup_slots.acquire(memory_limit)
+    try:
+        if slot is not None:
+            slot.begin()
+        yield slot
+    finally:
+        if slot is not None and slot.running:
+            # The run never got to communicate_bounded (e.g. the spawn failed)
+            slot.end()
+        cgroup_slots.release(slot)
+
+
+def communicate_bounded(process: subprocess.Popen, input: Optional[bytes], timeout: float,
+                        limit: Optional[int] = None, text: bool = False,
+                        slot: Optional[CgroupSlot] = None) -> BoundedProcess:
+    """Like process.communicate() but reads incrementally and kills on overflow.
+
+    Raises subprocess.TimeoutExpired after killing the process, like subprocess.run.
+    Whatever the process leaves behind in its process group (or, with a slot
+    it already runs in, its cgroup) is killed once it exits, so a background
+    child can't hold the pipes open; the pipes are drained against the same
+    deadline. With a slot, usage is read from the cgroup.
+    """
+    limit = config.OUTPUT_LIMIT_BYTES if limit is None else limit
+    buffers = [BoundedBuffer(limit, config.OUTPUT_TAIL_BYTES) for _ in range(2)]
+    overflow = threading.Event()
+    listener = _output_listener.get()
+
+    def pump(stream, buffer: BoundedBuffer, name: str):
+        try:
+            while True:
+                data = stream.read1(_CHUNK) if hasattr(stream, "read1") else stream.read(_CHUNK)
+                if not data:
+                    break
+                if listener is not None and buffer.total < buffer.limit:
+                    listener(name, data[:buffer.limit - buffer.total])
+                if not buffer.feed(data):
+                    overflow.set()
+                    kill_process_group(process)
+                    break
+        finally:
+            stream.close()
+
+    def feed_stdin():
+        try:
+            if input:
+                process.stdin.write(input)
+            process.stdin.close()
+        except (BrokenPipeError, OSError, ValueError):
+            pass
+
+    started = time.monotonic()
+    deadline = started + timeout
+    usage = []
+    waiter = threading.Thread(target=_reap, args=(process, usage), daemon=True)
+    threads = [threading.Thread(target=pump, args=(process.stdout, buffers[0], "stdout"), daemon=True),
+               threading.Thread(target=pump, args=(process.stderr, buffers[1], "stderr"), daemon=True)]
+    if process.stdin is not None:
+        threads.append(threading.Thread(target=feed_stdin, daemon=True))
+    for thread in [waiter, *threads]:
+        thread.start()
+
+    slot_usage = None
+    timed_out = False
+    try:
+        waiter.join(timeout)
+        if waiter.is_alive():
+            timed_out = True
+            kill_process_group(process)
+            waiter.join()
+    finally:
+        # Leftover children would keep the pipes open past the deadline
+        kill_process_group(process)
+        if slot is not None:
+            slot_usage = slot.end()
+        for thread in threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+    if timed_out or any(thread.is_alive() for thread in threads):
+        # Still alive: a child that left the group (setsid) and kept the pipes
+        raise subprocess.TimeoutExpired(process.args, timeout)
+    wall_time = time.monotonic() - started
+
+    stdout, stderr = (_decode(buffer.getvalue(), text) for buffer in buffers)
+    cpu_time, max_rss_kb = usage[0] if usage else (None, None)
+    oom_killed = False
+    if slot_usage is not None:
+        cpu_time = slot_usage.cpu_time if slot_usage.cpu_time is not None else cpu_time
+        max_rss_kb = slot_usage.peak_kb or max_rss_kb
+        oom_killed = slot_usage.oom_killed
+    return BoundedProcess(process.args, process.returncode, stdout, stderr, overflow.is_set(),
+                          wall_time=wall_time, cpu_time=cpu_time, max_rss_kb=max_rss_kb,
+                          memory_limit_exceeded=oom_killed)
+
+
+def run_bounded(argv: List[str], input: Optional[str] = None, timeout: float = 5,
+                cwd: Optional[str] = None, env: Optional[Dict[str, str]] = None,
+                limit: Optional[int] = None, memory_limit: Optional[int] = None) -> BoundedProcess:
+    """Drop-in for subprocess.run(capture_output=True, text=True) with an output cap.
+
+    The process runs in a cgroup slot capped at memory_limit KB where cgroup v2 is
+    available; it is moved there right after the spawn (preexec_fn isn't safe in
+    threaded servers), and runs unconfined if that fails.
+    """
+    with execution_slot(memory_limit) as slot:
+        process = subprocess.Popen(
+            argv,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=cwd,
+            env=env,
+            start_new_session=True
+        )
+        if slot is not None and not slot.attach(process.pid):
+            slot = None
+        encoded = input.encode('utf-8') if input else None
+        return communicate_bounded(process, encoded, timeout, limit=limit, text=True, slot=slot)
+
+
+async def run_bounded_async(argv: List[str], input: Optional[str] = None, timeout: float = 5,
+                            cwd: Optional[str] = None, env: Optional[Dict[str, str]] = None,
+                            limit: Optional[int] = None, memory_limit: Optional[int] = None,
+                            executor: Optional[Executor] = None) -> BoundedProcess:
+    """Non-blocking run_bounded for event-loop callers.
+
+    Runs on a thread rather than asyncio's subprocess API: asyncio's child
+    watcher reaps the process itself, which would lose its rusage. The thread
+    is held for the whole run, so servers should pass an executor sized to
+    their own concurrency limit instead of sharing the loop's default one.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(
+        run_bounded, argv, input, timeout, cwd, env, limit, memory_limit))
+
+
+def usage_of(process: Optional[subprocess.CompletedProcess]) -> Optional[Dict[str, Any]]:
+    """wall_time/cpu_time in seconds and peak memory in KB for one phase"""
+    if getattr(process, "wall_time", None) is None:
+        return None
+    return {
+        'wall_time': round(process.wall_time, 4),
+        'cpu_time': None if process.cpu_time is None else round(process.cpu_time, 4),
+        'memory': process.max_rss_kb
+    }
+
+
+def resource_fields(run: Optional[subprocess.CompletedProcess],
+                    compile: Optional[subprocess.CompletedProcess] = None) -> Dict[str, Any]:
+    """Result fields for a run and its (optional, possibly cached) compile step"""
+    run_usage = usage_of(run) or {}
+    return {
+        'execution_time': run_usage.get('wall_time'),
+        'cpu_time': run_usage.get('cpu_time'),
+        'memory': run_usage.get('memory'),
+        'phases': {'compile': usage_of(compile), 'run': usage_of(run)}
+    }
+
+
+def output_limit_result(process: BoundedProcess) -> Dict[str, Any]:
+    """Backend result for a run killed for exceeding the output cap"""
+    return {
+        'success': False,
+        'output': process.stdout,
+        'error': f"{process.stderr}\nOutput limit exceeded ({config.OUTPUT_LIMIT_BYTES} bytes per stream)".lstrip(),
+        'exit_code': -1,
+        'output_limit_exceeded': True,
+        **resource_fields(process)
+    }
+
+
+def memory_limit_result(process: BoundedProcess) -> Dict[str, Any]:
+    """Backend result for a run OOM-killed at its cgroup memory.max"""
+    return {
+        'success': False,
+        'output': process.stdout,
+        'error': f"{process.stderr}\nMemory limit exceeded".lstrip(),
+        'exit_code': -1,
+        'memory_limit_exceeded': True,
+        **resource_fields(process)
+    }
+
+
+def compilation_error_result(process: subprocess.CompletedProcess) -> Dict[str, Any]:
+    """Backend result for a failed compile (the program never ran)"""
+    return {
+        'success': False,
+        'output': '',
+        'error': process.stderr,
+        'exit_code': process.returncode,
+        'compilation_error': True,
+        **resource_fields(None, process)
+    }
@@ -0,0 +1,198 @@
+# src/core/precompiled_headers.py
+import hashlib
+import logging
+import os
+import re
+import subprocess
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from src.core.compile_cache import compiler_version
+from src.core.config import config
+from src.core.output_capture import run_bounded
+
+logger = logging.getLogger(__name__)
+
+# Header sets worth precompiling. A submission uses the first set that covers
+# every header it includes.
+HEADER_SETS: Dict[str, List[str]] = {
+    'stdc++': ['bits/stdc++.h'],
+    'stl': [
+        'algorithm', 'bitset', 'cassert', 'climits', 'cmath', 'cstdio', 'cstdlib', 'cstring',
+        'deque', 'functional', 'iomanip', 'iostream', 'list', 'map', 'numeric', 'queue', 'set',
+        'sstream', 'stack', 'string', 'unordered_map', 'unordered_set', 'utility', 'vector'
+    ],
+}
+
+_DIRECTIVE = re.compile(r'^\s*#\s*(\w+)\s*(.*?)\s*$')
+_SYSTEM_HEADER = re.compile(r'^<([\w./+-]+)>')
+_BUILD_TIMEOUT = 120
+_STALE_LOCK = 600  # seconds before another process's build lock is ignored
+
+
+def included_headers(code: str) -> Optional[Set[str]]:
+    """System headers a submission includes, or None if a PCH could change its meaning.
+
+    A precompiled header is parsed before the submission, so any other
+    directive ahead of the last #include (a #define, #pragma or #undef that
+    could affect the headers) or a quoted include rules it out.
+    """
+    headers: Set[str] = set()
+    pending: List[str] = []
+    for line in code.splitlines():
+        match = _DIRECTIVE.match(line)
+        if not match:
+            continue
+        directive, argument = match.groups()
+        if directive != 'include':
+            pending.append(directive)
+            continue
+        header = _SYSTEM_HEADER.match(argument)
+        if header is None or pending:
+            return None
+        headers.add(header.group(1))
+    return headers
+
+
+class PrecompiledHeaders:
+    """Precompiled C++ header sets, one build per compiler version and flag set.
+
+    Each set is a generated header under root/<key>/ next to its .gch. A
+    compile that can use one gets `-include <header>`; g++ then loads the
+    .gch instead of parsing the headers again, and the submission's own
+    #includes are no-ops behind the include guards. Sets are built on a
+    background thread the first time they are needed (or on warm()); until
+    the .gch exists, and for submissions no set covers, compiles run as
+    before. Builds are shared through the file system between processes.
+    """
+
+    def __init__(self, root: str, enabled: bool = True):
+        self.root = root
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.builds = 0
+        self._building: Set[Tuple[str, str]] = set()
+        self._failed: Set[Tuple[str, str]] = set()
+        self._lock = threading.Lock()
+
+    def select(self, code: str) -> Optional[str]:
+        """Name of the header set that covers every header the code includes"""
+        headers = included_headers(code)
+        if not headers:
+            return None
+        if 'bits/stdc++.h' in headers:
+            # Every other standard header is part of it, anything else is parsed after it
+            return 'stdc++'
+        for name, members in HEADER_SETS.items():
+            if headers <= set(members):
+                return name
+        return None
+
+    def include_args(self, compiler: str, flags: Sequence[str], code: str) -> List[str]:
+        """Extra compiler arguments that load a ready PCH, or [] (scheduling its build)"""
+        if not self.enabled:
+            return []
+        name = self.select(code)
+        if name is None:
+            return []
+        header = self.header_path(compiler, flags, name)
+        if os.path.isfile(header + '.gch'):
+            with self._lock:
+                self.hits += 1
+            return ['-include', header]
+        with self._lock:
+            self.misses += 1
+        self._schedule(compiler, flags, name)
+        return []
+
+    def warm(self, compiler: Optional[str], flags: Sequence[str] = ()) -> None:
+        """Build every header set for a compiler in the background"""
+        if not self.enabled or not compiler:
+            return
+        for name in HEADER_SETS:
+            if not os.path.isfile(self.header_path(compiler, flags, name) + '.gch'):
+                self._schedule(compiler, flags, name)
+
+    def header_path(self, compiler: str, flags: Sequence[str], name: str) -> str:
+        digest = hashlib.sha256()
+        for part in [compiler, compiler_version(compiler), *flags, '', *HEADER_SETS[name]]:
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return os.path.join(self.root, digest.hexdigest()[:16], f'{name}.h')
+
+    def build(self, compiler: str, flags: Sequence[str], name: str) -> bool:
+        """Compile one header set; False if it failed or another process is building it"""
+        header = self.header_path(compiler, flags, name)
+        os.makedirs(os.path.dirname(header), exist_ok=True)
+        lock_path = header + '.lock'
+        try:
+            lock = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            if time.time() - os.path.getmtime(lock_path) < _STALE_LOCK:
+                return False
+            os.unlink(lock_path)
+            return self.build(compiler, flags, name)
+
+        partial = f'{header}.{os.getpid()}.gch.tmp'
+        try:
+            if not os.path.isfile(header):
+                with open(header, 'w') as f:
+                    f.write(''.join(f'#include <{member}>\n' for member in HEADER_SETS[name]))
+            process = run_bounded(
+                [compiler, *flags, '-x', 'c++-header', header, '-o', partial],
+                timeout=_BUILD_TIMEOUT
+            )
+            if process.returncode != 0:
+                logger.warning(f"Could not precompile {name} headers with {compiler}: {process.stderr[-500:]}")
+                return False
+            # Atomic: concurrent compiles see either no .gch or a complete one
+            os.replace(partial, header + '.gch')
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logger.warning(f"Could not precompile {name} headers with {compiler}: {e}")
+            return False
+        finally:
+            if os.path.exists(partial):
+                os.unlink(partial)
+            os.close(lock)
+            os.unlink(lock_path)
+        with self._lock:
+            self.builds += 1
+        logger.info(f"Precompiled {name} headers for {compiler} at {header}.gch")
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'hits': self.hits,
+                'misses': self.misses,
+                'builds': self.builds,
+                'building': len(self._building)
+            }
+
+    def _schedule(self, compiler: str, flags: Sequence[str], name: str) -> None:
+        key = (self.header_path(compiler, flags, name), name)
+        with self._lock:
+            if key in self._building or key in self._failed:
+                return
+            self._building.add(key)
+        threading.Thread(target=self._build_in_background, args=(key, compiler, list(flags), name),
+                         name=f"pch-{name}", daemon=True).start()
+
+    def _build_in_background(self, key: Tuple[str, str], compiler: str, flags: List[str], name: str) -> None:
+        try:
+            built = self.build(compiler, flags, name)
+        except Exception as e:
+            logger.error(f"Precompiling {name} headers failed: {e}")
+            built = False
+        with self._lock:
+            self._building.discard(key)
+            if not built and not os.path.isfile(key[0] + '.gch') and not os.path.exists(key[0] + '.lock'):
+                # Don't retry a compiler that can't build this set on every request
+                self._failed.add(key)
+
+
+# Global PCH store shared by the C++ backend and api.py
+precompiled_headers = PrecompiledHeaders(config.CPP_PCH_DIR, enabled=config.CPP_PCH_ENABLED)
@@ -0,0 +1,120 @@
+# src/core/result_cache.py
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from src.core.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """Memoizes execution results of identical (language, code, stdin, limits) runs.
+
+    A bounded in-process LRU tier answers repeat runs without touching the
+    network; the optional Redis tier shares results between API processes.
+    Both tiers expire entries after the same TTL.
+    """
+
+    REDIS_PREFIX = "result_cache:"
+
+    def __init__(self, ttl: float, max_entries: int, use_redis: bool = False):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.use_redis = use_redis
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def make_key(self, language: Any, code: str, stdin: str, timeout: float,
+                 memory_limit: int) -> str:
+        """Hash the inputs that determine a run's result"""
+        payload = json.dumps([str(language), code, stdin or "", timeout, memory_limit])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def is_cacheable(result: Dict[str, Any]) -> bool:
+        """Only memoize deterministic outcomes; exit_code -1 marks timeouts and internal errors"""
+        return result.get('exit_code', -1) != -1 and not result.get('timeout', False)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, result = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return dict(result)
+                del self._entries[key]
+
+        result = self._redis_get(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember_locked(key, result, now)
+        return dict(result)
+
+    def set(self, key: str, result: Dict[str, Any]) -> None:
+        if not self.is_cacheable(result):
+            return
+        with self._lock:
+            self._remember_locked(key, dict(result), time.monotonic())
+        self._redis_set(key, result)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'redis': self.use_redis
+            }
+
+    def _remember_locked(self, key: str, result: Dict[str, Any], now: float) -> None:
+        self._entries[key] = (now + self.ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _redis_get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.use_redis:
+            return None
+        try:
+            from src.database.redis_client import redis_client
+            data = redis_client.get(self.REDIS_PREFIX + key)
+            return json.loads(data) if data else None
+        except Exception as e:
+            logger.warning(f"Result cache Redis lookup failed: {e}")
+            return None
+
+    def _redis_set(self, key: str, result: Dict[str, Any]) -> None:
+        if not self.use_redis:
+            return
+        try:
+            from src.database.redis_client import redis_client
+            redis_client.setex(self.REDIS_PREFIX + key, max(1, int(self.ttl)), json.dumps(result))
+        except Exception as e:
+            logger.warning(f"Result cache Redis store failed: {e}")
+
+
+# Global result cache; CompilerManager only consults it when caching is requested
+result_cache = ResultCache(
+    ttl=config.RESULT_CACHE_TTL,
+    max_entries=config.RESULT_CACHE_MAX_ENTRIES,
+    use_redis=config.RESULT_CACHE_REDIS
+)
@@ -0,0 +1,107 @@
+# src/core/sqlite_template.py
+import logging
+import sqlite3
+import threading
+from collections import deque
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteTemplatePool:
+    """Hands out fresh copies of a pre-seeded in-memory database.
+
+    The seed function runs once against a template database. Each
+    submission gets its own clone, made by deserializing a snapshot of the
+    template where sqlite3 supports it (Python 3.11+) and with the online
+    backup API otherwise, so the cost of a clone depends on the page count
+    and not on how many statements built the fixture. A background thread
+    keeps `size` clones ready. Clones are single-use: close them after the run.
+    """
+
+    def __init__(self, name: str, seed: Callable[[sqlite3.Connection], None], size: int):
+        self.name = name
+        self.seed = seed
+        self.size = size
+        self.warm_hits = 0
+        self.cold_starts = 0
+        self._template: Optional[sqlite3.Connection] = None
+        self._image: Optional[bytes] = None
+        self._idle: deque = deque()
+        self._lock = threading.Lock()
+        self._template_lock = threading.Lock()
+        self._refilling = False
+
+    def start(self) -> None:
+        """Build the template and pre-clone connections in the background"""
+        self._schedule_refill()
+
+    def acquire(self) -> sqlite3.Connection:
+        connection = None
+        with self._lock:
+            if self._idle:
+                connection = self._idle.popleft()
+                self.warm_hits += 1
+            else:
+                self.cold_starts += 1
+        if connection is None:
+            connection = self._clone()
+        self._schedule_refill()
+        return connection
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'size': self.size,
+                'idle': len(self._idle),
+                'warm_hits': self.warm_hits,
+                'cold_starts': self.cold_starts
+            }
+
+    def _build_template(self) -> None:
+        with self._template_lock:
+            if self._template is not None or self._image is not None:
+                return
+            template = sqlite3.connect(':memory:', check_same_thread=False)
+            self.seed(template)
+            template.commit()
+            if hasattr(template, 'serialize'):
+                self._image = template.serialize()
+                template.close()
+            else:
+                self._template = template
+
+    def _clone(self) -> sqlite3.Connection:
+        self._build_template()
+        # Clones are made on the refill thread and used on a request thread
+        connection = sqlite3.connect(':memory:', check_same_thread=False)
+        if self._image is not None:
+            connection.deserialize(self._image)
+        else:
+            with self._template_lock:
+                self._template.backup(connection)
+        return connection
+
+    def _schedule_refill(self) -> None:
+        with self._lock:
+            if self._refilling or len(self._idle) >= self.size:
+                return
+            self._refilling = True
+        threading.Thread(target=self._refill, name=f"{self.name}-refill", daemon=True).start()
+
+    def _refill(self) -> None:
+        try:
+            while True:
+                with self._lock:
+                    if len(self._idle) >= self.size:
+                        return
+                try:
+                    connection = self._clone()
+                except sqlite3.Error as e:
+                    logger.error(f"{self.name} pool could not clone the template: {e}")
+                    return
+                with self._lock:
+                    self._idle.append(connection)
+        finally:
+            with self._lock:
+                self._refilling = False
@@ -0,0 +1,175 @@
+# src/core/toolchains.py
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from src.core.config import config
+
+logger = logging.getLogger(__name__)
+
+
+def probe_version(command: str, args: List[str] = None) -> str:
+    """First line of a tool's version banner, or 'unknown'"""
+    for flags in ([args] if args else [['--version'], ['-version']]):
+        try:
+            process = subprocess.run([command, *flags], capture_output=True, text=True, timeout=5)
+        except (OSError, subprocess.SubprocessError):
+            continue
+        banner = (process.stdout or process.stderr).strip()
+        if process.returncode == 0 and banner:
+            return banner.splitlines()[0]
+    return 'unknown'
+
+
+def _accepts_std(language: str, standards: List[str]) -> Callable[[str], Dict[str, bool]]:
+    """Feature probe: which -std= values the compiler accepts (syntax-only, empty input)"""
+    def probe(path: str) -> Dict[str, bool]:
+        features = {}
+        for standard in standards:
+            try:
+                process = subprocess.run([path, f'-std={standard}', '-fsyntax-only', '-x', language, '-'],
+                                         input='', capture_output=True, text=True, timeout=10)
+                features[standard] = process.returncode == 0
+            except (OSError, subprocess.SubprocessError):
+                features[standard] = False
+        return features
+    return probe
+
+
+class Toolchain:
+    """One resolved tool: absolute path, version banner and feature flags"""
+
+    def __init__(self, name: str, path: Optional[str], version: str, features: Dict[str, bool]):
+        self.name = name
+        self.path = path
+        self.version = version
+        self.features = features
+        self.checked_at = time.time()
+
+    @property
+    def available(self) -> bool:
+        return self.path is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'available': self.available,
+            'path': self.path,
+            'version': self.version,
+            'features': self.features,
+            'checked_at': self.checked_at
+        }
+
+
+# name -> candidates (absolute paths first, then PATH lookups), version flags, feature probe
+TOOLCHAIN_SPECS: Dict[str, Dict[str, Any]] = {
+    'gcc': {
+        'candidates': [r"C:\ProgramData\mingw64\mingw64\bin\gcc.exe", r"C:\tools\mingw64\bin\gcc.exe", 'gcc'],
+        'features': _accepts_std('c', ['c11', 'c17'])
+    },
+    'g++': {
+        'candidates': [r"C:\ProgramData\mingw64\mingw64\bin\g++.exe", r"C:\tools\mingw64\bin\g++.exe", 'g++'],
+        'features': _accepts_std('c++', ['c++17', 'c++20'])
+    },
+    'python': {'candidates': [config.PYTHON_INTERPRETER]},
+    'node': {'candidates': ['node']},
+    'javac': {'candidates': ['javac'], 'version_args': ['-version']},
+    'java': {'candidates': ['java'], 'version_args': ['-version']},
+    'go': {'candidates': ['go'], 'version_args': ['version']},
+    'rustc': {'candidates': ['rustc']},
+    'cargo': {'candidates': ['cargo']},  # builds the prebuilt Rust crates
+    'tcc': {'candidates': ['tcc'], 'version_args': ['-v']},  # optional: "quick" C builds
+    'sqlite3': {'candidates': ['sqlite3'], 'version_args': ['-version']},
+}
+
+
+class ToolchainRegistry:
+    """Resolves every toolchain once (at startup) instead of probing per request.
+
+    Backends ask for command(name). A missing tool is re-probed at most every
+    retry_interval seconds, and invalidate(name) forces a re-probe after a
+    spawn fails (e.g. the compiler was upgraded or removed underneath us).
+    """
+
+    def __init__(self, specs: Dict[str, Dict[str, Any]], retry_interval: float):
+        self.specs = specs
+        self.retry_interval = retry_interval
+        self._toolchains: Dict[str, Toolchain] = {}
+        self._versions: Dict[str, str] = {}  # tools outside the registry, by path
+        self._lock = threading.Lock()
+
+    def discover(self) -> Dict[str, Toolchain]:
+        """Probe every toolchain in parallel; safe to call again to refresh"""
+        with ThreadPoolExecutor(max_workers=len(self.specs), thread_name_prefix="toolchain") as pool:
+            resolved = dict(zip(self.specs, pool.map(self._probe, self.specs)))
+        with self._lock:
+            self._toolchains.update(resolved)
+            self._versions.clear()
+        available = [name for name, toolchain in resolved.items() if toolchain.available]
+        logger.info(f"Toolchains available: {', '.join(available) or 'none'}")
+        return resolved
+
+    def get(self, name: str) -> Toolchain:
+        with self._lock:
+            toolchain = self._toolchains.get(name)
+        stale = toolchain is None or (
+            not toolchain.available and time.time() - toolchain.checked_at >= self.retry_interval
+        )
+        if stale:
+            toolchain = self._probe(name)
+            with self._lock:
+                self._toolchains[name] = toolchain
+        return toolchain
+
+    def path(self, name: str) -> Optional[str]:
+        return self.get(name).path
+
+    def command(self, name: str) -> str:
+        """Resolved path, or the bare command so a spawn still reports what is missing"""
+        return self.get(name).path or self.specs[name]['candidates'][-1]
+
+    def version(self, command: str) -> str:
+        """Version banner of a tool given by name or resolved path, as of the last probe.
+
+        Compile cache and PCH keys use this, so a refresh or invalidate() that
+        picks up an upgraded compiler also moves its artifacts to new keys.
+        """
+        if command in self.specs:
+            return self.get(command).version
+        with self._lock:
+            for toolchain in self._toolchains.values():
+                if toolchain.path == command:
+                    return toolchain.version
+            version = self._versions.get(command)
+        if version is None:
+            version = probe_version(command)
+            with self._lock:
+                self._versions[command] = version
+        return version
+
+    def invalidate(self, name: str) -> None:
+        with self._lock:
+            self._toolchains.pop(name, None)
+            self._versions.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: self.get(name).to_dict() for name in self.specs}
+
+    def _probe(self, name: str) -> Toolchain:
+        spec = self.specs[name]
+        for candidate in spec['candidates']:
+            path = candidate if os.path.isabs(candidate) and os.path.exists(candidate) else shutil.which(candidate)
+            if path:
+                path = os.path.abspath(path)
+                version = probe_version(path, spec.get('version_args'))
+                features = spec['features'](path) if 'features' in spec else {}
+                return Toolchain(name, path, version, features)
+        return Toolchain(name, None, 'unavailable', {})
+
+
+# Global registry shared by every backend and the health endpoints
+toolchains = ToolchainRegistry(TOOLCHAIN_SPECS, retry_interval=config.TOOLCHAIN_RETRY_INTERVAL)
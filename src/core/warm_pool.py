@@ -0,0 +1,168 @@
+# src/core/warm_pool.py
+import atexit
+import logging
+import subprocess
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+from src.core.output_capture import BoundedProcess, communicate_bounded, execution_slot, kill_process_group
+from src.core.workspace import workspaces
+
+logger = logging.getLogger(__name__)
+
+
+class WarmProcessPool:
+    """Keeps pre-started, single-use worker processes ready to take one job each.
+    
+    Workers pay their startup cost (interpreter/VM boot) before a submission
+    arrives. Each worker runs exactly one job and exits, so no state leaks
+    between submissions; a background thread starts replacements. With
+    workspace=True every worker starts in its own empty workspace (instead
+    of cwd), which is recycled after its job like a cold run's.
+    """
+    
+    def __init__(self, name: str, argv: List[str], size: int,
+                 cwd: Optional[str] = None, env: Optional[Dict[str, str]] = None,
+                 workspace: bool = False):
+        self.name = name
+        self.argv = argv
+        self.size = size
+        self.cwd = cwd
+        self.env = env
+        self.workspace = workspace
+        self._workspaces: Dict[int, str] = {}
+        self.warm_hits = 0
+        self.cold_starts = 0
+        self._idle: deque = deque()
+        self._lock = threading.Lock()
+        self._refilling = False
+        self._closed = False
+        atexit.register(self.shutdown)
+    
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+    
+    def start(self) -> None:
+        """Fill the pool in the background so the first submission finds warm workers"""
+        self._schedule_refill()
+    
+    def run(self, job: bytes, timeout: float, text: bool = False,
+            memory_limit: Optional[int] = None) -> BoundedProcess:
+        """Hand a job to a warm worker; raises subprocess.TimeoutExpired like subprocess.run
+
+        With text=True the output is decoded like subprocess.run(text=True).
+        Output is capped like run_bounded and reported via output_limit_exceeded;
+        the worker is moved into a cgroup slot capped at memory_limit KB for the job.
+        """
+        process = self._acquire()
+        try:
+            with execution_slot(memory_limit) as slot:
+                if slot is not None and not slot.attach(process.pid):
+                    slot = None
+                completed = communicate_bounded(process, job, timeout, text=text, slot=slot)
+        except BaseException:
+            kill_process_group(process)
+            process.wait()
+            raise
+        finally:
+            self._release_workspace(process)
+            # Replace the used worker only after the job so the spawn doesn't
+            # compete with it for CPU
+            self._schedule_refill()
+        return completed
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'size': self.size,
+                'idle': len(self._idle),
+                'warm_hits': self.warm_hits,
+                'cold_starts': self.cold_starts
+            }
+    
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+        for process in idle:
+            process.kill()
+            process.wait()
+            self._release_workspace(process)
+    
+    def _acquire(self) -> subprocess.Popen:
+        process, dead = None, []
+        with self._lock:
+            while self._idle:
+                candidate = self._idle.popleft()
+                if candidate.poll() is None:
+                    process = candidate
+                    self.warm_hits += 1
+                    break
+                dead.append(candidate)
+            if process is None:
+                self.cold_starts += 1
+        for candidate in dead:
+            self._release_workspace(candidate)
+        if process is None:
+            process = self._spawn()
+        return process
+    
+    def _spawn(self) -> subprocess.Popen:
+        cwd = workspaces.acquire() if self.workspace else self.cwd
+        try:
+            process = subprocess.Popen(
+                self.argv,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                cwd=cwd,
+                env=self.env,
+                start_new_session=True
+            )
+        except BaseException:
+            if self.workspace:
+                workspaces.release(cwd)
+            raise
+        if self.workspace:
+            with self._lock:
+                self._workspaces[process.pid] = cwd
+        return process
+    
+    def _release_workspace(self, process: subprocess.Popen) -> None:
+        with self._lock:
+            path = self._workspaces.pop(process.pid, None)
+        if path is not None:
+            workspaces.release(path)
+    
+    def _schedule_refill(self) -> None:
+        with self._lock:
+            if self._refilling or self._closed or len(self._idle) >= self.size:
+                return
+            self._refilling = True
+        threading.Thread(target=self._refill, name=f"{self.name}-refill", daemon=True).start()
+    
+    def _refill(self) -> None:
+        try:
+            while True:
+                with self._lock:
+                    if self._closed or len(self._idle) >= self.size:
+                        return
+                try:
+                    process = self._spawn()
+                except OSError as e:
+                    logger.error(f"{self.name} pool could not start a worker: {e}")
+                    return
+                with self._lock:
+                    closed = self._closed
+                    if not closed:
+                        self._idle.append(process)
+                if closed:
+                    process.kill()
+                    process.wait()
+                    self._release_workspace(process)
+                    return
+        finally:
+            with self._lock:
+                self._refilling = False
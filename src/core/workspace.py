@@ -0,0 +1,227 @@
+# src/core/workspace.py
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Set
+
+from src.core.config import config
+
+logger = logging.getLogger(__name__)
+
+
+def filesystem_type(path: str) -> Optional[str]:
+    """Filesystem of the mount holding path (Linux /proc/mounts), e.g. 'tmpfs'"""
+    path = os.path.realpath(path)
+    best, fstype = '', None
+    try:
+        with open('/proc/mounts') as mounts:
+            for line in mounts:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                mount_point = fields[1].replace('\\040', ' ')
+                inside = path == mount_point or path.startswith(mount_point.rstrip('/') + '/')
+                if inside and len(mount_point) >= len(best):
+                    best, fstype = mount_point, fields[2]
+    except OSError:
+        return None
+    return fstype
+
+
+def _clear(path: str) -> None:
+    """Remove everything inside path but keep the directory itself"""
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path, ignore_errors=True)
+            else:
+                try:
+                    os.unlink(entry.path)
+                except OSError:
+                    pass
+
+
+class WorkspaceManager:
+    """Hands out empty per-run directories and recycles them off the request path.
+
+    Workspaces live under root/p<pid>/ so processes sharing the root (worker
+    processes, API replicas) never touch each other's directories. Up to
+    `size` emptied directories are kept ready; release() hands a used one to
+    a background thread that empties it and puts it back. A sweeper removes
+    directories left behind by dead processes and untracked leftovers of
+    this one. Mount root on a tmpfs (with exec) to keep runs off the disk.
+    """
+
+    def __init__(self, root: str, size: int, sweep_interval: float, max_age: float):
+        self.root = root
+        self.size = size
+        self.sweep_interval = sweep_interval
+        self.max_age = max_age
+        self.warm_hits = 0
+        self.cold_starts = 0
+        self._idle: List[str] = []
+        self._active: Set[str] = set()
+        self._recycle: "queue.Queue[str]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._counter = 0
+        self._pid: Optional[int] = None
+
+    @property
+    def base(self) -> str:
+        return os.path.join(self.root, f'p{os.getpid()}')
+
+    def start(self) -> None:
+        """Create the pool and start the recycler and sweeper (once per process)"""
+        # Concurrent first callers wait here so none is handed a directory
+        # that the rmtree below is about to remove
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            # A forked child starts with its own empty pool
+            with self._lock:
+                self._idle, self._active = [], set()
+            # Anything already here belongs to an earlier process with our pid
+            shutil.rmtree(self.base, ignore_errors=True)
+            os.makedirs(self.base, exist_ok=True)
+            fstype = filesystem_type(self.base)
+            if fstype not in (None, 'tmpfs', 'ramfs'):
+                logger.warning(f"Workspaces at {self.root} are on {fstype}, not tmpfs; scratch files hit the disk")
+            for _ in range(self.size):
+                path = self._create()
+                with self._lock:
+                    self._idle.append(path)
+            threading.Thread(target=self._recycle_loop, name="workspace-recycle", daemon=True).start()
+            if self.sweep_interval > 0:
+                threading.Thread(target=self._sweep_loop, name="workspace-sweep", daemon=True).start()
+            self._pid = os.getpid()
+
+    def acquire(self) -> str:
+        self.start()
+        with self._lock:
+            path = self._idle.pop() if self._idle else None
+            if path is not None:
+                self.warm_hits += 1
+            else:
+                self.cold_starts += 1
+        if path is None:
+            path = self._create()
+        with self._lock:
+            self._active.add(path)
+        return path
+
+    def release(self, path: str) -> None:
+        """Give a workspace back; emptying it happens on the recycler thread"""
+        self._recycle.put(path)
+
+    def recycle(self, path: str) -> None:
+        """Empty a workspace now (on the caller's thread) and return it to the pool"""
+        with self._lock:
+            self._active.discard(path)
+            keep = len(self._idle) < self.size
+        if keep and os.path.isdir(path):
+            _clear(path)
+            with self._lock:
+                self._idle.append(path)
+        else:
+            shutil.rmtree(path, ignore_errors=True)
+
+    @contextmanager
+    def workspace(self) -> Iterator[str]:
+        path = self.acquire()
+        try:
+            yield path
+        finally:
+            self.release(path)
+
+    def sweep(self) -> int:
+        """Remove workspaces of dead processes and our own untracked leftovers"""
+        removed = 0
+        now = time.time()
+        try:
+            owners = os.listdir(self.root)
+        except OSError:
+            return 0
+        for owner in owners:
+            owner_path = os.path.join(self.root, owner)
+            if owner == os.path.basename(self.base):
+                with self._lock:
+                    tracked = self._active | set(self._idle)
+                for name in os.listdir(owner_path):
+                    path = os.path.join(owner_path, name)
+                    if path not in tracked and self._older_than(path, now, self.max_age):
+                        shutil.rmtree(path, ignore_errors=True)
+                        removed += 1
+            elif owner.startswith('p') and owner[1:].isdigit() and not _alive(int(owner[1:])):
+                shutil.rmtree(owner_path, ignore_errors=True)
+                removed += 1
+        if removed:
+            logger.info(f"Workspace sweeper removed {removed} orphaned director{'y' if removed == 1 else 'ies'}")
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'size': self.size,
+                'idle': len(self._idle),
+                'active': len(self._active),
+                'recycling': self._recycle.qsize(),
+                'warm_hits': self.warm_hits,
+                'cold_starts': self.cold_starts
+            }
+
+    def _create(self) -> str:
+        with self._lock:
+            self._counter += 1
+            counter = self._counter
+        path = os.path.join(self.base, f'ws{counter}')
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    @staticmethod
+    def _older_than(path: str, now: float, age: float) -> bool:
+        try:
+            return now - os.stat(path).st_mtime > age
+        except OSError:
+            return False
+
+    def _recycle_loop(self) -> None:
+        while True:
+            path = self._recycle.get()
+            try:
+                self.recycle(path)
+            except Exception as e:
+                logger.error(f"Could not recycle workspace {path}: {e}")
+
+    def _sweep_loop(self) -> None:
+        while True:
+            time.sleep(self.sweep_interval)
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Workspace sweep failed: {e}")
+
+
+def _alive(pid: int) -> bool:
+    if os.name == 'nt':
+        return True  # os.kill would terminate the process on Windows
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# Global workspace manager shared by every backend and api.py
+workspaces = WorkspaceManager(
+    config.WORKSPACE_DIR,
+    size=config.WORKSPACE_POOL_SIZE,
+    sweep_interval=config.WORKSPACE_SWEEP_INTERVAL,
+    max_age=config.WORKSPACE_MAX_AGE
+)
@@ -17,6 +17,8 @@ class Submission:
         self.stderr = ""
         self.exit_code = 0
         self.execution_time = 0.0
+        self.cpu_time: Optional[float] = None
+        self.memory: Optional[int] = None
         self.created_at = datetime.utcnow()
         self.completed_at: Optional[datetime] = None
     
@@ -34,6 +36,8 @@ class Submission:
             "stderr": self.stderr,
             "exit_code": self.exit_code,
             "execution_time": self.execution_time,
+            "cpu_time": self.cpu_time,
+            "memory": self.memory,
             "created_at": self.created_at.isoformat(),
             "completed_at": self.completed_at.isoformat() if self.completed_at else None
         }
@@ -55,6 +59,8 @@ class Submission:
         submission.stderr = data.get("stderr", "")
         submission.exit_code = data.get("exit_code", 0)
         submission.execution_time = data.get("execution_time", 0.0)
+        submission.cpu_time = data.get("cpu_time")
+        submission.memory = data.get("memory")
         
         if "created_at" in data and data["created_at"]:
             submission.created_at = datetime.fromisoformat(data["created_at"])
@@ -1,4 +1,5 @@
 import redis
+import redis.asyncio as aioredis
 import os
 
 redis_client = redis.Redis(
@@ -8,6 +9,14 @@ redis_client = redis.Redis(
     decode_responses=True
 )
 
+# Non-blocking client for the API routes and the async worker loop
+async_redis_client = aioredis.Redis(
+    host=os.getenv('REDIS_HOST', 'localhost'),
+    port=int(os.getenv('REDIS_PORT', 6379)),
+    db=int(os.getenv('REDIS_DB', 0)),
+    decode_responses=True
+)
+
 # Test connection
 try:
     redis_client.ping()
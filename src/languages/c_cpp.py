@@ -1,8 +1,13 @@
 # src/languages/c_cpp.py
 import os
-import tempfile
 import subprocess
 from typing import Dict, Any
+from src.core.build_profiles import BuildOptionsError, build_settings
+from src.core.compile_cache import compile_cache
+from src.core.output_capture import compilation_error_result, memory_limit_result, output_limit_result, resource_fields, run_bounded, stream_output
+from src.core.precompiled_headers import precompiled_headers
+from src.core.toolchains import toolchains
+from src.core.workspace import workspaces
 from src.languages.base import BaseLanguage
 
 class CLanguage(BaseLanguage):
@@ -15,30 +20,11 @@ class CLanguage(BaseLanguage):
         return ".c"
     
     def _find_compiler(self):
-        """Find GCC compiler using known Chocolatey location"""
-        # Known Chocolatey MinGW location
-        known_paths = [
-            r"C:\ProgramData\mingw64\mingw64\bin\gcc.exe",
-            r"C:\tools\mingw64\bin\gcc.exe"
-        ]
-        
-        for compiler_path in known_paths:
-            if os.path.exists(compiler_path):
-                print(f"🎯 Found GCC at: {compiler_path}")
-                return compiler_path
-        
-        # Also try PATH
-        try:
-            subprocess.run(['gcc', '--version'], capture_output=True, timeout=2)
-            print("🎯 Found GCC in PATH")
-            return 'gcc'
-        except:
-            pass
-        
-        print("❌ GCC compiler not found")
-        return None
+        """Resolved GCC from the toolchain registry (Chocolatey MinGW paths first, then PATH)"""
+        return toolchains.path('gcc')
     
-    def compile_code(self, code: str, input_data: str, timeout: int, memory_limit: int) -> Dict[str, Any]:
+    def compile_code(self, code: str, input_data: str, timeout: int, memory_limit: int,
+                     build_profile: str = None, compiler_options: str = None) -> Dict[str, Any]:
         compiler = self._find_compiler()
         
         if not compiler:
@@ -50,66 +36,66 @@ class CLanguage(BaseLanguage):
             }
         
         try:
-            # Create temporary C file
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.c', delete=False, encoding='utf-8') as src_file:
+            build = build_settings('c', compiler, build_profile, compiler_options)
+        except BuildOptionsError as e:
+            return {
+                'success': False,
+                'output': '',
+                'error': str(e),
+                'exit_code': -1
+            }
+        
+        work_dir = workspaces.acquire()
+        try:
+            src_path = os.path.join(work_dir, 'main.c')
+            with open(src_path, 'w', encoding='utf-8') as src_file:
                 src_file.write(code)
-                src_path = src_file.name
-            
-            print(f"🔧 Compiling C with: {compiler}")
             
-            # Compile C code
-            exe_path = src_path + '.exe'
-            compile_process = subprocess.run(
-                [compiler, src_path, '-o', exe_path],
-                capture_output=True,
-                text=True,
-                timeout=timeout
-            )
-            
-            if compile_process.returncode != 0:
-                try:
-                    os.unlink(src_path)
-                except:
-                    pass
-                return {
-                    'success': False,
-                    'output': '',
-                    'error': compile_process.stderr,
-                    'exit_code': compile_process.returncode
-                }
-            
-            print("✅ C compilation successful, executing...")
+            exe_path = os.path.join(work_dir, 'main.exe' if os.name == 'nt' else 'main')
+            cache_key = compile_cache.make_key('c', build.compiler, build.flags, code)
+            
+            compile_process = None
+            if compile_cache.fetch_file(cache_key, 'main', exe_path):
+                print("⚡ C compile cache hit, executing...")
+            else:
+                print(f"🔧 Compiling C ({build.profile}) with: {build.compiler}")
+                
+                # Compile C code (diagnostics are reported with the result, not streamed)
+                with stream_output(None):
+                    compile_process = run_bounded(
+                        [build.compiler, src_path, '-o', exe_path, *build.flags],
+                        timeout=timeout
+                    )
+                
+                if compile_process.returncode != 0:
+                    return compilation_error_result(compile_process)
+                
+                compile_cache.store(cache_key, {'main': exe_path})
+                print("✅ C compilation successful, executing...")
             
             # Execute the compiled program
-            exec_process = subprocess.run(
+            exec_process = run_bounded(
                 [exe_path],
                 input=input_data,
-                capture_output=True,
-                text=True,
-                timeout=timeout
+                timeout=timeout,
+                memory_limit=memory_limit
             )
             
-            # Cleanup
-            try:
-                os.unlink(src_path)
-                os.unlink(exe_path)
-            except:
-                pass
+            if exec_process.output_limit_exceeded:
+                return output_limit_result(exec_process)
+            
+            if exec_process.memory_limit_exceeded:
+                return memory_limit_result(exec_process)
             
             return {
                 'success': True,
                 'output': exec_process.stdout,
                 'error': exec_process.stderr,
-                'exit_code': exec_process.returncode
+                'exit_code': exec_process.returncode,
+                **resource_fields(exec_process, compile_process)
             }
             
         except subprocess.TimeoutExpired:
-            try:
-                os.unlink(src_path)
-                if 'exe_path' in locals():
-                    os.unlink(exe_path)
-            except:
-                pass
             return {
                 'success': False,
                 'output': '',
@@ -117,22 +103,23 @@ class CLanguage(BaseLanguage):
                 'exit_code': -1
             }
         except Exception as e:
-            try:
-                if 'src_path' in locals():
-                    os.unlink(src_path)
-                if 'exe_path' in locals():
-                    os.unlink(exe_path)
-            except:
-                pass
+            if isinstance(e, OSError):
+                # The resolved compiler vanished or broke; re-probe on the next request
+                toolchains.invalidate('gcc')
             return {
                 'success': False,
                 'output': '',
                 'error': f'C compilation error: {str(e)}',
                 'exit_code': -1
             }
+        finally:
+            # Emptied on the recycler thread, off the request path
+            workspaces.release(work_dir)
     
-    def execute(self, code: str, input_data: str, timeout: int, memory_limit: int) -> Dict[str, Any]:
-        return self.compile_code(code, input_data, timeout, memory_limit)
+    def execute(self, code: str, input_data: str, timeout: int, memory_limit: int,
+                build_profile: str = None, compiler_options: str = None) -> Dict[str, Any]:
+        return self.compile_code(code, input_data, timeout, memory_limit,
+                                 build_profile=build_profile, compiler_options=compiler_options)
 
 class CppLanguage(BaseLanguage):
     @property
@@ -144,30 +131,11 @@ class CppLanguage(BaseLanguage):
         return ".cpp"
     
     def _find_compiler(self):
-        """Find G++ compiler using known Chocolatey location"""
-        # Known Chocolatey MinGW location
-        known_paths = [
-            r"C:\ProgramData\mingw64\mingw64\bin\g++.exe",
-            r"C:\tools\mingw64\bin\g++.exe"
-        ]
-        
-        for compiler_path in known_paths:
-            if os.path.exists(compiler_path):
-                print(f"🎯 Found G++ at: {compiler_path}")
-                return compiler_path
-        
-        # Also try PATH
-        try:
-            subprocess.run(['g++', '--version'], capture_output=True, timeout=2)
-            print("🎯 Found G++ in PATH")
-            return 'g++'
-        except:
-            pass
-        
-        print("❌ G++ compiler not found")
-        return None
+        """Resolved G++ from the toolchain registry (Chocolatey MinGW paths first, then PATH)"""
+        return toolchains.path('g++')
     
-    def compile_code(self, code: str, input_data: str, timeout: int, memory_limit: int) -> Dict[str, Any]:
+    def compile_code(self, code: str, input_data: str, timeout: int, memory_limit: int,
+                     build_profile: str = None, compiler_options: str = None) -> Dict[str, Any]:
         compiler = self._find_compiler()
         
         if not compiler:
@@ -179,66 +147,73 @@ class CppLanguage(BaseLanguage):
             }
         
         try:
-            # Create temporary C++ file
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.cpp', delete=False, encoding='utf-8') as src_file:
+            build = build_settings('cpp', compiler, build_profile, compiler_options)
+        except BuildOptionsError as e:
+            return {
+                'success': False,
+                'output': '',
+                'error': str(e),
+                'exit_code': -1
+            }
+        
+        work_dir = workspaces.acquire()
+        try:
+            src_path = os.path.join(work_dir, 'main.cpp')
+            with open(src_path, 'w', encoding='utf-8') as src_file:
                 src_file.write(code)
-                src_path = src_file.name
-            
-            print(f"🔧 Compiling C++ with: {compiler}")
             
-            # Compile C++ code
-            exe_path = src_path + '.exe'
-            compile_process = subprocess.run(
-                [compiler, src_path, '-o', exe_path],
-                capture_output=True,
-                text=True,
-                timeout=timeout
-            )
-            
-            if compile_process.returncode != 0:
-                try:
-                    os.unlink(src_path)
-                except:
-                    pass
-                return {
-                    'success': False,
-                    'output': '',
-                    'error': compile_process.stderr,
-                    'exit_code': compile_process.returncode
-                }
-            
-            print("✅ C++ compilation successful, executing...")
+            exe_path = os.path.join(work_dir, 'main.exe' if os.name == 'nt' else 'main')
+            cache_key = compile_cache.make_key('cpp', build.compiler, build.flags, code)
+            
+            compile_process = None
+            if compile_cache.fetch_file(cache_key, 'main', exe_path):
+                print("⚡ C++ compile cache hit, executing...")
+            else:
+                print(f"🔧 Compiling C++ ({build.profile}) with: {build.compiler}")
+                
+                # Compile C++ code, loading the common headers from a PCH when one covers them
+                pch_args = [] if build.custom else precompiled_headers.include_args(build.compiler, build.flags, code)
+                with stream_output(None):
+                    compile_process = run_bounded(
+                        [build.compiler, *pch_args, src_path, '-o', exe_path, *build.flags],
+                        timeout=timeout
+                    )
+                    if compile_process.returncode != 0 and pch_args:
+                        # Rule the PCH out and report the diagnostics of a plain compile
+                        compile_process = run_bounded(
+                            [build.compiler, src_path, '-o', exe_path, *build.flags],
+                            timeout=timeout
+                        )
+                
+                if compile_process.returncode != 0:
+                    return compilation_error_result(compile_process)
+                
+                compile_cache.store(cache_key, {'main': exe_path})
+                print("✅ C++ compilation successful, executing...")
             
             # Execute the compiled program
-            exec_process = subprocess.run(
+            exec_process = run_bounded(
                 [exe_path],
                 input=input_data,
-                capture_output=True,
-                text=True,
-                timeout=timeout
+                timeout=timeout,
+                memory_limit=memory_limit
             )
             
-            # Cleanup
-            try:
-                os.unlink(src_path)
-                os.unlink(exe_path)
-            except:
-                pass
+            if exec_process.output_limit_exceeded:
+                return output_limit_result(exec_process)
+            
+            if exec_process.memory_limit_exceeded:
+                return memory_limit_result(exec_process)
             
             return {
                 'success': True,
                 'output': exec_process.stdout,
                 'error': exec_process.stderr,
-                'exit_code': exec_process.returncode
+                'exit_code': exec_process.returncode,
+                **resource_fields(exec_process, compile_process)
             }
             
         except subprocess.TimeoutExpired:
-            try:
-                os.unlink(src_path)
-                if 'exe_path' in locals():
-                    os.unlink(exe_path)
-            except:
-                pass
             return {
                 'success': False,
                 'output': '',
@@ -246,19 +221,20 @@ class CppLanguage(BaseLanguage):
                 'exit_code': -1
             }
         except Exception as e:
-            try:
-                if 'src_path' in locals():
-                    os.unlink(src_path)
-                if 'exe_path' in locals():
-                    os.unlink(exe_path)
-            except:
-                pass
+            if isinstance(e, OSError):
+                # The resolved compiler vanished or broke; re-probe on the next request
+                toolchains.invalidate('g++')
             return {
                 'success': False,
                 'output': '',
                 'error': f'C++ compilation error: {str(e)}',
                 'exit_code': -1
             }
+        finally:
+            # Emptied on the recycler thread, off the request path
+            workspaces.release(work_dir)
     
-    def execute(self, code: str, input_data: str, timeout: int, memory_limit: int) -> Dict[str, Any]:
-        return self.compile_code(code, input_data, timeout, memory_limit)
\ No newline at end of file
+    def execute(self, code: str, input_data: str, timeout: int, memory_limit: int,
+                build_profile: str = None, compiler_options: str = None) -> Dict[str, Any]:
+        return self.compile_code(code, input_data, timeout, memory_limit,
+                                 build_profile=build_profile, compiler_options=compiler_options)
\ No newline at end of file
@@ -1,10 +1,40 @@
 # src/languages/go.py
 import os
-import tempfile
 import subprocess
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from src.core.compile_cache import BuildCacheDir, compile_cache
+from src.core.config import config
+from src.core.output_capture import BoundedProcess, compilation_error_result, memory_limit_result, output_limit_result, resource_fields, run_bounded, stream_output
+from src.core.toolchains import toolchains
+from src.core.workspace import workspaces
 from src.languages.base import BaseLanguage
 
+# GOCACHE shared by every build so the standard library is compiled once per node
+go_build_cache = BuildCacheDir(config.GO_BUILD_CACHE_DIR, config.GO_BUILD_CACHE_MAX_BYTES)
+
+def build_go(code: str, src_path: str, exe_path: str, timeout: float) -> Optional[BoundedProcess]:
+    """Produce exe_path from code, reusing the binary of an identical earlier build.
+    
+    Returns the `go build` process (check its returncode), or None on a cache hit.
+    """
+    go = toolchains.command('go')
+    cache_key = compile_cache.make_key('go', go, [], code)
+    if compile_cache.fetch_file(cache_key, 'main', exe_path):
+        return None
+    
+    with stream_output(None):
+        build_process = run_bounded(
+            [go, 'build', '-o', exe_path, src_path],
+            timeout=timeout,
+            cwd=os.path.dirname(src_path),
+            env=dict(os.environ, GOCACHE=os.path.abspath(go_build_cache.path))
+        )
+    go_build_cache.maybe_trim()
+    
+    if build_process.returncode == 0:
+        compile_cache.store(cache_key, {'main': exe_path})
+    return build_process
+
 class GoLanguage(BaseLanguage):
     @property
     def name(self) -> str:
@@ -15,29 +45,36 @@ class GoLanguage(BaseLanguage):
         return ".go"
     
     def compile_code(self, code: str, input_data: str, timeout: int, memory_limit: int) -> Dict[str, Any]:
+        work_dir = workspaces.acquire()
         try:
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.go', delete=False, encoding='utf-8') as src_file:
+            src_path = os.path.join(work_dir, 'main.go')
+            with open(src_path, 'w', encoding='utf-8') as src_file:
                 src_file.write(code)
-                src_path = src_file.name
             
-            exec_process = subprocess.run(
-                ['go', 'run', src_path],
+            exe_path = os.path.join(work_dir, 'main.exe' if os.name == 'nt' else 'main')
+            build_process = build_go(code, src_path, exe_path, timeout)
+            if build_process is not None and build_process.returncode != 0:
+                return compilation_error_result(build_process)
+            
+            exec_process = run_bounded(
+                [exe_path],
                 input=input_data,
-                capture_output=True,
-                text=True,
-                timeout=timeout
+                timeout=timeout,
+                memory_limit=memory_limit
             )
             
-            try:
-                os.unlink(src_path)
-            except:
-                pass
+            if exec_process.output_limit_exceeded:
+                return output_limit_result(exec_process)
+            
+            if exec_process.memory_limit_exceeded:
+                return memory_limit_result(exec_process)
             
             return {
                 'success': True,
                 'output': exec_process.stdout,
                 'error': exec_process.stderr,
-                'exit_code': exec_process.returncode
+                'exit_code': exec_process.returncode,
+                **resource_fields(exec_process, build_process)
             }
             
         except subprocess.TimeoutExpired:
@@ -54,6 +91,8 @@ class GoLanguage(BaseLanguage):
                 'error': str(e),
                 'exit_code': -1
             }
+        finally:
+            workspaces.release(work_dir)
     
     def execute(self, code: str, input_data: str, timeout: int, memory_limit: int) -> Dict[str, Any]:
         return self.compile_code(code, input_data, timeout, memory_limit)
\ No newline at end of file
@@ -1,10 +1,106 @@
 # src/languages/java.py
 import os
+import hashlib
+import logging
+import shutil
 import tempfile
+import threading
 import subprocess
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from src.core.compile_cache import compile_cache
+from src.core.config import config
+from src.core.output_capture import compilation_error_result, memory_limit_result, output_limit_result, resource_fields, run_bounded, stream_output
+from src.core.toolchains import toolchains
+from src.core.warm_pool import WarmProcessPool
+from src.core.workspace import workspaces
 from src.languages.base import BaseLanguage
 
+logger = logging.getLogger(__name__)
+
+_RUNNER_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'java_runner', 'PoolRunner.java')
+COMPILER_UNAVAILABLE = 200  # PoolRunner exit status when the JVM has no in-process javac
+
+_java_pool: Optional[WarmProcessPool] = None
+_java_pool_failed = False
+_java_pool_lock = threading.Lock()
+
+def _build_runner() -> str:
+    """Compile PoolRunner once per source revision and return its class directory"""
+    with open(_RUNNER_SOURCE, 'rb') as f:
+        revision = hashlib.sha256(f.read()).hexdigest()[:16]
+    runner_dir = os.path.join(config.JAVA_RUNNER_DIR, revision)
+    if os.path.exists(os.path.join(runner_dir, 'PoolRunner.class')):
+        return runner_dir
+    
+    os.makedirs(config.JAVA_RUNNER_DIR, exist_ok=True)
+    staging_dir = tempfile.mkdtemp(dir=config.JAVA_RUNNER_DIR)
+    try:
+        subprocess.run([toolchains.command('javac'), '-d', staging_dir, _RUNNER_SOURCE],
+                       capture_output=True, check=True, timeout=60)
+        os.rename(staging_dir, runner_dir)
+    except OSError:
+        # Another process finished the build first
+        if not os.path.exists(os.path.join(runner_dir, 'PoolRunner.class')):
+            raise
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+    return runner_dir
+
+def get_java_pool() -> Optional[WarmProcessPool]:
+    """Shared pool of warm JVMs; None when disabled or no JDK is installed"""
+    global _java_pool, _java_pool_failed
+    if config.JAVA_POOL_SIZE <= 0:
+        return None
+    
+    with _java_pool_lock:
+        if _java_pool is None and not _java_pool_failed:
+            try:
+                runner_dir = _build_runner()
+            except (OSError, subprocess.SubprocessError) as e:
+                logger.warning(f"Java JVM pool disabled, using cold java: {e}")
+                _java_pool_failed = True
+                return None
+            
+            _java_pool = WarmProcessPool(
+                name="java",
+                argv=[toolchains.command('java'), *config.JAVA_POOL_JVM_ARGS,
+                      f'-Dpool.warmup={str(config.JAVA_POOL_WARMUP).lower()}',
+                      '-cp', runner_dir, 'PoolRunner'],
+                size=config.JAVA_POOL_SIZE
+            )
+            _java_pool.start()
+        return _java_pool
+
+def compile_java(class_dir: str, src_path: str, timeout: float) -> subprocess.CompletedProcess:
+    """Compile into class_dir, preferring a warm JVM's in-process compiler"""
+    pool = get_java_pool()
+    with stream_output(None):
+        if pool is not None:
+            job = f"compile\t{class_dir}\t{src_path}\n".encode('utf-8')
+            completed = pool.run(job, timeout=timeout, text=True)
+            if completed.returncode != COMPILER_UNAVAILABLE:
+                return completed
+        
+        return run_bounded(
+            [toolchains.command('javac'), '-d', class_dir, src_path],
+            timeout=timeout
+        )
+
+def run_java(class_dir: str, class_name: str, input_data: str, timeout: float,
+             memory_limit: Optional[int] = None) -> subprocess.CompletedProcess:
+    """Run main in a fresh class loader on a warm JVM (cold java when the pool is off)"""
+    pool = get_java_pool()
+    if pool is None:
+        return run_bounded(
+            [toolchains.command('java'), '-cp', class_dir, class_name],
+            input=input_data,
+            timeout=timeout,
+            memory_limit=memory_limit
+        )
+    
+    job = f"run\t{class_dir}\t{class_name}\n".encode('utf-8') + (input_data or '').encode('utf-8')
+    return pool.run(job, timeout=timeout, text=True, memory_limit=memory_limit)
+
 class JavaLanguage(BaseLanguage):
     @property
     def name(self) -> str:
@@ -15,11 +111,9 @@ class JavaLanguage(BaseLanguage):
         return ".java"
     
     def compile_code(self, code: str, input_data: str, timeout: int, memory_limit: int) -> Dict[str, Any]:
+        # Per-run directory, so concurrent runs never share Main.class
+        class_dir = workspaces.acquire()
         try:
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.java', delete=False, encoding='utf-8') as src_file:
-                src_file.write(code)
-                src_path = src_file.name
-            
             class_name = "Main"
             for line in code.split('\n'):
                 if 'class' in line and '{' in line:
@@ -32,43 +126,38 @@ class JavaLanguage(BaseLanguage):
                                 class_name = class_name.split('{')[0]
                             break
             
-            compile_process = subprocess.run(
-                ['javac', src_path],
-                capture_output=True,
-                text=True,
-                timeout=timeout
-            )
+            # javac requires a public class to live in <ClassName>.java
+            src_path = os.path.join(class_dir, f"{class_name}.java")
+            with open(src_path, 'w', encoding='utf-8') as src_file:
+                src_file.write(code)
             
-            if compile_process.returncode != 0:
-                return {
-                    'success': False,
-                    'output': '',
-                    'error': compile_process.stderr,
-                    'exit_code': compile_process.returncode
-                }
+            cache_key = compile_cache.make_key('java', 'javac', [], code)
+            compile_process = None
+            if not compile_cache.fetch(cache_key, class_dir):
+                compile_process = compile_java(class_dir, src_path, timeout)
+                
+                if compile_process.returncode != 0:
+                    return compilation_error_result(compile_process)
+                
+                compile_cache.store(cache_key, {
+                    name: os.path.join(class_dir, name)
+                    for name in os.listdir(class_dir) if name.endswith('.class')
+                })
             
-            class_dir = os.path.dirname(src_path)
-            exec_process = subprocess.run(
-                ['java', '-cp', class_dir, class_name],
-                input=input_data,
-                capture_output=True,
-                text=True,
-                timeout=timeout
-            )
+            exec_process = run_java(class_dir, class_name, input_data, timeout, memory_limit)
             
-            try:
-                os.unlink(src_path)
-                class_file = os.path.join(class_dir, f"{class_name}.class")
-                if os.path.exists(class_file):
-                    os.unlink(class_file)
-            except:
-                pass
+            if exec_process.output_limit_exceeded:
+                return output_limit_result(exec_process)
+            
+            if exec_process.memory_limit_exceeded:
+                return memory_limit_result(exec_process)
             
             return {
                 'success': True,
                 'output': exec_process.stdout,
                 'error': exec_process.stderr,
-                'exit_code': exec_process.returncode
+                'exit_code': exec_process.returncode,
+                **resource_fields(exec_process, compile_process)
             }
             
         except subprocess.TimeoutExpired:
@@ -85,6 +174,8 @@ class JavaLanguage(BaseLanguage):
                 'error': str(e),
                 'exit_code': -1
             }
+        finally:
+            workspaces.release(class_dir)
     
     def execute(self, code: str, input_data: str, timeout: int, memory_limit: int) -> Dict[str, Any]:
         return self.compile_code(code, input_data, timeout, memory_limit)
\ No newline at end of file
@@ -0,0 +1,148 @@
+import java.io.ByteArrayOutputStream;
+import java.io.File;
+import java.io.IOException;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.lang.reflect.Modifier;
+import java.net.URL;
+import java.net.URLClassLoader;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.util.ArrayList;
+import java.util.List;
+import javax.tools.JavaCompiler;
+import javax.tools.ToolProvider;
+
+/**
+ * Warm JVM worker for the Java execution pool (src/languages/java.py).
+ *
+ * The JVM is started ahead of time and blocks on stdin until it receives one
+ * tab-separated job header line:
+ *
+ *   compile	<output dir>	<source file>   compile in-process, exit with javac's status
+ *   run	<class dir>	<main class>        load the class in a fresh class loader and run main
+ *
+ * For "run", everything after the header on stdin is the program's input.
+ * Every worker handles exactly one job; the pool starts a new JVM afterwards.
+ */
+public class PoolRunner {
+    /** Exit status telling the pool to fall back to the javac executable. */
+    private static final int COMPILER_UNAVAILABLE = 200;
+
+    public static void main(String[] args) throws Throwable {
+        if (Boolean.getBoolean("pool.warmup")) {
+            warmUpCompiler();
+        }
+
+        String header = readHeader();
+        if (header == null) {
+            return;
+        }
+        String[] job = header.split("\t");
+        if (job.length != 3) {
+            System.err.println("PoolRunner: malformed job header");
+            System.exit(2);
+        }
+
+        if (job[0].equals("compile")) {
+            System.exit(compile(job[1], job[2]));
+        } else if (job[0].equals("run")) {
+            run(job[1], job[2]);
+        } else {
+            System.err.println("PoolRunner: unknown job type " + job[0]);
+            System.exit(2);
+        }
+    }
+
+    /** Reads the header without consuming the submission's stdin that follows it. */
+    private static String readHeader() throws IOException {
+        ByteArrayOutputStream line = new ByteArrayOutputStream();
+        int b;
+        while ((b = System.in.read()) != -1 && b != '\n') {
+            line.write(b);
+        }
+        if (b == -1 && line.size() == 0) {
+            return null;
+        }
+        return new String(line.toByteArray(), StandardCharsets.UTF_8);
+    }
+
+    private static int compile(String outputDir, String sourceFile) {
+        JavaCompiler compiler = ToolProvider.getSystemJavaCompiler();
+        if (compiler == null) {
+            System.err.println("PoolRunner: no in-process compiler (JRE without javac)");
+            return COMPILER_UNAVAILABLE;
+        }
+        return compiler.run(null, null, null, "-d", outputDir, sourceFile);
+    }
+
+    private static void run(String classDir, String className) throws Throwable {
+        // Parent is the platform loader so submissions never see PoolRunner's classpath
+        URLClassLoader loader = new URLClassLoader(
+            new URL[] { new File(classDir).toURI().toURL() },
+            ClassLoader.getPlatformClassLoader()
+        );
+        Thread.currentThread().setContextClassLoader(loader);
+
+        Method main;
+        try {
+            Class<?> mainClass = Class.forName(className, true, loader);
+            main = mainClass.getMethod("main", String[].class);
+        } catch (ClassNotFoundException | NoSuchMethodException e) {
+            System.err.println("Error: Could not find main method in class " + className);
+            System.exit(1);
+            return;
+        }
+        if (!Modifier.isStatic(main.getModifiers())) {
+            System.err.println("Error: Main method is not static in class " + className);
+            System.exit(1);
+        }
+        main.setAccessible(true);
+
+        try {
+            main.invoke(null, (Object) new String[0]);
+        } catch (InvocationTargetException e) {
+            // Rethrow as if main had thrown it directly: same message, exit status 1
+            Throwable cause = e.getCause();
+            cause.setStackTrace(trimRunnerFrames(cause.getStackTrace()));
+            throw cause;
+        }
+        // Returning lets the JVM wait for non-daemon threads, like `java -cp`
+    }
+
+    private static StackTraceElement[] trimRunnerFrames(StackTraceElement[] frames) {
+        List<StackTraceElement> kept = new ArrayList<>();
+        for (StackTraceElement frame : frames) {
+            String owner = frame.getClassName();
+            if (owner.startsWith("jdk.internal.reflect.") || owner.startsWith("java.lang.reflect.")
+                    || owner.equals(PoolRunner.class.getName())) {
+                break;
+            }
+            kept.add(frame);
+        }
+        return kept.toArray(new StackTraceElement[0]);
+    }
+
+    /** Loads and exercises javac while the worker is idle so the real compile starts hot. */
+    private static void warmUpCompiler() {
+        JavaCompiler compiler = ToolProvider.getSystemJavaCompiler();
+        if (compiler == null) {
+            return;
+        }
+        try {
+            Path dir = Files.createTempDirectory("pool-warmup");
+            Path source = dir.resolve("Warmup.java");
+            Files.write(source, "public class Warmup { public static void main(String[] a) {} }"
+                .getBytes(StandardCharsets.UTF_8));
+            compiler.run(null, new ByteArrayOutputStream(), new ByteArrayOutputStream(),
+                "-d", dir.toString(), source.toString());
+            for (File file : dir.toFile().listFiles()) {
+                file.delete();
+            }
+            Files.delete(dir);
+        } catch (IOException ignored) {
+            // Warm-up is best effort
+        }
+    }
+}
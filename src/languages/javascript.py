@@ -1,8 +1,10 @@
 # src/languages/javascript.py
 import os
-import tempfile
 import subprocess
 from typing import Dict, Any
+from src.core.output_capture import memory_limit_result, output_limit_result, resource_fields, run_bounded
+from src.core.toolchains import toolchains
+from src.core.workspace import workspaces
 from src.languages.base import BaseLanguage
 
 class JavaScriptLanguage(BaseLanguage):
@@ -15,29 +17,31 @@ class JavaScriptLanguage(BaseLanguage):
         return ".js"
     
     def compile_code(self, code: str, input_data: str, timeout: int, memory_limit: int) -> Dict[str, Any]:
+        work_dir = workspaces.acquire()
         try:
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False, encoding='utf-8') as src_file:
+            src_path = os.path.join(work_dir, 'main.js')
+            with open(src_path, 'w', encoding='utf-8') as src_file:
                 src_file.write(code)
-                src_path = src_file.name
             
-            exec_process = subprocess.run(
-                ['node', src_path],
+            exec_process = run_bounded(
+                [toolchains.command('node'), src_path],
                 input=input_data,
-                capture_output=True,
-                text=True,
-                timeout=timeout
+                timeout=timeout,
+                memory_limit=memory_limit
             )
             
-            try:
-                os.unlink(src_path)
-            except:
-                pass
+            if exec_process.output_limit_exceeded:
+                return output_limit_result(exec_process)
+            
+            if exec_process.memory_limit_exceeded:
+                return memory_limit_result(exec_process)
             
             return {
                 'success': True,
                 'output': exec_process.stdout,
                 'error': exec_process.stderr,
-                'exit_code': exec_process.returncode
+                'exit_code': exec_process.returncode,
+                **resource_fields(exec_process)
             }
             
         except subprocess.TimeoutExpired:
@@ -54,6 +58,8 @@ class JavaScriptLanguage(BaseLanguage):
                 'error': str(e),
                 'exit_code': -1
             }
+        finally:
+            workspaces.release(work_dir)
     
     def execute(self, code: str, input_data: str, timeout: int, memory_limit: int) -> Dict[str, Any]:
         return self.compile_code(code, input_data, timeout, memory_limit)
\ No newline at end of file
@@ -1,10 +1,72 @@
 # src/languages/python.py
 import os
-import tempfile
+import json
 import subprocess
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from src.core.config import config
+from src.core.output_capture import memory_limit_result, output_limit_result, resource_fields, run_bounded
+from src.core.warm_pool import WarmProcessPool
+from src.core.workspace import workspaces
 from src.languages.base import BaseLanguage
 
+# Runs inside a pre-started interpreter: reads one length-prefixed job from fd 0,
+# then executes it as __main__. Everything after the job on stdin is left
+# untouched for the submission to read.
+_WORKER_BOOTSTRAP = r'''
+import os, sys, types, linecache
+def _read_exact(size):
+    data = b""
+    while len(data) < size:
+        chunk = os.read(0, size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+_header = b""
+while not _header.endswith(b"\n"):
+    _byte = os.read(0, 1)
+    if not _byte:
+        sys.exit(0)
+    _header += _byte
+_job = __import__("json").loads(_read_exact(int(_header)).decode("utf-8"))
+_source = _job["code"]
+linecache.cache["main.py"] = (len(_source), None, _source.splitlines(True), "main.py")
+# Like `python main.py` in a workspace: the (empty) working directory is the script's directory
+sys.path.insert(0, os.getcwd())
+_main = types.ModuleType("__main__")
+_main.__file__ = "main.py"
+sys.modules["__main__"] = _main
+sys.argv = ["main.py"]
+try:
+    exec(compile(_source, "main.py", "exec"), _main.__dict__)
+except SystemExit:
+    raise
+except BaseException as _error:
+    import traceback
+    traceback.print_exception(type(_error), _error, _error.__traceback__.tb_next)
+    sys.exit(1)
+'''
+
+# Shared by PythonLanguage and api.py. -I keeps the server's directory (and
+# PYTHON* variables) off sys.path; each worker runs in its own empty workspace.
+python_pool = WarmProcessPool(
+    name="python",
+    argv=[config.PYTHON_INTERPRETER, "-I", "-c", _WORKER_BOOTSTRAP],
+    size=config.PYTHON_POOL_SIZE,
+    workspace=True
+)
+
+def encode_python_job(code: str, input_data: str) -> bytes:
+    """Frame a submission for a warm worker: length-prefixed JSON header, then raw stdin"""
+    header = json.dumps({"code": code}).encode('utf-8')
+    return str(len(header)).encode() + b"\n" + header + (input_data or "").encode('utf-8')
+
+def run_python_pooled(code: str, input_data: str, timeout: float,
+                      memory_limit: Optional[int] = None) -> subprocess.CompletedProcess:
+    """Run on a warm interpreter; output is decoded like subprocess.run(text=True)"""
+    return python_pool.run(encode_python_job(code, input_data), timeout=timeout, text=True,
+                           memory_limit=memory_limit)
+
 class PythonLanguage(BaseLanguage):
     @property
     def name(self) -> str:
@@ -16,28 +78,33 @@ class PythonLanguage(BaseLanguage):
     
     def compile_code(self, code: str, input_data: str, timeout: int, memory_limit: int) -> Dict[str, Any]:
         try:
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False, encoding='utf-8') as src_file:
-                src_file.write(code)
-                src_path = src_file.name
+            if python_pool.enabled:
+                exec_process = run_python_pooled(code, input_data, timeout, memory_limit)
+            else:
+                with workspaces.workspace() as work_dir:
+                    src_path = os.path.join(work_dir, 'main.py')
+                    with open(src_path, 'w', encoding='utf-8') as src_file:
+                        src_file.write(code)
+                    
+                    exec_process = run_bounded(
+                        [config.PYTHON_INTERPRETER, src_path],
+                        input=input_data,
+                        timeout=timeout,
+                        memory_limit=memory_limit
+                    )
             
-            exec_process = subprocess.run(
-                ['python', src_path],
-                input=input_data,
-                capture_output=True,
-                text=True,
-                timeout=timeout
-            )
+            if exec_process.output_limit_exceeded:
+                return output_limit_result(exec_process)
             
-            try:
-                os.unlink(src_path)
-            except:
-                pass
+            if exec_process.memory_limit_exceeded:
+                return memory_limit_result(exec_process)
             
             return {
                 'success': True,
                 'output': exec_process.stdout,
                 'error': exec_process.stderr,
-                'exit_code': exec_process.returncode
+                'exit_code': exec_process.returncode,
+                **resource_fields(exec_process)
             }
             
         except subprocess.TimeoutExpired:
@@ -56,4 +123,4 @@ class PythonLanguage(BaseLanguage):
             }
     
     def execute(self, code: str, input_data: str, timeout: int, memory_limit: int) -> Dict[str, Any]:
-        return self.compile_code(code, input_data, timeout, memory_limit)
\ No newline at end of file
+        return self.compile_code(code, input_data, timeout, memory_limit)
@@ -1,10 +1,186 @@
 # src/languages/rust.py
+import hashlib
+import json
+import logging
 import os
-import tempfile
+import re
+import shutil
 import subprocess
-from typing import Dict, Any
+import sys
+import threading
+from typing import Dict, Any, List, Optional
+from src.core.build_profiles import BuildOptionsError, build_settings
+from src.core.compile_cache import compile_cache, compiler_version
+from src.core.config import config
+from src.core.output_capture import BoundedProcess, compilation_error_result, memory_limit_result, output_limit_result, resource_fields, run_bounded, stream_output
+from src.core.toolchains import toolchains
+from src.core.workspace import workspaces
 from src.languages.base import BaseLanguage
 
+logger = logging.getLogger(__name__)
+
+_CRATE_BUILD_TIMEOUT = 900
+
+class RustCrates:
+    """Common crates (rand, itertools, regex) built once per toolchain and linked offline.
+    
+    Cargo builds an empty library crate that depends on every configured
+    crate under root/<key>/, key = rustc version + crate list, and the rlibs
+    of those crates are recorded in externs.json. A submission that names a
+    crate gets `--extern name=<rlib>` and `-L dependency=<deps>`, so nothing is
+    fetched or compiled per submission. Builds for older toolchains are
+    removed once a new one is ready.
+    """
+    
+    def __init__(self, root: str, crates: Dict[str, str], enabled: bool = True):
+        self.root = root
+        self.crates = crates
+        self.enabled = enabled and bool(crates)
+        self._externs: Optional[Dict[str, str]] = None
+        self._externs_dir: Optional[str] = None  # directory() the externs were read from
+        self._building = False
+        self._lock = threading.Lock()
+    
+    def directory(self) -> str:
+        digest = hashlib.sha256()
+        crates = sorted(f'{name}={version}' for name, version in self.crates.items())
+        for part in [compiler_version(toolchains.command('rustc')), *crates]:
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return os.path.join(self.root, digest.hexdigest()[:16])
+    
+    def externs(self) -> Dict[str, str]:
+        """crate name -> rlib path, empty until the crates are built"""
+        if not self.enabled:
+            return {}
+        directory = self.directory()
+        if self._externs is None or self._externs_dir != directory:
+            # First call, or the toolchain registry now reports another rustc
+            try:
+                with open(os.path.join(directory, 'externs.json')) as f:
+                    self._externs = json.load(f)
+            except (OSError, ValueError):
+                return {}
+            self._externs_dir = directory
+        return self._externs
+    
+    def extern_args(self, code: str) -> List[str]:
+        """rustc arguments for the prebuilt crates this code refers to"""
+        externs = self.externs()
+        used = [name for name in externs
+                if re.search(rf'\b{name}\s*::|\bextern\s+crate\s+{name}\b', code)]
+        if not used:
+            return []
+        args = ['-L', f"dependency={os.path.join(self.directory(), 'target', 'release', 'deps')}"]
+        for name in used:
+            args += ['--extern', f'{name}={externs[name]}']
+        return args
+    
+    def start(self) -> None:
+        """Build the crates in the background unless they are ready (first build takes about a minute)"""
+        with self._lock:
+            if not self.enabled or self._building or self.externs():
+                return
+            self._building = True
+        threading.Thread(target=self._prepare_in_background, name="rust-crates", daemon=True).start()
+    
+    def prepare(self, fetch: bool = False) -> bool:
+        """Build the crates (fetch=True downloads them first, e.g. at image build time)"""
+        rustc, cargo = toolchains.path('rustc'), toolchains.path('cargo')
+        if not self.enabled or not rustc or not cargo:
+            return False
+        directory = self.directory()
+        os.makedirs(os.path.join(directory, 'src'), exist_ok=True)
+        dependencies = ''.join(f'{name} = "{version}"\n' for name, version in sorted(self.crates.items()))
+        with open(os.path.join(directory, 'Cargo.toml'), 'w') as f:
+            f.write(f'[package]\nname = "judge-crates"\nversion = "0.0.0"\nedition = "2021"\n\n'
+                    f'[dependencies]\n{dependencies}')
+        with open(os.path.join(directory, 'src', 'lib.rs'), 'w') as f:
+            f.write('')
+        
+        # Cargo locks the target directory, so concurrent builds from other processes just wait
+        env = dict(os.environ, RUSTC=rustc)
+        if fetch:
+            subprocess.run([cargo, 'fetch'], cwd=directory, env=env, check=True, timeout=_CRATE_BUILD_TIMEOUT)
+        process = subprocess.run(
+            [cargo, 'build', '--release', '--offline', '--message-format=json'],
+            cwd=directory, env=env, capture_output=True, text=True, timeout=_CRATE_BUILD_TIMEOUT
+        )
+        if process.returncode != 0:
+            logger.warning(f"Could not build Rust crates: {process.stderr[-1000:]}")
+            return False
+        
+        externs = {}
+        wanted = {name.replace('-', '_'): name for name in self.crates}
+        for line in process.stdout.splitlines():
+            message = json.loads(line)
+            if message.get('reason') != 'compiler-artifact' or message['target']['name'] not in wanted:
+                continue
+            rlibs = [path for path in message['filenames'] if path.endswith('.rlib')]
+            if rlibs:
+                externs[message['target']['name']] = rlibs[0]
+        missing = set(wanted) - set(externs)
+        if missing:
+            logger.warning(f"Rust crates built without {', '.join(sorted(missing))}")
+            return False
+        
+        staging = os.path.join(directory, f'externs.{os.getpid()}.json')
+        with open(staging, 'w') as f:
+            json.dump(externs, f)
+        os.replace(staging, os.path.join(directory, 'externs.json'))
+        self._externs, self._externs_dir = externs, directory
+        for entry in os.listdir(self.root):
+            if entry != os.path.basename(directory):
+                # Crates of a toolchain we no longer run
+                shutil.rmtree(os.path.join(self.root, entry), ignore_errors=True)
+        logger.info(f"Rust crates ready: {', '.join(sorted(externs))}")
+        return True
+    
+    def _prepare_in_background(self) -> None:
+        try:
+            self.prepare()
+        except (OSError, subprocess.SubprocessError, ValueError) as e:
+            logger.warning(f"Could not build Rust crates: {e}")
+        finally:
+            with self._lock:
+                self._building = False
+
+def _parse_crates(spec: str) -> Dict[str, str]:
+    """Parse RUST_CRATES ("rand=0.9,regex=1") into name -> version requirement"""
+    crates = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        name, _, version = item.partition('=')
+        crates[name.strip()] = version.strip() or '*'
+    return crates
+
+# Shared by every Rust build on this node
+rust_crates = RustCrates(config.RUST_CRATES_DIR, _parse_crates(config.RUST_CRATES),
+                         enabled=config.RUST_CRATES_ENABLED)
+
+def build_rust(code: str, src_path: str, exe_path: str, timeout: float, build_profile: str = None,
+               compiler_options: str = None) -> Optional[BoundedProcess]:
+    """Produce exe_path from code, reusing the binary of an identical earlier build.
+    
+    Returns the rustc process (check its returncode), or None on a cache hit.
+    Raises BuildOptionsError for an unknown profile or any compiler_options.
+    """
+    build = build_settings('rust', toolchains.command('rustc'), build_profile, compiler_options)
+    flags = ['--edition', config.RUST_EDITION, *build.flags, *rust_crates.extern_args(code)]
+    cache_key = compile_cache.make_key('rust', build.compiler, flags, code)
+    if compile_cache.fetch_file(cache_key, 'main', exe_path):
+        return None
+    
+    with stream_output(None):
+        build_process = run_bounded(
+            [build.compiler, src_path, '-o', exe_path, *flags],
+            timeout=timeout,
+            cwd=os.path.dirname(src_path)
+        )
+    
+    if build_process.returncode == 0:
+        compile_cache.store(cache_key, {'main': exe_path})
+    return build_process
+
 class RustLanguage(BaseLanguage):
     @property
     def name(self) -> str:
@@ -14,13 +190,81 @@ class RustLanguage(BaseLanguage):
     def extension(self) -> str:
         return ".rs"
     
-    def compile_code(self, code: str, input_data: str, timeout: int, memory_limit: int) -> Dict[str, Any]:
-        return {
-            'success': False,
-            'output': '',
-            'error': 'Rust compiler coming soon!',
-            'exit_code': -1
-        }
+    def compile_code(self, code: str, input_data: str, timeout: int, memory_limit: int,
+                     build_profile: str = None) -> Dict[str, Any]:
+        if not toolchains.path('rustc'):
+            return {
+                'success': False,
+                'output': '',
+                'error': 'Rust compiler (rustc) not found. Install it from https://rustup.rs',
+                'exit_code': -1
+            }
+        
+        work_dir = workspaces.acquire()
+        try:
+            src_path = os.path.join(work_dir, 'main.rs')
+            with open(src_path, 'w', encoding='utf-8') as src_file:
+                src_file.write(code)
+            
+            exe_path = os.path.join(work_dir, 'main.exe' if os.name == 'nt' else 'main')
+            build_process = build_rust(code, src_path, exe_path, timeout, build_profile)
+            if build_process is not None and build_process.returncode != 0:
+                return compilation_error_result(build_process)
+            
+            exec_process = run_bounded(
+                [exe_path],
+                input=input_data,
+                timeout=timeout,
+                memory_limit=memory_limit
+            )
+            
+            if exec_process.output_limit_exceeded:
+                return output_limit_result(exec_process)
+            
+            if exec_process.memory_limit_exceeded:
+                return memory_limit_result(exec_process)
+            
+            return {
+                'success': True,
+                'output': exec_process.stdout,
+                'error': exec_process.stderr,
+                'exit_code': exec_process.returncode,
+                **resource_fields(exec_process, build_process)
+            }
+        
+        except subprocess.TimeoutExpired:
+            return {
+                'success': False,
+                'output': '',
+                'error': 'Execution timeout',
+                'exit_code': -1
+            }
+        except BuildOptionsError as e:
+            return {
+                'success': False,
+                'output': '',
+                'error': str(e),
+                'exit_code': -1
+            }
+        except Exception as e:
+            if isinstance(e, OSError):
+                # The resolved compiler vanished or broke; re-probe on the next request
+                toolchains.invalidate('rustc')
+            return {
+                'success': False,
+                'output': '',
+                'error': f'Rust compilation error: {str(e)}',
+                'exit_code': -1
+            }
+        finally:
+            workspaces.release(work_dir)
     
-    def execute(self, code: str, input_data: str, timeout: int, memory_limit: int) -> Dict[str, Any]:
-        return self.compile_code(code, input_data, timeout, memory_limit)
\ No newline at end of file
+    def execute(self, code: str, input_data: str, timeout: int, memory_limit: int,
+                build_profile: str = None) -> Dict[str, Any]:
+        return self.compile_code(code, input_data, timeout, memory_limit, build_profile=build_profile)
+
+if __name__ == "__main__":
+    # python -m src.languages.rust [--fetch]: build the crates ahead of time (e.g. in the image)
+    logging.basicConfig(level=logging.INFO)
+    toolchains.discover()
+    sys.exit(0 if rust_crates.prepare(fetch='--fetch' in sys.argv[1:]) else 1)
@@ -1,10 +1,22 @@
 # src/languages/sql.py
 import os
-import tempfile
+import sqlite3
+import sys
+import json
 import subprocess
-from typing import Dict, Any
+import time
+from typing import Dict, Any, List
+from src.core.config import config
+from src.core.datasets import DatasetNotFound, datasets
+from src.core.output_capture import BoundedBuffer, memory_limit_result, output_limit_result, resource_fields, stream_stdout_only
+from src.core.sqlite_template import SQLiteTemplatePool
+from src.core.warm_pool import WarmProcessPool
 from src.languages.base import BaseLanguage
 
+# Extra time the worker process gets past the request timeout to report its
+# own deadline before it is killed
+_KILL_GRACE = 1.0
+
 class SQLLanguage(BaseLanguage):
     @property
     def name(self) -> str:
@@ -14,8 +26,9 @@ class SQLLanguage(BaseLanguage):
     def extension(self) -> str:
         return ".sql"
     
-    def _setup_sample_database(self, cursor):
-        """Set up sample tables with data for demonstration"""
+    @staticmethod
+    def _setup_sample_database(cursor):
+        """Set up sample tables with data for demonstration (runs once, into the template)"""
         # Create sample tables
         sample_schema = [
             """CREATE TABLE users (
@@ -66,89 +79,187 @@ class SQLLanguage(BaseLanguage):
             except:
                 pass  # Tables might already exist
     
-    def compile_code(self, code: str, input_data: str, timeout: int, memory_limit: int) -> Dict[str, Any]:
+    @staticmethod
+    def _split_sql_statements(code: str) -> List[str]:
+        """Split a script on the semicolons that end a statement.
+
+        sqlite3.complete_statement knows about string literals, comments and
+        CREATE TRIGGER ... BEGIN ...; END bodies, so their semicolons do not split.
+        """
+        statements = []
+        start = 0
+        for end, char in enumerate(code):
+            if char == ';' and sqlite3.complete_statement(code[start:end + 1]):
+                statement = code[start:end].strip()
+                if statement:
+                    statements.append(statement)
+                start = end + 1
+        tail = code[start:].strip()
+        if tail:
+            statements.append(tail)
+        return statements
+    
+    @staticmethod
+    def _format_rows(cursor, output: BoundedBuffer) -> int:
+        """Stream a result set into output in fetchmany batches; returns the row count.
+        
+        Only the first SQL_MAX_ROWS rows are formatted, the rest are just
+        counted (the deadline bounds how long that can take). Stops early
+        once output is over its byte cap.
+        """
+        rows = 0
+        while True:
+            batch = cursor.fetchmany(config.SQL_FETCH_SIZE)
+            if not batch:
+                return rows
+            for row in batch:
+                rows += 1
+                if rows <= config.SQL_MAX_ROWS:
+                    if not output.feed((" | ".join(str(cell) for cell in row) + "\n").encode('utf-8')):
+                        return rows
+    
+    def compile_code(self, code: str, input_data: str, timeout: int, memory_limit: int,
+                     dataset: str = None) -> Dict[str, Any]:
+        if sql_pool.enabled:
+            return run_sql_pooled(code, timeout, memory_limit, dataset)
+        return self.run_script(code, timeout, dataset)
+    
+    def run_script(self, code: str, timeout: float, dataset: str = None, output=None,
+                   conn: sqlite3.Connection = None) -> Dict[str, Any]:
+        """Execute a script in this process, formatting result sets into output.
+        
+        output is any sink with feed()/exceeded/getvalue() (a BoundedBuffer by
+        default); conn, if given, is a fresh sample database to use instead of
+        acquiring one. Called directly when SQL_WORKERS is 0, otherwise inside
+        a worker process (src/languages/sql_worker.py).
+        """
+        started = time.monotonic()
         try:
-            import sqlite3
-            
-            # Create in-memory database
-            conn = sqlite3.connect(':memory:')
+            # A named dataset is attached read-only; otherwise use a fresh clone of the sample database
+            if dataset:
+                if conn is not None:
+                    conn.close()
+                conn = datasets.connect(dataset)
+            elif conn is None:
+                conn = sample_database.acquire()
             cursor = conn.cursor()
             
-            # Set up sample database
-            self._setup_sample_database(cursor)
+            # Abort the running statement once the request's time is up (e.g. runaway WITH RECURSIVE)
+            deadline = started + timeout
+            conn.set_progress_handler(lambda: time.monotonic() > deadline, config.SQL_PROGRESS_STEPS)
             
-            # Split SQL commands
-            sql_commands = [cmd.strip() for cmd in code.split(';') if cmd.strip()]
+            sql_commands = self._split_sql_statements(code)
             
-            results = []
+            if output is None:
+                output = BoundedBuffer(config.OUTPUT_LIMIT_BYTES, config.OUTPUT_TAIL_BYTES)
             errors = []
+            statements = []
+            timed_out = False
+            
+            def emit(line: str = "") -> bool:
+                return output.feed((line + "\n").encode('utf-8'))
+            
+            if not sql_commands:
+                emit("No SQL commands found. Use semicolons to separate multiple commands.")
             
             for i, sql_command in enumerate(sql_commands):
-                if not sql_command.strip():
-                    continue
-                    
                 try:
                     # Execute SQL command
                     cursor.execute(sql_command)
                     
                     # Handle different types of SQL commands
                     sql_upper = sql_command.upper().strip()
+                    keyword = sql_upper.split()[0]
                     
-                    if sql_upper.startswith('SELECT'):
-                        # For SELECT queries, format the results nicely
-                        rows = cursor.fetchall()
-                        if cursor.description:
-                            # Get column names
-                            columns = [desc[0] for desc in cursor.description]
-                            results.append(f"Query {i+1} Results:")
-                            results.append(" | ".join(columns))
-                            results.append("-" * (len(" | ".join(columns)) + 10))
-                            
-                            for row in rows:
-                                results.append(" | ".join(str(cell) for cell in row))
-                            results.append(f"({len(rows)} row(s) returned)")
-                            results.append("")
-                        else:
-                            results.append(f"Query {i+1}: No results")
+                    if cursor.description:
+                        # Anything that returns rows (SELECT, WITH, VALUES, PRAGMA ...)
+                        columns = [desc[0] for desc in cursor.description]
+                        emit(f"Query {i+1} Results:")
+                        emit(" | ".join(columns))
+                        emit("-" * (len(" | ".join(columns)) + 10))
+                        rows = self._format_rows(cursor, output)
+                        if output.exceeded:
+                            statements.append({'statement': i + 1, 'type': keyword, 'rows': rows})
+                            break
+                        shown = f", first {config.SQL_MAX_ROWS} shown" if rows > config.SQL_MAX_ROWS else ""
+                        emit(f"({rows} row(s) returned{shown})")
+                        emit()
                     
-                    elif sql_upper.startswith(('INSERT', 'UPDATE', 'DELETE')):
+                    elif sql_upper.startswith(('INSERT', 'UPDATE', 'DELETE', 'REPLACE')):
                         # For DML commands, show affected rows
-                        affected = cursor.rowcount
-                        results.append(f"Query {i+1}: {sql_upper.split()[0]} completed - {affected} row(s) affected")
+                        rows = cursor.rowcount
+                        emit(f"Query {i+1}: {keyword} completed - {rows} row(s) affected")
                         conn.commit()
                     
                     elif sql_upper.startswith(('CREATE', 'ALTER', 'DROP')):
                         # For DDL commands
-                        results.append(f"Query {i+1}: {sql_upper.split()[0]} completed successfully")
+                        rows = 0
+                        emit(f"Query {i+1}: {keyword} completed successfully")
                     
                     else:
-                        results.append(f"Query {i+1}: Executed successfully")
+                        rows = 0
+                        emit(f"Query {i+1}: Executed successfully")
+                    
+                    statements.append({'statement': i + 1, 'type': keyword, 'rows': rows})
+                    if output.exceeded:
+                        break
                         
                 except sqlite3.Error as e:
+                    if time.monotonic() > deadline:
+                        timed_out = True
+                        errors.append(f"Query {i+1} Error: Execution timeout ({timeout}s)")
+                        break
                     errors.append(f"Query {i+1} Error: {e}")
             
-            conn.close()
-            
-            output = '\n'.join(results)
+            result_text = output.getvalue().decode('utf-8', errors='replace').rstrip("\n")
             error_output = '\n'.join(errors) if errors else ''
+            execution_time = round(time.monotonic() - started, 4)
             
-            success = len(errors) == 0
-            if not sql_commands:
-                output = "No SQL commands found. Use semicolons to separate multiple commands."
-                success = False
+            if output.exceeded:
+                return {
+                    'success': False,
+                    'output': result_text,
+                    'error': f"Output limit exceeded ({config.OUTPUT_LIMIT_BYTES} bytes)",
+                    'exit_code': -1,
+                    'output_limit_exceeded': True,
+                    'statements': statements,
+                    'execution_time': execution_time
+                }
+            
+            if timed_out:
+                return {
+                    'success': False,
+                    'output': result_text,
+                    'error': error_output,
+                    'exit_code': -1,
+                    'timeout': True,
+                    'statements': statements,
+                    'execution_time': execution_time
+                }
+            
+            success = len(errors) == 0 and bool(sql_commands)
             
             return {
                 'success': success,
-                'output': output,
+                'output': result_text,
                 'error': error_output,
-                'exit_code': 0 if success else 1
+                'exit_code': 0 if success else 1,
+                'statements': statements,
+                'execution_time': execution_time
             }
             
-        except ImportError:
+        except DatasetNotFound as e:
+            return {
+                'success': False,
+                'output': '',
+                'error': str(e),
+                'exit_code': -1
+            }
+        except MemoryError:
             return {
                 'success': False,
                 'output': '',
-                'error': 'SQLite3 module not available. SQL support requires Python sqlite3.',
+                'error': 'Memory limit exceeded',
                 'exit_code': -1
             }
         except Exception as e:
@@ -158,6 +269,68 @@ class SQLLanguage(BaseLanguage):
                 'error': f'SQL execution error: {e}',
                 'exit_code': -1
             }
+        finally:
+            if conn is not None:
+                conn.close()
+    
+    def execute(self, code: str, input_data: str, timeout: int, memory_limit: int,
+                dataset: str = None) -> Dict[str, Any]:
+        return self.compile_code(code, input_data, timeout, memory_limit, dataset=dataset)
+
+
+# Sample schema is built once; each submission gets a pre-cloned copy
+sample_database = SQLiteTemplatePool(
+    "sql-template",
+    lambda connection: SQLLanguage._setup_sample_database(connection.cursor()),
+    size=config.SQL_POOL_SIZE
+)
+
+# Pre-started worker processes that run one script each: a runaway query or a
+# crash only takes its own process down, and scripts use every core instead of
+# the API's GIL. SQL_POOL_SIZE=0 in the worker keeps it to the one clone it needs.
+sql_pool = WarmProcessPool(
+    name="sql",
+    argv=[sys.executable, "-m", "src.languages.sql_worker"],
+    size=config.SQL_WORKERS,
+    cwd=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    env={**os.environ, "SQL_POOL_SIZE": "0"}
+)
+
+def run_sql_pooled(code: str, timeout: float, memory_limit: int, dataset: str = None) -> Dict[str, Any]:
+    """Run a script on a warm SQL worker; formatted rows stream back on stdout, the summary on stderr"""
+    job = json.dumps({
+        "code": code,
+        "timeout": timeout,
+        "memory_limit": memory_limit,
+        "dataset": dataset
+    }).encode('utf-8')
+    try:
+        # stderr carries the worker's JSON summary, not the script's output
+        with stream_stdout_only():
+            process = sql_pool.run(job, timeout=timeout + _KILL_GRACE, text=True, memory_limit=memory_limit)
+    except subprocess.TimeoutExpired:
+        return {
+            'success': False,
+            'output': '',
+            'error': f'Execution timeout ({timeout}s)',
+            'exit_code': -1,
+            'timeout': True
+        }
+    
+    if process.output_limit_exceeded:
+        return output_limit_result(process)
+    if process.memory_limit_exceeded:
+        return memory_limit_result(process)
     
-    def execute(self, code: str, input_data: str, timeout: int, memory_limit: int) -> Dict[str, Any]:
-        return self.compile_code(code, input_data, timeout, memory_limit)
\ No newline at end of file
+    try:
+        summary = json.loads(process.stderr.strip().splitlines()[-1])
+    except (IndexError, ValueError):
+        # Died before reporting: out of memory, killed, or crashed
+        return {
+            'success': False,
+            'output': process.stdout,
+            'error': f'SQL worker exited with code {process.returncode}: {process.stderr[-500:]}'.rstrip(': '),
+            'exit_code': -1,
+            **resource_fields(process)
+        }
+    return {**summary, 'output': process.stdout.rstrip('\n'), **resource_fields(process)}
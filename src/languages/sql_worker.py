@@ -0,0 +1,65 @@
+# src/languages/sql_worker.py
+"""One-shot SQL worker process, pre-started by sql_pool in src/languages/sql.py.
+
+Before a job arrives it imports sqlite3 and clones the sample database. It
+then reads one JSON job from stdin, applies the job's memory limit, streams
+the formatted results to stdout and writes a JSON summary line to stderr.
+"""
+import json
+import sys
+
+from src.core.config import config
+from src.languages.sql import SQLLanguage, sample_database
+
+
+class PipeOutput:
+    """Output sink for run_script that writes straight to stdout, up to `limit` bytes"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.total = 0
+
+    @property
+    def exceeded(self) -> bool:
+        return self.total > self.limit
+
+    def feed(self, data: bytes) -> bool:
+        room = self.limit - self.total
+        self.total += len(data)
+        if room > 0:
+            sys.stdout.buffer.write(data[:room])
+        return not self.exceeded
+
+    def getvalue(self) -> bytes:
+        return b""  # already streamed
+
+
+def _limit_memory(memory_limit_kb: int) -> None:
+    """Cap the heap with RLIMIT_DATA; unlike RLIMIT_AS it leaves read-only dataset mmaps alone"""
+    if memory_limit_kb <= 0:
+        return
+    try:
+        import resource
+        limit = memory_limit_kb * 1024
+        resource.setrlimit(resource.RLIMIT_DATA, (limit, limit))
+    except (ImportError, AttributeError, ValueError, OSError):
+        pass
+
+
+def main() -> None:
+    conn = sample_database.acquire()
+    job = json.loads(sys.stdin.buffer.read() or b"null")
+    if job is None:
+        return  # pool shut down before handing us a job
+
+    _limit_memory(job.get("memory_limit") or 0)
+    output = PipeOutput(config.OUTPUT_LIMIT_BYTES)
+    summary = SQLLanguage().run_script(job["code"], job["timeout"], job.get("dataset"), output=output, conn=conn)
+    summary.pop("output", None)
+    sys.stdout.flush()
+    sys.stderr.write(json.dumps(summary) + "\n")
+    sys.stderr.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import asyncio
+from src.workers.batch import case_verdict, run_batch
+
+class TestBatch:
+    def test_verdicts(self):
+        ok = {'success': True, 'output': '3  \n', 'error': '', 'exit_code': 0}
+        assert case_verdict(ok, "3") == "Accepted"
+        assert case_verdict(ok, "4") == "Wrong Answer"
+        assert case_verdict(ok, None) == "Completed"
+        assert case_verdict({'output': '', 'error': 'boom', 'exit_code': 1}, "3") == "Runtime Error"
+        assert case_verdict({'output': '', 'error': 'Execution timeout', 'exit_code': -1}, "3") == "Time Limit Exceeded"
+        assert case_verdict({'output': 'x', 'error': '', 'exit_code': -1, 'output_limit_exceeded': True}, "3") == "Output Limit Exceeded"
+        assert case_verdict({'output': '', 'error': 'Memory limit exceeded', 'exit_code': -1, 'memory_limit_exceeded': True}, "3") == "Memory Limit Exceeded"
+
+    def test_compiled_source_runs_once_before_fan_out(self):
+        cases = [{"source_code": "int main() {}", "language_id": 1, "stdin": str(i),
+                  "expected_output": str(i)} for i in range(4)]
+        finished = []
+
+        async def run_case(case):
+            # Every other case starts only after the first build finished
+            assert case["stdin"] == "0" or finished[0] == "0"
+            await asyncio.sleep(0.01)
+            finished.append(case["stdin"])
+            return {'success': True, 'output': case["stdin"], 'error': '', 'exit_code': 0}
+
+        batch = asyncio.run(run_batch(cases, run_case))
+        assert [case["index"] for case in batch["cases"]] == [0, 1, 2, 3]
+        assert batch["summary"] == {"total": 4, "passed": 4, "failed": 0, "verdicts": {"Accepted": 4}}
+
+    def test_failed_build_is_not_repeated_per_case(self):
+        cases = [{"source_code": "int main() {", "language_id": 2, "stdin": str(i),
+                  "expected_output": str(i)} for i in range(5)]
+        calls = []
+
+        async def run_case(case):
+            calls.append(case["stdin"])
+            return {'success': False, 'output': '', 'error': "expected '}'", 'exit_code': 1, 'compilation_error': True}
+
+        batch = asyncio.run(run_batch(cases, run_case))
+        assert calls == ["0"]
+        assert [case["verdict"] for case in batch["cases"]] == ["Compilation Error"] * 5
+        assert batch["cases"][3]["error"] == "expected '}'"
+
+    def test_cases_time_out_at_the_requested_limit(self):
+        from src.workers.executor import SubmissionExecutor
+        executor = SubmissionExecutor(queue=None, slots=2)
+        cases = [{"source_code": "import time\ntime.sleep(float(input()))\nprint('done')", "language_id": 3,
+                  "stdin": stdin, "expected_output": "done", "cpu_time_limit": 1, "memory_limit": 256000}
+                 for stdin in ("0", "3")]
+        batch = asyncio.run(run_batch(cases, executor._execute))
+        assert [case["verdict"] for case in batch["cases"]] == ["Accepted", "Time Limit Exceeded"]
+        assert batch["wall_time"] < 3
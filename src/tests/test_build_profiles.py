@@ -0,0 +1,26 @@
+import pytest
+from src.core.build_profiles import BuildOptionsError, build_settings, parse_compiler_options
+from src.core.compiler import compiler_manager
+
+class TestBuildProfiles:
+    def test_allow_listed_options(self):
+        assert parse_compiler_options("-std=c++17 -Wall -DLOCAL -O3") == ["-std=c++17", "-Wall", "-DLOCAL", "-O3"]
+        assert parse_compiler_options(None) == []
+        for options in ("-o /etc/passwd", "-fplugin=x.so", "-Wl,--wrap=main", "-include /etc/shadow", "-DX=$(id)"):
+            with pytest.raises(BuildOptionsError):
+                parse_compiler_options(options)
+
+    def test_profile_and_user_flags_are_combined(self):
+        build = build_settings("cpp", "g++", "judge", "-std=c++17")
+        assert build.flags == ["-O2", "-static", "-std=c++17"]
+        assert build.custom
+        assert not build_settings("cpp", "g++", "debug").custom
+        with pytest.raises(BuildOptionsError):
+            build_settings("cpp", "g++", "turbo")
+        with pytest.raises(BuildOptionsError):
+            build_settings("rust", "rustc", "judge", "-O2")
+
+    def test_options_are_rejected_for_other_languages(self):
+        result = compiler_manager.execute_code(3, source_code="print(1)", compiler_options="-O2")
+        assert not result["success"]
+        assert "only supported for C and C++" in result["error"]
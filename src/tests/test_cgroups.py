@@ -0,0 +1,64 @@
+import os
+import pytest
+from src.core.cgroups import CgroupSlot, CgroupSlots
+
+def fake_root(tmp_path, controllers="cpuset cpu io memory pids"):
+    """Directory laid out like a delegated cgroup v2 subtree (files are plain files here)"""
+    (tmp_path / "cgroup.controllers").write_text(controllers + "\n")
+    (tmp_path / "cgroup.procs").write_text("")
+    return tmp_path
+
+class TestCgroupSlots:
+    def test_slots_are_precreated_and_configured(self, tmp_path):
+        root = fake_root(tmp_path)
+        slots = CgroupSlots(str(root), count=2)
+        slot = slots.acquire(65536)
+        assert slots.stats() == {'enabled': True, 'root': str(root), 'slots': 2, 'free': 1}
+        assert (root / "cgroup.subtree_control").read_text() == "+memory +pids +cpu"
+        assert os.path.dirname(slot.path) == os.path.join(str(root), f"p{os.getpid()}")
+        assert open(os.path.join(slot.path, "memory.max")).read() == str(65536 * 1024)
+        assert open(os.path.join(slot.path, "memory.swap.max")).read() == "0"
+        assert open(os.path.join(slot.path, "cpu.max")).read().endswith(" 100000")
+        slots.release(slot)
+        assert slots.acquire().path == slot.path
+
+    def test_missing_controllers_disable_slots(self, tmp_path):
+        slots = CgroupSlots(str(fake_root(tmp_path, "cpu io")), count=2)
+        assert slots.acquire() is None
+        assert not slots.stats()['enabled']
+
+    def test_slots_of_dead_processes_are_killed(self, tmp_path):
+        root = fake_root(tmp_path)
+        (root / "p999999999" / "slot-0").mkdir(parents=True)
+        (root / "p1" / "slot-0").mkdir(parents=True)
+        CgroupSlots(str(root), count=1).setup()
+        # On cgroupfs the emptied directory is then removed; plain directories keep the file
+        assert (root / "p999999999" / "slot-0" / "cgroup.kill").read_text() == "1"
+        assert not (root / "p1" / "slot-0" / "cgroup.kill").exists()
+
+    def test_usage_is_the_delta_of_one_run(self, tmp_path):
+        slot = CgroupSlot(str(tmp_path))
+        (tmp_path / "cpu.stat").write_text("usage_usec 1000\nuser_usec 800\n")
+        (tmp_path / "memory.events").write_text("low 0\noom 0\noom_kill 2\n")
+        (tmp_path / "memory.peak").write_text("999999999\n")
+        slot.begin()
+        (tmp_path / "cpu.stat").write_text("usage_usec 251000\nuser_usec 200000\n")
+        (tmp_path / "memory.events").write_text("low 0\noom 1\noom_kill 3\n")
+        (tmp_path / "memory.peak").write_text("1048576\n")
+        usage = slot.end()
+        assert usage.cpu_time == 0.25
+        assert usage.peak_kb == 1024
+        assert usage.oom_killed
+        assert (tmp_path / "cgroup.kill").read_text() == "1"
+
+    def test_failed_spawn_still_ends_the_slot(self, tmp_path, monkeypatch):
+        from src.core import output_capture
+        slots = CgroupSlots(str(fake_root(tmp_path)), count=1)
+        monkeypatch.setattr(output_capture, "cgroup_slots", slots)
+        slot = slots.acquire()
+        slots.release(slot)
+        (tmp_path / os.path.relpath(slot.path, str(tmp_path)) / "memory.peak").write_text("0\n")
+        with pytest.raises(FileNotFoundError):
+            output_capture.run_bounded(["no-such-compiler-xyz"])
+        assert not slot.running and slot._peak_fd is None
+        assert open(os.path.join(slot.path, "cgroup.kill")).read() == "1"
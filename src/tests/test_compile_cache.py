@@ -0,0 +1,80 @@
+import os
+from src.core.compile_cache import BuildCacheDir, CompileCache
+
+class TestCompileCache:
+    def setup_method(self):
+        self.artifact_size = 64
+
+    def _artifact(self, tmp_path, name, content=b"x"):
+        path = tmp_path / name
+        path.write_bytes(content * self.artifact_size)
+        return str(path)
+
+    def test_miss_then_hit(self, tmp_path):
+        cache = CompileCache(str(tmp_path / "cache"), max_bytes=10_000, max_entries=10)
+        key = cache.make_key("c", "gcc", [], "int main() { return 0; }")
+        dest = str(tmp_path / "out")
+
+        assert not cache.fetch_file(key, "main", dest)
+        cache.store(key, {"main": self._artifact(tmp_path, "a.out")})
+        assert cache.fetch_file(key, "main", dest)
+        assert os.path.getsize(dest) == self.artifact_size
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 1
+
+    def test_key_depends_on_flags_and_source(self, tmp_path):
+        cache = CompileCache(str(tmp_path), max_bytes=10_000, max_entries=10)
+        base = cache.make_key("cpp", "g++", [], "int main() {}")
+        assert base != cache.make_key("cpp", "g++", ["-O2"], "int main() {}")
+        assert base != cache.make_key("cpp", "g++", [], "int main() { }")
+        assert base != cache.make_key("c", "g++", [], "int main() {}")
+
+    def test_lru_eviction_by_size(self, tmp_path):
+        cache = CompileCache(str(tmp_path / "cache"), max_bytes=self.artifact_size * 2,
+                             max_entries=10)
+        keys = [cache.make_key("c", "gcc", [], f"// {i}") for i in range(3)]
+        artifact = self._artifact(tmp_path, "a.out")
+
+        cache.store(keys[0], {"main": artifact})
+        cache.store(keys[1], {"main": artifact})
+        # Touch the oldest entry so the middle one becomes least recently used
+        assert cache.fetch_file(keys[0], "main", str(tmp_path / "out"))
+        cache.store(keys[2], {"main": artifact})
+
+        assert cache.stats()["evictions"] == 1
+        assert cache.fetch_file(keys[0], "main", str(tmp_path / "out"))
+        assert not cache.fetch_file(keys[1], "main", str(tmp_path / "out"))
+        assert cache.fetch_file(keys[2], "main", str(tmp_path / "out"))
+
+    def test_entries_survive_restart(self, tmp_path):
+        root = str(tmp_path / "cache")
+        key = CompileCache(root, 10_000, 10).make_key("java", "javac", [], "class Main {}")
+        CompileCache(root, 10_000, 10).store(key, {"Main.class": self._artifact(tmp_path, "Main.class")})
+
+        dest_dir = tmp_path / "classes"
+        dest_dir.mkdir()
+        assert CompileCache(root, 10_000, 10).fetch(key, str(dest_dir))
+        assert (dest_dir / "Main.class").exists()
+
+    def test_disabled_cache_never_hits(self, tmp_path):
+        cache = CompileCache(str(tmp_path / "cache"), 10_000, 10, enabled=False)
+        key = cache.make_key("c", "gcc", [], "")
+        cache.store(key, {"main": self._artifact(tmp_path, "a.out")})
+        assert not cache.fetch_file(key, "main", str(tmp_path / "out"))
+
+class TestBuildCacheDir:
+    def test_trim_removes_oldest_files_first(self, tmp_path):
+        for age, name in enumerate(["newest", "middle", "oldest"]):
+            path = tmp_path / "sub" / name if name == "middle" else tmp_path / name
+            path.parent.mkdir(exist_ok=True)
+            path.write_bytes(b"x" * 100)
+            os.utime(path, (1000 - age * 100, 1000 - age * 100))
+
+        freed = BuildCacheDir(str(tmp_path), max_bytes=150).trim()
+        assert freed == 200
+        assert (tmp_path / "newest").exists()
+        assert not (tmp_path / "oldest").exists()
+        assert not (tmp_path / "sub" / "middle").exists()
@@ -0,0 +1,55 @@
+import pytest
+from src.core.datasets import DatasetNotFound, DatasetRegistry
+
+def build_tiny(connection):
+    connection.execute("CREATE TABLE numbers (n INTEGER)")
+    connection.executemany("INSERT INTO numbers VALUES (?)", [(i,) for i in range(100)])
+
+class TestDatasetRegistry:
+    def setup_method(self):
+        self.calls = 0
+
+    def builder(self, connection):
+        self.calls += 1
+        build_tiny(connection)
+
+    def test_prepare_builds_once(self, tmp_path):
+        registry = DatasetRegistry(str(tmp_path), mmap_size=1024 * 1024)
+        registry.prepare("tiny", self.builder)
+        registry.prepare("tiny", self.builder)
+        assert self.calls == 1
+        assert registry.names() == ["tiny"]
+
+    def test_dataset_is_read_only_and_scratch_is_writable(self, tmp_path):
+        registry = DatasetRegistry(str(tmp_path), mmap_size=1024 * 1024)
+        registry.prepare("tiny", build_tiny)
+        connection = registry.connect("tiny")
+        try:
+            assert connection.execute("SELECT count(*) FROM numbers").fetchone() == (100,)
+            connection.execute("CREATE TABLE scratch (x)")
+            connection.execute("INSERT INTO scratch VALUES (1)")
+            with pytest.raises(Exception, match="readonly"):
+                connection.execute("DELETE FROM numbers")
+        finally:
+            connection.close()
+
+    def test_submissions_cannot_attach_or_detach(self, tmp_path):
+        registry = DatasetRegistry(str(tmp_path), mmap_size=0)
+        registry.prepare("tiny", build_tiny)
+        connection = registry.connect("tiny")
+        try:
+            with pytest.raises(Exception, match="not authorized"):
+                connection.execute("ATTACH DATABASE ? AS other", (str(tmp_path / "other.db"),))
+            with pytest.raises(Exception, match="not authorized"):
+                connection.execute(f"DETACH DATABASE {DatasetRegistry.SCHEMA}")
+            assert connection.execute("SELECT count(*) FROM numbers").fetchone() == (100,)
+        finally:
+            connection.close()
+        assert not (tmp_path / "other.db").exists()
+
+    def test_rejects_unknown_and_unsafe_names(self, tmp_path):
+        registry = DatasetRegistry(str(tmp_path), mmap_size=0)
+        with pytest.raises(DatasetNotFound):
+            registry.connect("missing")
+        with pytest.raises(DatasetNotFound):
+            registry.connect("../etc/passwd")
@@ -0,0 +1,57 @@
+import asyncio
+import threading
+import pytest
+from src.core.execution_pool import ExecutionPool, QueueFullError
+
+class TestExecutionPool:
+    def test_rejects_when_workers_and_queue_are_full(self):
+        pool = ExecutionPool(workers=1, queue_size=1, language_limits={}, default_language_limit=1)
+        pool.admit(3)
+        pool.admit(3)
+        with pytest.raises(QueueFullError) as exc_info:
+            pool.admit(3)
+        assert exc_info.value.queue_depth == 2
+        assert exc_info.value.retry_after >= 1
+        assert pool.stats()['rejected'] == 1
+
+    def test_run_releases_admission(self):
+        pool = ExecutionPool(workers=1, queue_size=0, language_limits={}, default_language_limit=1)
+
+        async def scenario():
+            pool.admit(3)
+            assert await pool.run(3, lambda a, b=0: a + b, 2, b=3) == 5
+            pool.admit(3)  # capacity is free again
+            pool.release()
+
+        asyncio.run(scenario())
+
+    def test_language_limit_caps_concurrency(self):
+        pool = ExecutionPool(workers=4, queue_size=4, language_limits={7: 1}, default_language_limit=4)
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def job():
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            threading.Event().wait(0.05)
+            with lock:
+                active.pop()
+
+        async def scenario():
+            for _ in range(3):
+                pool.admit(7)
+            await asyncio.gather(*(pool.run(7, job) for _ in range(3)))
+
+        asyncio.run(scenario())
+        assert max(peak) == 1
+        assert pool.stats()['running'] == 0
+
+    def test_unlisted_languages_may_use_every_worker(self, monkeypatch):
+        from src.core import execution_pool
+        monkeypatch.setattr(execution_pool.config, 'EXECUTION_LANGUAGE_LIMIT', 0)
+        monkeypatch.setattr(execution_pool.config, 'EXECUTION_LANGUAGE_LIMITS', "7:1")
+        pool = execution_pool.build_execution_pool(workers=4)
+        assert pool.default_language_limit == 4
+        assert pool.language_limits == {7: 1}
@@ -0,0 +1,51 @@
+import asyncio
+from src.core.health_prober import HealthProber
+
+class FakeRunner:
+    def __init__(self, exit_code=0):
+        self.calls = 0
+        self.exit_code = exit_code
+
+    async def __call__(self, language, code):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return {"stdout": "OK\n", "stderr": "", "exit_code": self.exit_code}
+
+class TestHealthProber:
+    def test_latest_is_served_from_cache(self):
+        runner = FakeRunner()
+        prober = HealthProber({"c": "code"}, runner, interval=0, history=5)
+
+        async def scenario():
+            first = await prober.latest("c")
+            second = await prober.latest("c")
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        assert first["passed"] and second is first
+        assert runner.calls == 1
+
+    def test_concurrent_refreshes_share_one_run(self):
+        runner = FakeRunner()
+        prober = HealthProber({"c": "code"}, runner, interval=0, history=5)
+
+        async def scenario():
+            return await asyncio.gather(*(prober.probe("c") for _ in range(5)))
+
+        asyncio.run(scenario())
+        assert runner.calls == 1
+
+    def test_trend_tracks_failures(self):
+        runner = FakeRunner()
+        prober = HealthProber({"c": "code"}, runner, interval=0, history=5)
+
+        async def scenario():
+            await prober.probe("c")
+            runner.exit_code = 1
+            await prober.probe("c")
+
+        asyncio.run(scenario())
+        summary = prober.summary()["c"]
+        assert summary["passed"] is False
+        assert summary["trend"]["samples"] == 2
+        assert summary["trend"]["pass_rate"] == 0.5
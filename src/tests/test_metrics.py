@@ -0,0 +1,31 @@
+from src.core.metrics import EXECUTIONS, PHASE_SECONDS, language_label, observe_result, outcome_of
+from src.core.output_capture import BoundedProcess, compilation_error_result
+
+class TestMetrics:
+    def test_outcomes_for_both_result_formats(self):
+        assert outcome_of({'output': '1', 'error': '', 'exit_code': 0}) == "success"
+        assert outcome_of({'output': '', 'error': 'Execution timeout', 'exit_code': -1}) == "timeout"
+        assert outcome_of({'exit_code': -1, 'output_limit_exceeded': True}) == "output_limit"
+        assert outcome_of({'stdout': '', 'stderr': '', 'exit_code': -1, 'status': 'memory_limit_exceeded'}) == "memory_limit"
+        assert outcome_of({'stdout': '', 'stderr': 'x', 'exit_code': 1, 'status': 'compilation_error',
+                           'compilation_error': True}) == "compile_error"
+        assert outcome_of({'output': '', 'error': 'x', 'exit_code': 1, 'compilation_error': True}) == "compile_error"
+        assert outcome_of({'exit_code': 0, 'cached': True}) == "cached"
+
+    def test_language_labels(self):
+        assert language_label(2) == language_label("c++") == language_label("cpp") == "cpp"
+        assert language_label("python") == "python"
+
+    def test_observe_result_records_phases(self):
+        before = EXECUTIONS.labels("go", "success")._value.get()
+        observe_result("go", {'exit_code': 0, 'phases': {'compile': {'wall_time': 0.2}, 'run': None}})
+        assert EXECUTIONS.labels("go", "success")._value.get() == before + 1
+        assert PHASE_SECONDS.labels("go", "compile")._sum.get() >= 0.2
+
+    def test_failed_compile_records_outcome_and_compile_phase(self):
+        compile = BoundedProcess(["gcc"], 1, "", "error: expected ';'", wall_time=0.3, cpu_time=0.2, max_rss_kb=1024)
+        before = EXECUTIONS.labels("c", "compile_error")._value.get()
+        compiled = PHASE_SECONDS.labels("c", "compile")._sum.get()
+        observe_result(language_label(1), compilation_error_result(compile))
+        assert EXECUTIONS.labels("c", "compile_error")._value.get() == before + 1
+        assert PHASE_SECONDS.labels("c", "compile")._sum.get() >= compiled + 0.3
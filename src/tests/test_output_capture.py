@@ -0,0 +1,67 @@
+import asyncio
+import os
+import sys
+import time
+from src.core.output_capture import BoundedBuffer, run_bounded, run_bounded_async, stream_output
+
+FLOOD = "import sys\nwhile True: sys.stdout.write('x' * 1000)"
+
+class TestBoundedBuffer:
+    def test_keeps_everything_under_the_limit(self):
+        buffer = BoundedBuffer(limit=100, tail=10)
+        assert buffer.feed(b"a" * 60)
+        assert buffer.feed(b"b" * 40)
+        assert buffer.getvalue() == b"a" * 60 + b"b" * 40
+
+    def test_keeps_head_and_tail_on_overflow(self):
+        buffer = BoundedBuffer(limit=20, tail=5)
+        assert buffer.feed(b"0123456789")
+        assert not buffer.feed(b"abcdefghijklmnopqrst")
+        value = buffer.getvalue()
+        assert value.startswith(b"0123456789abcde")
+        assert value.endswith(b"pqrst")
+        assert b"10 bytes omitted" in value
+
+class TestRunBounded:
+    def test_normal_run_matches_subprocess_run(self):
+        result = run_bounded([sys.executable, "-c", "print(input())"], input="hello\n", timeout=5)
+        assert result.returncode == 0
+        assert result.stdout == "hello\n"
+        assert not result.output_limit_exceeded
+
+    def test_flood_is_killed_at_the_cap(self):
+        result = run_bounded([sys.executable, "-c", FLOOD], timeout=10, limit=64 * 1024)
+        assert result.output_limit_exceeded
+        assert result.returncode != 0
+        assert len(result.stdout) < 70 * 1024
+
+    def test_async_flood_is_killed_at_the_cap(self):
+        result = asyncio.run(run_bounded_async([sys.executable, "-c", FLOOD], timeout=10, limit=64 * 1024))
+        assert result.output_limit_exceeded
+        assert len(result.stdout) < 70 * 1024
+
+    def test_reports_resource_usage(self):
+        burn = "x = bytearray(64 * 1024 * 1024)\nsum(range(2_000_000))"
+        result = run_bounded([sys.executable, "-c", burn], timeout=10)
+        assert result.wall_time > 0
+        if hasattr(os, "wait4"):
+            assert result.cpu_time > 0
+            if sys.platform.startswith("linux"):
+                assert result.max_rss_kb >= 64 * 1024
+
+    def test_background_children_do_not_outlive_the_run(self):
+        started = time.monotonic()
+        result = run_bounded(["sh", "-c", "sleep 15 & echo hi"], timeout=2)
+        assert time.monotonic() - started < 2
+        assert result.stdout == "hi\n"
+
+    def test_listener_sees_output_while_the_program_runs(self):
+        seen = []
+        slow = "import sys, time\nprint('first', flush=True)\ntime.sleep(0.5)\nprint('second', file=sys.stderr)"
+        with stream_output(lambda stream, data: seen.append((stream, data, time.monotonic()))):
+            started = time.monotonic()
+            result = run_bounded([sys.executable, "-c", slow], timeout=5)
+        assert b"".join(data for stream, data, _ in seen if stream == "stdout") == b"first\n"
+        assert b"".join(data for stream, data, _ in seen if stream == "stderr") == b"second\n"
+        assert seen[0][2] - started < 0.4
+        assert result.stdout == "first\n"
@@ -0,0 +1,32 @@
+import os
+import shutil
+import subprocess
+import pytest
+from src.core.precompiled_headers import PrecompiledHeaders, included_headers
+
+BITS = "#include <bits/stdc++.h>\nusing namespace std;\nint main() { vector<int> v{2, 1}; sort(v.begin(), v.end()); cout << v[0]; }\n"
+
+class TestPrecompiledHeaders:
+    def test_header_sets_are_selected_by_includes(self, tmp_path):
+        pch = PrecompiledHeaders(str(tmp_path))
+        assert pch.select(BITS) == "stdc++"
+        assert pch.select("#include <iostream>\n#include <vector>\nint main() {}") == "stl"
+        assert pch.select("#include <iostream>\n#include <regex>\nint main() {}") is None
+        assert pch.select("int main() {}") is None
+
+    def test_directives_before_includes_rule_out_a_pch(self):
+        assert included_headers("#define _GLIBCXX_DEBUG\n#include <vector>\n") is None
+        assert included_headers('#include "local.h"\n') is None
+        assert included_headers("#include <vector>\n#define int long long\n") == {"vector"}
+
+    @pytest.mark.skipif(shutil.which("g++") is None, reason="needs g++")
+    def test_submission_compiles_against_the_built_pch(self, tmp_path):
+        pch = PrecompiledHeaders(str(tmp_path / "pch"))
+        compiler = shutil.which("g++")
+        assert pch.build(compiler, [], "stdc++")
+        args = pch.include_args(compiler, [], BITS)
+        assert args and os.path.isfile(args[1] + ".gch")
+        source = tmp_path / "main.cpp"
+        source.write_text(BITS)
+        process = subprocess.run([compiler, *args, "-Winvalid-pch", "-Werror", str(source), "-o", str(tmp_path / "main")])
+        assert process.returncode == 0
@@ -0,0 +1,47 @@
+import subprocess
+import sys
+import pytest
+from src.core.warm_pool import WarmProcessPool
+from src.languages.python import _WORKER_BOOTSTRAP, encode_python_job, python_pool
+
+class TestPythonWorkerPool:
+    def setup_method(self):
+        self.pool = WarmProcessPool("python-test", [sys.executable, "-c", _WORKER_BOOTSTRAP], size=2)
+
+    def teardown_method(self):
+        self.pool.shutdown()
+
+    def _run(self, code, stdin="", timeout=5):
+        result = self.pool.run(encode_python_job(code, stdin), timeout=timeout)
+        return result.returncode, result.stdout.decode(), result.stderr.decode()
+
+    def test_stdin_reaches_submission(self):
+        code, stdout, _ = self._run("name = input()\nprint('Hello', name)\nprint(len(__import__('sys').stdin.read()))", "World\nabc")
+        assert code == 0
+        assert stdout == "Hello World\n3\n"
+
+    def test_runs_as_main_with_clean_traceback(self):
+        code, stdout, stderr = self._run("if __name__ == '__main__':\n    print('main')\n    1 / 0")
+        assert code == 1
+        assert stdout == "main\n"
+        assert 'File "main.py", line 3' in stderr
+        assert "ZeroDivisionError" in stderr
+        assert "_WORKER_BOOTSTRAP" not in stderr
+
+    def test_exit_code_is_preserved(self):
+        assert self._run("raise SystemExit(7)")[0] == 7
+
+    def test_timeout_kills_worker(self):
+        with pytest.raises(subprocess.TimeoutExpired):
+            self._run("while True: pass", timeout=0.5)
+        assert self._run("print('next')")[1] == "next\n"
+
+    def test_workers_cannot_see_the_server_tree(self):
+        pool = WarmProcessPool("python-isolated", python_pool.argv, size=1, workspace=True)
+        try:
+            job = encode_python_job("import os, sys\nprint(os.listdir(os.getcwd()))\nimport api", "")
+            result = pool.run(job, timeout=5, text=True)
+        finally:
+            pool.shutdown()
+        assert result.stdout == "[]\n"
+        assert "ModuleNotFoundError: No module named 'api'" in result.stderr
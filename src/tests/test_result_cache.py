@@ -0,0 +1,43 @@
+from src.core import result_cache as result_cache_module
+from src.core.result_cache import ResultCache
+
+class TestResultCache:
+    def setup_method(self):
+        self.cache = ResultCache(ttl=60, max_entries=2)
+        self.result = {'success': True, 'output': 'Hello\n', 'error': '', 'exit_code': 0}
+
+    def test_key_covers_inputs_and_limits(self):
+        key = self.cache.make_key(3, "print(1)", "", 5, 256000)
+        assert key == self.cache.make_key(3, "print(1)", "", 5, 256000)
+        assert key != self.cache.make_key(3, "print(1)", "x", 5, 256000)
+        assert key != self.cache.make_key(3, "print(1)", "", 10, 256000)
+        assert key != self.cache.make_key(3, "print(1)", "", 5, 128000)
+
+    def test_hit_returns_copy(self):
+        self.cache.set("k", self.result)
+        cached = self.cache.get("k")
+        assert cached == self.result
+        cached['output'] = 'changed'
+        assert self.cache.get("k")['output'] == 'Hello\n'
+
+    def test_timeouts_are_not_cached(self):
+        self.cache.set("k", {'success': False, 'output': '', 'error': 'Execution timeout', 'exit_code': -1})
+        assert self.cache.get("k") is None
+
+    def test_ttl_expiry(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(result_cache_module.time, "monotonic", lambda: now[0])
+        self.cache.set("k", self.result)
+        now[0] += 59
+        assert self.cache.get("k") is not None
+        now[0] += 2
+        assert self.cache.get("k") is None
+
+    def test_size_bound_evicts_least_recently_used(self):
+        self.cache.set("a", self.result)
+        self.cache.set("b", self.result)
+        self.cache.get("a")
+        self.cache.set("c", self.result)
+        assert self.cache.get("b") is None
+        assert self.cache.get("a") is not None
+        assert self.cache.stats()['entries'] == 2
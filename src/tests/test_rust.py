@@ -0,0 +1,22 @@
+import shutil
+import pytest
+from src.languages.rust import RustCrates, RustLanguage, _parse_crates
+
+class TestRust:
+    def test_crate_spec(self):
+        assert _parse_crates("rand=0.9, itertools=0.14,regex") == {"rand": "0.9", "itertools": "0.14", "regex": "*"}
+
+    def test_only_referenced_crates_are_linked(self, tmp_path):
+        crates = RustCrates(str(tmp_path), {"rand": "0.9", "regex": "1"})
+        crates._externs = {"rand": "/crates/librand.rlib", "regex": "/crates/libregex.rlib"}
+        crates._externs_dir = crates.directory()
+        args = crates.extern_args("use rand::Rng;\nfn main() { let r = regex_free(); }")
+        assert args[0] == "-L" and args[2:] == ["--extern", "rand=/crates/librand.rlib"]
+        assert crates.extern_args("fn main() {}") == []
+
+    @pytest.mark.skipif(shutil.which("rustc") is None, reason="needs rustc")
+    def test_compile_and_run(self):
+        code = "use std::io::Read;\nfn main() { let mut s = String::new(); std::io::stdin().read_to_string(&mut s).unwrap(); println!(\"{}\", s.trim().len()); }"
+        result = RustLanguage().execute(code, "hello", 30, 256000, build_profile="quick")
+        assert result["success"], result["error"]
+        assert result["output"] == "5\n"
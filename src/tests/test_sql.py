@@ -1,5 +1,6 @@
+import sys
 import pytest
-from src.languages.sql import SQLLanguage
+from src.languages.sql import SQLLanguage, sql_pool
 
 class TestSQLCompiler:
     def setup_method(self):
@@ -22,4 +23,42 @@ class TestSQLCompiler:
         stdin = '{"tables": {"users": {"schema": "CREATE TABLE users (id INT)"}}}'
         result = self.sql_compiler._parse_input(stdin)
         assert "tables" in result
-        assert "users" in result["tables"]
\ No newline at end of file
+        assert "users" in result["tables"]
+
+
+class TestSQLExecution:
+    def setup_method(self):
+        self.sql_compiler = SQLLanguage()
+
+    def test_semicolons_in_literals_and_triggers_do_not_split(self):
+        sql = (
+            "SELECT 'a;b';\n"
+            "CREATE TRIGGER t AFTER INSERT ON users BEGIN UPDATE users SET age = 1; END;\n"
+            "SELECT 1"
+        )
+        statements = self.sql_compiler._split_sql_statements(sql)
+        assert statements[0] == "SELECT 'a;b'"
+        assert statements[1].endswith("END")
+        assert len(statements) == 3
+
+    def test_reports_rows_per_statement(self):
+        result = self.sql_compiler.execute("SELECT * FROM users; DELETE FROM orders;", "", 5, 0)
+        assert result["exit_code"] == 0
+        assert [s["rows"] for s in result["statements"]] == [3, 4]
+
+    def test_runaway_query_hits_the_deadline(self):
+        sql = "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT count(*) FROM c;"
+        result = self.sql_compiler.execute(sql, "", 0.5, 0)
+        assert result["exit_code"] == -1
+        assert result["timeout"]
+        assert "timeout" in result["error"].lower()
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="RLIMIT_DATA is enforced on Linux")
+    def test_memory_limit_stops_the_worker_not_the_server(self):
+        if not sql_pool.enabled:
+            pytest.skip("SQL runs in-process")
+        sql = ("WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 3000000) "
+               "SELECT group_concat(printf('%050d', x)) FROM c;")
+        result = self.sql_compiler.execute(sql, "", 10, 64000)
+        assert result["exit_code"] == -1
+        assert self.sql_compiler.execute("SELECT 1;", "", 5, 64000)["exit_code"] == 0
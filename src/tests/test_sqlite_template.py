@@ -0,0 +1,28 @@
+from src.core.sqlite_template import SQLiteTemplatePool
+
+class TestSQLiteTemplatePool:
+    def setup_method(self):
+        self.seeds = 0
+
+    def seed(self, connection):
+        self.seeds += 1
+        connection.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+        connection.executemany("INSERT INTO users VALUES (?, ?)", [(1, "a"), (2, "b")])
+
+    def test_seed_runs_once(self):
+        pool = SQLiteTemplatePool("test", self.seed, size=0)
+        for _ in range(3):
+            connection = pool.acquire()
+            assert connection.execute("SELECT count(*) FROM users").fetchone() == (2,)
+            connection.close()
+        assert self.seeds == 1
+
+    def test_clones_are_isolated(self):
+        pool = SQLiteTemplatePool("test", self.seed, size=2)
+        first = pool.acquire()
+        first.execute("DELETE FROM users")
+        first.commit()
+        second = pool.acquire()
+        assert second.execute("SELECT count(*) FROM users").fetchone() == (2,)
+        first.close()
+        second.close()
@@ -0,0 +1,45 @@
+import sys
+from src.core.toolchains import ToolchainRegistry
+
+SPECS = {
+    "python": {"candidates": [sys.executable]},
+    "missing": {"candidates": ["no-such-compiler-xyz"]},
+}
+
+class TestToolchainRegistry:
+    def test_discover_resolves_path_and_version(self):
+        registry = ToolchainRegistry(SPECS, retry_interval=60)
+        resolved = registry.discover()
+        assert resolved["python"].available
+        assert resolved["python"].version.startswith("Python")
+        assert not resolved["missing"].available
+
+    def test_missing_tool_falls_back_to_bare_command(self):
+        registry = ToolchainRegistry(SPECS, retry_interval=60)
+        registry.discover()
+        assert registry.command("missing") == "no-such-compiler-xyz"
+
+    def test_missing_tool_is_reprobed_after_retry_interval(self):
+        registry = ToolchainRegistry(SPECS, retry_interval=0)
+        first = registry.get("missing")
+        assert registry.get("missing") is not first
+
+    def test_available_tool_is_cached_until_invalidated(self):
+        registry = ToolchainRegistry(SPECS, retry_interval=0)
+        first = registry.get("python")
+        assert registry.get("python") is first
+        registry.invalidate("python")
+        assert registry.get("python") is not first
+
+    def test_version_follows_a_reprobe(self, tmp_path):
+        tool = tmp_path / "cc"
+        tool.write_text("#!/bin/sh\ncat \"$(dirname \"$0\")/banner\"\n")
+        tool.chmod(0o755)
+        (tmp_path / "banner").write_text("cc 1.0\n")
+        registry = ToolchainRegistry({"cc": {"candidates": [str(tool)]}}, retry_interval=60)
+        path = registry.path("cc")
+        assert registry.version("cc") == registry.version(path) == "cc 1.0"
+        (tmp_path / "banner").write_text("cc 2.0\n")
+        assert registry.version(path) == "cc 1.0"
+        registry.invalidate("cc")
+        assert registry.version(path) == "cc 2.0"
@@ -0,0 +1,57 @@
+import os
+import time
+from src.core.workspace import WorkspaceManager
+
+def wait_for_recycle(manager, timeout=5):
+    deadline = time.monotonic() + timeout
+    while manager.stats()["recycling"] or manager.stats()["active"]:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+class TestWorkspaceManager:
+    def test_workspaces_are_recycled_empty(self, tmp_path):
+        manager = WorkspaceManager(str(tmp_path), size=2, sweep_interval=0, max_age=3600)
+        with manager.workspace() as path:
+            with open(os.path.join(path, "main.c"), "w") as f:
+                f.write("int main(){}")
+            os.makedirs(os.path.join(path, "classes", "nested"))
+        wait_for_recycle(manager)
+        stats = manager.stats()
+        assert stats["idle"] == 2 and stats["cold_starts"] == 0
+        again = manager.acquire()
+        assert os.listdir(again) == []
+
+    def test_concurrent_runs_get_distinct_directories(self, tmp_path):
+        manager = WorkspaceManager(str(tmp_path), size=1, sweep_interval=0, max_age=3600)
+        first, second = manager.acquire(), manager.acquire()
+        assert first != second
+        assert manager.stats()["cold_starts"] == 1
+
+    def test_first_acquires_racing_start_get_live_directories(self, tmp_path, monkeypatch):
+        from concurrent.futures import ThreadPoolExecutor
+        from src.core import workspace
+        rmtree = workspace.shutil.rmtree
+
+        def slow_rmtree(path, **kwargs):
+            # Widen the window in which another thread could hand out a directory
+            time.sleep(0.05)
+            rmtree(path, **kwargs)
+
+        monkeypatch.setattr(workspace.shutil, "rmtree", slow_rmtree)
+        manager = WorkspaceManager(str(tmp_path), size=0, sweep_interval=0, max_age=3600)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            paths = list(pool.map(lambda _: manager.acquire(), range(8)))
+        assert len(set(paths)) == 8
+        assert all(os.path.isdir(path) for path in paths)
+
+    def test_sweep_removes_orphans(self, tmp_path):
+        manager = WorkspaceManager(str(tmp_path), size=1, sweep_interval=0, max_age=60)
+        active = manager.acquire()
+        leaked = os.path.join(manager.base, "leaked")
+        os.makedirs(leaked)
+        os.utime(leaked, (0, 0))
+        dead = tmp_path / "p999999999"
+        (dead / "ws1").mkdir(parents=True)
+        assert manager.sweep() == 2
+        assert os.path.isdir(active)
+        assert not os.path.exists(leaked) and not dead.exists()
@@ -0,0 +1,93 @@
+import asyncio
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.core.config import config
+
+RunCase = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+OnCase = Callable[[Dict[str, Any]], Awaitable[None]]
+
+def _normalize(text: str) -> str:
+    return "\n".join(line.rstrip() for line in (text or "").strip().splitlines())
+
+def case_verdict(result: Dict[str, Any], expected_output: Optional[str]) -> str:
+    """Judge one test case the way graders compare output: trailing whitespace is ignored"""
+    if result.get("compilation_error"):
+        return "Compilation Error"
+    if result.get("output_limit_exceeded"):
+        return "Output Limit Exceeded"
+    if result.get("memory_limit_exceeded"):
+        return "Memory Limit Exceeded"
+    if result.get("exit_code", -1) == -1 and "timeout" in (result.get("error") or "").lower():
+        return "Time Limit Exceeded"
+    if result.get("exit_code", -1) != 0:
+        return "Runtime Error"
+    if expected_output is None:
+        return "Completed"
+    if _normalize(result.get("output", "")) == _normalize(expected_output):
+        return "Accepted"
+    return "Wrong Answer"
+
+def summarize(cases: List[Dict[str, Any]]) -> Dict[str, Any]:
+    verdicts = Counter(case["verdict"] for case in cases)
+    return {
+        "total": len(cases),
+        "passed": verdicts["Accepted"] + verdicts["Completed"],
+        "failed": len(cases) - verdicts["Accepted"] - verdicts["Completed"],
+        "verdicts": dict(verdicts)
+    }
+
+def _needs_compile(language_id: int) -> bool:
+    return "compile_cmd" in config.LANGUAGE_CONFIG.get(language_id, {})
+
+async def run_batch(cases: List[Dict[str, Any]], run_case: RunCase,
+                    on_case: Optional[OnCase] = None) -> Dict[str, Any]:
+    """Run every case of a batch and aggregate per-case verdicts and timings.
+
+    Cases sharing a compiled source run one case first so its build lands in
+    the compile cache; the rest then fan out in parallel and reuse it. If that
+    build fails, the rest share its Compilation Error without running.
+    on_case, if given, is awaited with each case result as soon as it is judged.
+    """
+    async def timed(index: int, result: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        case = cases[index]
+        started = time.monotonic()
+        if result is None:
+            result = await run_case(case)
+            if result.get("compilation_error") and index in builds:
+                failed_builds[builds[index]] = result
+        judged = {
+            "index": index,
+            **result,
+            "expected_output": case.get("expected_output"),
+            "verdict": case_verdict(result, case.get("expected_output")),
+            "time": round(time.monotonic() - started, 3)
+        }
+        if on_case is not None:
+            await on_case(judged)
+        return judged
+
+    started = time.monotonic()
+    results: Dict[int, Dict[str, Any]] = {}
+    builds: Dict[int, Tuple] = {}
+    leaders: Dict[Tuple, int] = {}
+    failed_builds: Dict[Tuple, Dict[str, Any]] = {}
+    for index, case in enumerate(cases):
+        if _needs_compile(case["language_id"]):
+            builds[index] = (case["language_id"], case["source_code"], case.get("build_profile"), case.get("compiler_options"))
+            leaders.setdefault(builds[index], index)
+
+    for result in await asyncio.gather(*(timed(index) for index in leaders.values())):
+        results[result["index"]] = result
+    remaining = [index for index in range(len(cases)) if index not in results]
+    for result in await asyncio.gather(*(timed(index, failed_builds.get(builds.get(index)))
+                                         for index in remaining)):
+        results[result["index"]] = result
+
+    ordered = [results[index] for index in range(len(cases))]
+    return {
+        "cases": ordered,
+        "summary": summarize(ordered),
+        "wall_time": round(time.monotonic() - started, 3)
+    }
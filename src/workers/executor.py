@@ -1,66 +1,233 @@
 import asyncio
-import redis
-import json
-from typing import Dict, Any
+import codecs
+import time
+from datetime import datetime
+from typing import Optional
 
 from src.core.compiler import compiler_manager
-from src.database.redis_client import redis_client
+from src.core.config import config
+from src.core.execution_pool import QueueFullError, build_execution_pool, default_worker_count
+from src.core.metrics import PHASE_SECONDS, QUEUE_DEPTH, language_label
+from src.core.output_capture import OutputListener, stream_output
+from src.workers.batch import run_batch
+from src.workers.queue_manager import submission_queue, worker_id
+
+class LiveOutput:
+    """Publishes a run's stdout/stderr as "output" events while the program is still running.
+    
+    The capture threads call it with every read; chunks are decoded per stream
+    and handed to the event loop, where one task publishes them in order.
+    """
+    
+    def __init__(self, queue, submission_id: str, case: Optional[int] = None):
+        self.streamed = False
+        self._loop = asyncio.get_running_loop()
+        self._pending: asyncio.Queue = asyncio.Queue()
+        self._decoders = {stream: codecs.getincrementaldecoder('utf-8')(errors='replace')
+                          for stream in ("stdout", "stderr")}
+        self._closed = False
+        self._task = asyncio.create_task(self._publish(queue, submission_id, case))
+    
+    def __call__(self, stream: str, data: bytes) -> None:
+        # One capture thread per stream, so each decoder has a single caller
+        text = self._decoders[stream].decode(data)
+        if text and not self._closed:
+            self.streamed = True
+            self._loop.call_soon_threadsafe(self._pending.put_nowait, (stream, text))
+    
+    async def close(self) -> None:
+        """Wait until everything received so far is published"""
+        self._closed = True
+        self._pending.put_nowait(None)
+        await self._task
+    
+    async def _publish(self, queue, submission_id: str, case: Optional[int]):
+        size = config.EVENT_OUTPUT_CHUNK
+        while True:
+            item = await self._pending.get()
+            if item is None:
+                return
+            stream, text = item
+            for offset in range(0, len(text), size):
+                data = {"stream": stream, "chunk": text[offset:offset + size]}
+                if case is not None:
+                    data["case"] = case
+                await queue.publish(submission_id, "output", data)
+
+def _execute_streaming(listener: Optional[OutputListener], **kwargs) -> dict:
+    """compiler_manager.execute_code with the program's output passed to listener as it is read"""
+    with stream_output(listener):
+        return compiler_manager.execute_code(**kwargs)
 
 class SubmissionExecutor:
-    def __init__(self):
-        self.redis_client = redis_client
+    def __init__(self, queue=submission_queue, slots: int = 0):
+        self.queue = queue
+        self.worker_id = worker_id()
+        # One slot per concurrent execution; per-language limits come from the pool.
+        # Batch cases queue behind the slots instead of adding threads.
+        self.pool = build_execution_pool(slots or self._default_slots(), queue_size=config.BATCH_MAX_CASES)
+    
+    @staticmethod
+    def _default_slots() -> int:
+        if config.WORKER_SLOTS:
+            return config.WORKER_SLOTS
+        workers = config.EXECUTION_WORKERS or default_worker_count()
+        return max(1, workers // max(1, config.WORKER_PROCESSES))
     
     async def process_queue(self):
-        """Continuously process submissions from the queue"""
-        print("Worker started - waiting for submissions...")
+        """Continuously process submissions from the queue on every slot"""
+        print(f"Worker {self.worker_id} started with {self.pool.workers} slots - waiting for submissions...")
         
+        await asyncio.gather(
+            self._sweep_expired_leases(),
+            *(self._run_slot(slot) for slot in range(self.pool.workers))
+        )
+    
+    async def _run_slot(self, slot: int):
+        """Claim and execute one submission at a time"""
         while True:
             try:
-                # Blocking pop from queue
-                submission_id = self.redis_client.brpop("submission_queue", timeout=0)[1]
+                job = await self.queue.reserve(self.worker_id, timeout=5)
                 
-                if submission_id:
-                    await self.process_submission(submission_id)
+                if job:
+                    submission_id, attempt = job
+                    await self.process_submission(submission_id, attempt)
                     
             except Exception as e:
-                print(f"Error processing queue: {e}")
+                print(f"Error processing queue (slot {slot}): {e}")
                 await asyncio.sleep(1)
     
-    async def process_submission(self, submission_id: str):
-        """Process a single submission"""
+    async def _sweep_expired_leases(self):
+        while True:
+            try:
+                requeued = await self.queue.requeue_expired()
+                if requeued:
+                    print(f"Requeued {requeued} submission(s) from crashed workers")
+                stats = await self.queue.stats()
+                QUEUE_DEPTH.labels("pending").set(stats["pending"])
+                QUEUE_DEPTH.labels("processing").set(stats["processing"])
+            except Exception as e:
+                print(f"Error sweeping expired leases: {e}")
+            await asyncio.sleep(config.QUEUE_SWEEP_INTERVAL)
+    
+    async def _heartbeat(self, submission_id: str):
+        """Renew the lease while the submission executes"""
+        while True:
+            await asyncio.sleep(self.queue.visibility_timeout / 3)
+            await self.queue.extend(submission_id)
+    
+    async def _execute(self, case: dict, listener: Optional[OutputListener] = None) -> dict:
+        """Run one submission or batch case on the pool, waiting for a free slot"""
+        while True:
+            try:
+                self.pool.admit(case["language_id"])
+                break
+            except QueueFullError as e:
+                await asyncio.sleep(e.retry_after)
+        
+        return await self.pool.run(
+            case["language_id"],
+            _execute_streaming,
+            listener,
+            source_code=case["source_code"],
+            language_id=case["language_id"],
+            stdin=case["stdin"],
+            timeout=case["cpu_time_limit"],
+            memory_limit=case["memory_limit"],
+            use_cache=case.get("use_cache"),
+            dataset=case.get("dataset"),
+            build_profile=case.get("build_profile"),
+            compiler_options=case.get("compiler_options")
+        )
+    
+    async def _execute_live(self, submission_id: str, case: dict, index: int = None) -> dict:
+        """_execute, publishing the program's output while it runs"""
+        live = LiveOutput(self.queue, submission_id, index)
         try:
-            data = self.redis_client.get(f"submission:{submission_id}")
-            if not data:
+            result = await self._execute(case, live)
+        finally:
+            await live.close()
+        if not live.streamed:
+            # Nothing was printed live: cached result, compile error or rejected request
+            await self._publish_output(submission_id, result, case=index)
+        return result
+    
+    async def _publish_output(self, submission_id: str, result: dict, case: int = None):
+        """Publish a finished result's stdout/stderr in EVENT_OUTPUT_CHUNK sized pieces"""
+        size = config.EVENT_OUTPUT_CHUNK
+        for stream, key in (("stdout", "output"), ("stderr", "error")):
+            text = result.get(key) or ""
+            for offset in range(0, len(text), size):
+                data = {"stream": stream, "chunk": text[offset:offset + size]}
+                if case is not None:
+                    data["case"] = case
+                await self.queue.publish(submission_id, "output", data)
+    
+    async def _finish(self, submission: dict):
+        """Store the final state and tell subscribers the submission is done"""
+        await self.queue.save(submission)
+        submission_id = submission["submission_id"]
+        await self.queue.publish(submission_id, "status", {
+            "status": submission["status"],
+            "timings": submission.get("timings", {})
+        })
+        await self.queue.publish(submission_id, "done", {
+            key: value for key, value in submission.items() if key not in ("source_code", "stdin")
+        })
+    
+    async def process_submission(self, submission_id: str, attempt: int = 1):
+        """Process a single submission, acknowledging it once a final state is stored"""
+        heartbeat = asyncio.create_task(self._heartbeat(submission_id))
+        try:
+            submission = await self.queue.load(submission_id)
+            if not submission:
                 print(f"Submission {submission_id} not found")
                 return
             
-            submission = json.loads(data)
+            if attempt > self.queue.max_attempts:
+                submission.update({
+                    "status": "Error",
+                    "stderr": f"Execution abandoned after {self.queue.max_attempts} attempts",
+                    "exit_code": 1
+                })
+                await self._finish(submission)
+                return
             
             # Update status
+            timings = {}
+            if submission.get("created_at"):
+                queued_at = datetime.fromisoformat(submission["created_at"])
+                timings["queue_wait"] = round((datetime.utcnow() - queued_at).total_seconds(), 3)
+                language_ids = {case["language_id"] for case in submission.get("cases", [submission])}
+                for language_id in language_ids:
+                    PHASE_SECONDS.labels(language_label(language_id), "queue_wait").observe(timings["queue_wait"])
             submission["status"] = "Processing"
-            self.redis_client.setex(
-                f"submission:{submission_id}", 
-                3600, 
-                json.dumps(submission)
-            )
+            submission["timings"] = timings
+            await self.queue.save(submission)
+            await self.queue.publish(submission_id, "status", {"status": "Processing", "timings": timings})
             
-            # Execute code
-            result = await compiler_manager.execute_code(
-                source_code=submission["source_code"],
-                language_id=submission["language_id"],
-                stdin=submission["stdin"],
-                cpu_time_limit=submission["cpu_time_limit"],
-                memory_limit=submission["memory_limit"]
-            )
+            # Execute code on the slot pool so heartbeats and other slots keep running
+            started = time.monotonic()
+            if submission.get("batch"):
+                async def run_case(case: dict):
+                    return await self._execute_live(submission_id, case, case["index"])
+                
+                async def on_case(case: dict):
+                    await self.queue.publish(submission_id, "case", {
+                        key: value for key, value in case.items() if key not in ("output", "error")
+                    })
+                
+                cases = [dict(case, index=index) for index, case in enumerate(submission["cases"])]
+                result = await run_batch(cases, run_case, on_case=on_case)
+            else:
+                result = await self._execute_live(submission_id, submission)
+            timings["execution"] = round(time.monotonic() - started, 3)
             
             # Update with result
             submission.update(result)
             submission["status"] = "Completed"
-            self.redis_client.setex(
-                f"submission:{submission_id}", 
-                3600, 
-                json.dumps(submission)
-            )
+            submission["completed_at"] = datetime.utcnow().isoformat()
+            await self._finish(submission)
             
             print(f"Processed submission {submission_id} successfully")
             
@@ -74,14 +241,12 @@ class SubmissionExecutor:
                 "exit_code": 1
             }
             
-            data = self.redis_client.get(f"submission:{submission_id}")
-            if data:
-                submission = json.loads(data)
+            submission = await self.queue.load(submission_id)
+            if submission:
                 submission.update(error_data)
-                self.redis_client.setex(
-                    f"submission:{submission_id}", 
-                    3600, 
-                    json.dumps(submission)
-                )
+                await self._finish(submission)
+        finally:
+            heartbeat.cancel()
+            await self.queue.ack(submission_id)
 
 executor = SubmissionExecutor()
\ No newline at end of file
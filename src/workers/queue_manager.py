@@ -1,10 +1,207 @@
 import asyncio
-from src.workers.executor import executor
+import json
+import logging
+import multiprocessing
+import os
+import socket
+from typing import Any, Dict, List, Optional, Tuple
 
-async def start_worker():
+from src.core.config import config
+from src.core.execution_pool import QueueFullError
+from src.database.redis_client import async_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Atomically move a job whose lease has expired back to the pending list
+_REQUEUE_SCRIPT = """
+if redis.call('EXISTS', KEYS[3]) == 1 then return 0 end
+if redis.call('LREM', KEYS[2], 1, ARGV[1]) == 0 then return 0 end
+redis.call('RPUSH', KEYS[1], ARGV[1])
+return 1
+"""
+
+class SubmissionQueue:
+    """Reliable Redis work queue shared by the API tier and the worker fleet.
+
+    The API LPUSHes submission ids onto the pending list. A worker moves an id
+    onto the processing list and holds a lease key for visibility_timeout
+    seconds, renewing it while it executes. ack() removes the id for good; if a
+    worker dies its lease expires and requeue_expired() hands the job to
+    another worker, up to max_attempts times.
+    """
+
+    PENDING = "submission_queue"
+    PROCESSING = "submission_processing"
+    LEASE_PREFIX = "submission_lease:"
+    ATTEMPTS = "submission_attempts"
+    EVENTS_PREFIX = "submission_events:"
+
+    def __init__(self, client, visibility_timeout: int, max_attempts: int, max_depth: int):
+        self.client = client
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.max_depth = max_depth
+        self._requeue = client.register_script(_REQUEUE_SCRIPT)
+        self._suspects = set()
+
+    # --- submission records -------------------------------------------------
+
+    async def save(self, submission: Dict[str, Any]) -> None:
+        await self.client.setex(
+            f"submission:{submission['submission_id']}",
+            config.SUBMISSION_TTL,
+            json.dumps(submission)
+        )
+
+    async def load(self, submission_id: str) -> Optional[Dict[str, Any]]:
+        data = await self.client.get(f"submission:{submission_id}")
+        return json.loads(data) if data else None
+
+    # --- progress events ----------------------------------------------------
+
+    async def publish(self, submission_id: str, event: str, data: Dict[str, Any]) -> None:
+        """Append a progress event; a Redis stream lets late subscribers replay it"""
+        key = self.EVENTS_PREFIX + submission_id
+        async with self.client.pipeline() as pipe:
+            pipe.xadd(key, {"event": event, "data": json.dumps(data)},
+                      maxlen=config.EVENT_STREAM_MAXLEN, approximate=True)
+            pipe.expire(key, config.SUBMISSION_TTL)
+            await pipe.execute()
+
+    async def read_events(self, submission_id: str, last_id: str = "0",
+                          block_ms: int = 15000) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """Events after last_id as (event_id, event, data); waits up to block_ms for new ones"""
+        response = await self.client.xread({self.EVENTS_PREFIX + submission_id: last_id}, block=block_ms)
+        events = []
+        for _, entries in response or []:
+            for event_id, fields in entries:
+                events.append((event_id, fields["event"], json.loads(fields["data"])))
+        return events
+
+    # --- producer side ------------------------------------------------------
+
+    async def check_capacity(self) -> None:
+        """Raise QueueFullError when the backlog is deeper than the fleet should absorb"""
+        depth = await self.depth()
+        if depth >= self.max_depth:
+            raise QueueFullError(depth, self.max_depth, config.QUEUE_RETRY_AFTER)
+
+    async def enqueue(self, submission: Dict[str, Any]) -> None:
+        await self.save(submission)
+        await self.publish(submission["submission_id"], "status", {"status": submission["status"]})
+        await self.client.lpush(self.PENDING, submission["submission_id"])
+
+    async def depth(self) -> int:
+        return await self.client.llen(self.PENDING)
+
+    async def stats(self) -> Dict[str, int]:
+        return {
+            "pending": await self.depth(),
+            "processing": await self.client.llen(self.PROCESSING),
+            "max_depth": self.max_depth
+        }
+
+    # --- consumer side ------------------------------------------------------
+
+    async def reserve(self, worker_id: str, timeout: int = 1):
+        """Claim the next job; returns (submission_id, attempt) or None after timeout"""
+        submission_id = await self.client.brpoplpush(self.PENDING, self.PROCESSING, timeout=timeout)
+        if submission_id is None:
+            return None
+        await self.client.set(self.LEASE_PREFIX + submission_id, worker_id, ex=self.visibility_timeout)
+        attempt = await self.client.hincrby(self.ATTEMPTS, submission_id, 1)
+        return submission_id, attempt
+
+    async def extend(self, submission_id: str) -> None:
+        """Heartbeat: keep the job invisible to other workers while it runs"""
+        await self.client.expire(self.LEASE_PREFIX + submission_id, self.visibility_timeout)
+
+    async def ack(self, submission_id: str) -> None:
+        async with self.client.pipeline() as pipe:
+            pipe.lrem(self.PROCESSING, 1, submission_id)
+            pipe.delete(self.LEASE_PREFIX + submission_id)
+            pipe.hdel(self.ATTEMPTS, submission_id)
+            await pipe.execute()
+
+    async def requeue_expired(self) -> int:
+        """Return jobs of crashed workers to the pending list.
+
+        An id only counts as abandoned when it had no lease on two consecutive
+        sweeps, which covers the short gap between brpoplpush and the lease SET.
+        """
+        requeued = 0
+        unleased = set()
+        for submission_id in await self.client.lrange(self.PROCESSING, 0, -1):
+            if await self.client.exists(self.LEASE_PREFIX + submission_id):
+                continue
+            if submission_id not in self._suspects:
+                unleased.add(submission_id)
+                continue
+            lease_key = self.LEASE_PREFIX + submission_id
+            if await self._requeue(keys=[self.PENDING, self.PROCESSING, lease_key], args=[submission_id]):
+                requeued += 1
+                logger.warning(f"Requeued submission {submission_id} from an expired lease")
+        self._suspects = unleased
+        return requeued
+
+# Global queue used by the submissions API and the workers
+submission_queue = SubmissionQueue(
+    async_redis_client,
+    visibility_timeout=config.QUEUE_VISIBILITY_TIMEOUT,
+    max_attempts=config.QUEUE_MAX_ATTEMPTS,
+    max_depth=config.QUEUE_MAX_DEPTH
+)
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+async def start_worker(metrics_port: int = 0):
     """Start the worker to process submissions"""
+    from src.core.build_profiles import build_settings
+    from src.core.precompiled_headers import precompiled_headers
+    from src.core.toolchains import toolchains
+    from src.languages.rust import rust_crates
+    from src.workers.executor import executor
+
+    # Resolve compilers before the first claim so no submission pays for probing
+    await asyncio.to_thread(toolchains.discover)
+    # Common C++ headers are precompiled in the background, shared between processes
+    precompiled_headers.warm(toolchains.path('g++'),
+                             build_settings('cpp', toolchains.path('g++'), config.BUILD_PROFILE_DEFAULT).flags)
+    rust_crates.start()
+
+    if metrics_port:
+        from prometheus_client import start_http_server
+        start_http_server(metrics_port)
+        print(f"Worker metrics on :{metrics_port}/metrics")
+
     print("Starting submission worker...")
     await executor.process_queue()
 
+def _run_worker_process(index: int = 0):
+    # Each process serves its own /metrics on consecutive ports
+    port = config.WORKER_METRICS_PORT + index if config.WORKER_METRICS_PORT else 0
+    asyncio.run(start_worker(port))
+
+def main():
+    """Run WORKER_PROCESSES worker processes so one container can saturate its node"""
+    if config.SQL_DATASETS_PREPARE:
+        # Once per container, before the processes that attach the files start
+        from src.core.datasets import datasets
+        datasets.prepare_builtin()
+
+    if config.WORKER_PROCESSES <= 1:
+        _run_worker_process()
+        return
+
+    processes = [
+        multiprocessing.Process(target=_run_worker_process, args=(n,), name=f"submission-worker-{n}")
+        for n in range(config.WORKER_PROCESSES)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
 if __name__ == "__main__":
-    asyncio.run(start_worker())
\ No newline at end of file
+    main()